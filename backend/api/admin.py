@@ -1,14 +1,23 @@
 from django.contrib import admin
 
-from .models import AssessmentRun, Job, Notification, Organization, Upload, UserProfile, Visitor
+from .models import AssessmentRun, DailyScoreRollup, Job, LatestSystemScore, Notification, Organization, PlatformAnalyticsSnapshot, SearchCorpus, SearchDocument, Upload, UploadAnalysis, UploadBlob, UploadSession, UserProfile, Visitor, VisitorChatMessage
 
 
 admin.site.register(Organization)
 admin.site.register(UserProfile)
 admin.site.register(Upload)
+admin.site.register(UploadAnalysis)
+admin.site.register(UploadBlob)
+admin.site.register(UploadSession)
+admin.site.register(SearchCorpus)
+admin.site.register(SearchDocument)
 admin.site.register(AssessmentRun)
+admin.site.register(LatestSystemScore)
+admin.site.register(DailyScoreRollup)
+admin.site.register(PlatformAnalyticsSnapshot)
 admin.site.register(Job)
 admin.site.register(Notification)
 admin.site.register(Visitor)
+admin.site.register(VisitorChatMessage)
 
 # Register your models here.
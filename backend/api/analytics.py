@@ -0,0 +1,214 @@
+"""Platform analytics for the SuperAdmin overview (``/api/admin/analytics``).
+
+The payload is built from a fixed set of grouped queries (one ``GROUP BY`` per
+table and series, never a query per organization) and stored in
+``PlatformAnalyticsSnapshot``. Requests are served from the snapshot; the
+``process_jobs`` daemon (``--analytics-interval``) or
+``manage.py refresh_analytics`` keeps it fresh.
+
+Refreshes are incremental: monthly series are only recounted from the month of
+the previous snapshot on, older months are carried over. Counts that deletes
+can lower in earlier months are corrected by a full recount every
+``ANALYTICS_SNAPSHOT_FULL_REFRESH_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import datetime
+import time
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import AssessmentRun, Job, Notification, Organization, PlatformAnalyticsSnapshot, Upload, UserProfile, Visitor
+
+SNAPSHOT_KEY = "platform"
+# Bump when the payload shape changes: older snapshots are then recomputed in full.
+SNAPSHOT_VERSION = 1
+
+MONTHS = 12
+TOP_COMPANIES = 10
+
+# payload key -> (model, creation timestamp field)
+MONTHLY_SERIES = {
+    "company_growth": (Organization, "created_at"),
+    "user_growth": (User, "date_joined"),
+    "assessment_activity": (AssessmentRun, "created_at"),
+    "upload_activity": (Upload, "created_at"),
+    "visitor_growth": (Visitor, "created_at"),
+}
+
+
+def _month_start(moment: datetime.datetime) -> datetime.datetime:
+    """Start of ``moment``'s month in the current time zone (the buckets of ``TruncMonth``)."""
+
+    return timezone.localtime(moment).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(month: datetime.datetime, n: int) -> datetime.datetime:
+    years, month_index = divmod(month.month - 1 + n, 12)
+    return month.replace(year=month.year + years, month=month_index + 1)
+
+
+def _monthly_counts(model, field: str, since: datetime.datetime) -> List[Dict[str, Any]]:
+    rows = (
+        model.objects.filter(**{f"{field}__gte": since})
+        .annotate(month=TruncMonth(field))
+        .values("month")
+        .annotate(count=Count("pk"))
+        .order_by("month")
+    )
+    return [{"month": row["month"].strftime("%Y-%m"), "count": row["count"]} for row in rows]
+
+
+def _merge_series(previous: List[Dict[str, Any]], recent: List[Dict[str, Any]], window_start: str, since: str) -> List[Dict[str, Any]]:
+    """Months of ``previous`` in ``[window_start, since)`` followed by the recounted ``recent`` months."""
+
+    kept = [row for row in previous if window_start <= row["month"] < since]
+    return kept + recent
+
+
+def _counts_by_org(model) -> Dict[Any, int]:
+    """``{organization_id: rows}``, including a ``None`` key for rows without an organization."""
+
+    return dict(model.objects.order_by().values_list("organization").annotate(n=Count("pk")))
+
+
+def _top_companies(assessments: Dict[Any, int], uploads: Dict[Any, int]) -> List[Dict[str, Any]]:
+    activity = {
+        org_id: assessments.get(org_id, 0) + uploads.get(org_id, 0)
+        for org_id in set(assessments) | set(uploads)
+        if org_id is not None
+    }
+    top_ids = sorted(activity, key=lambda org_id: activity[org_id], reverse=True)[:TOP_COMPANIES]
+    if len(top_ids) < TOP_COMPANIES:
+        # Fewer active orgs than slots: fill up with the newest idle ones, as the list always showed.
+        top_ids += list(
+            Organization.objects.exclude(id__in=top_ids)
+            .order_by("-created_at")
+            .values_list("id", flat=True)[: TOP_COMPANIES - len(top_ids)]
+        )
+    orgs = Organization.objects.in_bulk(top_ids)
+    users = dict(
+        UserProfile.objects.filter(organization_id__in=top_ids)
+        .order_by()
+        .values_list("organization")
+        .annotate(n=Count("pk"))
+    )
+
+    rows = []
+    for org_id in top_ids:
+        org = orgs.get(org_id)
+        if org is None:  # deleted since the counts were taken
+            continue
+        rows.append({
+            "id": str(org.id),
+            "name": org.name,
+            "slug": org.slug,
+            "status": org.status,
+            "tier": org.subscription_tier,
+            "assessments": assessments.get(org_id, 0),
+            "uploads": uploads.get(org_id, 0),
+            "users": users.get(org_id, 0),
+            "activity_score": assessments.get(org_id, 0) + uploads.get(org_id, 0),
+        })
+    rows.sort(key=lambda row: row["activity_score"], reverse=True)
+    return rows
+
+
+def compute_platform_analytics(now: datetime.datetime, previous: Optional[Dict[str, Any]] = None, previous_at: Optional[datetime.datetime] = None) -> Dict[str, Any]:
+    """Build the analytics payload.
+
+    With ``previous`` (an earlier payload computed at ``previous_at``), monthly
+    series are only recounted from ``previous_at``'s month on.
+    """
+
+    window_start = _add_months(_month_start(now), -(MONTHS - 1))
+    since = window_start
+    if previous is not None and previous_at is not None:
+        since = max(window_start, _month_start(previous_at))
+
+    payload: Dict[str, Any] = {}
+    for key, (model, field) in MONTHLY_SERIES.items():
+        recent = _monthly_counts(model, field, since)
+        if since > window_start:
+            recent = _merge_series(previous.get(key) or [], recent, window_start.strftime("%Y-%m"), since.strftime("%Y-%m"))
+        payload[key] = recent
+
+    status_breakdown = {value: 0 for value, _label in Organization.Status.choices}
+    tier_breakdown = {value: 0 for value, _label in Organization.SubscriptionTier.choices}
+    companies = 0
+    for row in Organization.objects.order_by().values("status", "subscription_tier").annotate(n=Count("pk")):
+        companies += row["n"]
+        if row["status"] in status_breakdown:
+            status_breakdown[row["status"]] += row["n"]
+        if row["subscription_tier"] in tier_breakdown:
+            tier_breakdown[row["subscription_tier"]] += row["n"]
+
+    assessments = _counts_by_org(AssessmentRun)
+    uploads = _counts_by_org(Upload)
+    visitors = Visitor.objects.aggregate(n=Count("pk"), assessments=Sum("assessment_count"))
+
+    payload.update({
+        "status_breakdown": status_breakdown,
+        "tier_breakdown": tier_breakdown,
+        "top_active_companies": _top_companies(assessments, uploads),
+        "totals": {
+            "companies": companies,
+            "users": User.objects.count(),
+            "assessments": sum(assessments.values()),
+            "uploads": sum(uploads.values()),
+            "jobs": Job.objects.count(),
+            "notifications": Notification.objects.count(),
+            "visitors": visitors["n"],
+            "visitor_assessments": visitors["assessments"] or 0,
+        },
+    })
+    return payload
+
+
+def refresh_platform_analytics(full: bool = False) -> PlatformAnalyticsSnapshot:
+    """Recompute the snapshot, incrementally unless ``full`` or a full recount is due."""
+
+    started = time.perf_counter()
+    now = timezone.now()
+    previous = PlatformAnalyticsSnapshot.objects.filter(key=SNAPSHOT_KEY).first()
+    full_every = datetime.timedelta(seconds=float(getattr(settings, "ANALYTICS_SNAPSHOT_FULL_REFRESH_SECONDS", 86400)))
+    full = full or previous is None or previous.version != SNAPSHOT_VERSION or now - previous.full_computed_at >= full_every
+
+    if full:
+        payload = compute_platform_analytics(now)
+    else:
+        payload = compute_platform_analytics(now, previous.payload, previous.computed_at)
+
+    snapshot, _created = PlatformAnalyticsSnapshot.objects.update_or_create(
+        key=SNAPSHOT_KEY,
+        defaults={
+            "version": SNAPSHOT_VERSION,
+            "payload": payload,
+            "computed_at": now,
+            "full_computed_at": now if full else previous.full_computed_at,
+            "duration_ms": int((time.perf_counter() - started) * 1000),
+        },
+    )
+    return snapshot
+
+
+def platform_analytics(max_age: Optional[float] = None, refresh: bool = False) -> PlatformAnalyticsSnapshot:
+    """The current snapshot, refreshed first if missing, outdated or older than ``max_age`` seconds."""
+
+    if max_age is None:
+        max_age = float(getattr(settings, "ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS", 900))
+    snapshot = PlatformAnalyticsSnapshot.objects.filter(key=SNAPSHOT_KEY).first()
+    if (
+        refresh
+        or snapshot is None
+        or snapshot.version != SNAPSHOT_VERSION
+        or (timezone.now() - snapshot.computed_at).total_seconds() > max_age
+    ):
+        snapshot = refresh_platform_analytics()
+    return snapshot
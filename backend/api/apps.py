@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from . import blobs  # noqa: F401  (connects the upload refcount signal)
+        from . import materialized  # noqa: F401  (connects the latest-score refresh on run deletes)
+        from . import search  # noqa: F401  (connects the search index cleanup signal)
+        from . import principals  # noqa: F401  (connects the principal cache invalidation signals)
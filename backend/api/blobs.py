@@ -0,0 +1,136 @@
+"""Content-addressed storage for uploaded files.
+
+Upload views install ``Sha256UploadHandler`` in front of Django's upload
+handlers, so each file is hashed chunk by chunk while it streams in and the
+digest is known without reading the file a second time.
+
+Every distinct content is stored once, at ``blobs/ab/cd/<sha256>`` (sharded
+by the first two byte pairs so no directory grows unbounded), behind an
+``UploadBlob`` row. ``store_blob`` takes a reference, writing the file only
+when the content is new; deleting an ``Upload`` releases its reference and the
+file and its row are removed with the last one. Both run under the blob row's
+lock, so a file is never deleted while a concurrent upload of the same content
+is taking a reference to it; that upload recreates the row once the lock is
+released.
+
+Blob paths carry no name or extension, and serializers never expose them:
+uploads are downloaded through ``UploadFileView``, which names the file (and
+its content type) after ``Upload.name``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Optional, Tuple
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import Upload, UploadBlob
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = "blobs"
+
+
+class Sha256UploadHandler(FileUploadHandler):
+    """Hashes uploaded files as they stream in; the next handler still stores them.
+
+    Digests are kept in ``digests`` by form field name.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.digests: dict = {}
+        self._hash = None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._hash = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self._hash.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        self.digests[self.field_name] = self._hash.hexdigest()
+        return None
+
+
+def install_upload_hashing(request) -> None:
+    """Hash files of this request while they are parsed; call before the body is read."""
+
+    request.upload_handlers.insert(0, Sha256UploadHandler(request))
+
+
+def uploaded_sha256(request, field_name: str) -> Optional[str]:
+    """Digest recorded by ``Sha256UploadHandler`` for ``field_name``, if it ran."""
+
+    for handler in request.upload_handlers:
+        if isinstance(handler, Sha256UploadHandler):
+            return handler.digests.get(field_name)
+    return None
+
+
+def blob_path(sha256: str) -> str:
+    return f"{BLOB_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def store_blob(content: File, sha256: str) -> Tuple[UploadBlob, bool]:
+    """Take a reference to the blob for ``sha256``, writing ``content`` only if it is not stored yet.
+
+    Returns ``(blob, written)``.
+    """
+
+    name = blob_path(sha256)
+    with transaction.atomic():
+        blob = None
+        while blob is None:
+            UploadBlob.objects.get_or_create(sha256=sha256, defaults={"file": name, "size": content.size or 0})
+            # None if the last reference's cleanup deleted the row while we waited for its lock; recreate it.
+            blob = UploadBlob.objects.select_for_update().filter(sha256=sha256).first()
+        written = False
+        if not default_storage.exists(blob.file.name):
+            saved = default_storage.save(blob.file.name, content)
+            if saved != blob.file.name:
+                # The storage renamed it (e.g. a stale file appeared meanwhile); keep the canonical path.
+                default_storage.delete(saved)
+            written = True
+        blob.refcount += 1
+        blob.size = content.size or blob.size
+        blob.save(update_fields=["refcount", "size"])
+    return blob, written
+
+
+def release_blob(blob_id: int) -> None:
+    """Drop one reference; the file goes once nothing references it (after commit)."""
+
+    with transaction.atomic():
+        blob = UploadBlob.objects.select_for_update().filter(pk=blob_id).first()
+        if blob is None:
+            return
+        blob.refcount = max(0, blob.refcount - 1)
+        blob.save(update_fields=["refcount"])
+        if blob.refcount == 0:
+            transaction.on_commit(lambda: _delete_if_unreferenced(blob_id))
+
+
+def _delete_if_unreferenced(blob_id: int) -> None:
+    # Re-checked under the lock: an upload of the same content may have taken a reference since.
+    with transaction.atomic():
+        blob = UploadBlob.objects.select_for_update().filter(pk=blob_id, refcount=0).first()
+        if blob is not None:
+            default_storage.delete(blob.file.name)
+            blob.delete()
+            logger.info("Deleted unreferenced blob %s", blob.sha256)
+
+
+@receiver(post_delete, sender=Upload)
+def _release_upload_blob(sender, instance: Upload, **kwargs) -> None:
+    if instance.blob_id:
+        release_blob(instance.blob_id)
@@ -0,0 +1,109 @@
+"""Visitor chat transcripts, stored one row per message (``VisitorChatMessage``).
+
+The assessment page used to post the whole transcript on every chat turn, and
+it was rewritten into ``Visitor.chat_history`` each time: up to 200 messages
+of 5 KB for every new message. Messages are now appended: a request carries
+only the new messages, and appends are idempotent on the client's message id,
+so a retried or overlapping request (or a client still sending the full
+transcript to ``/api/visitors/save-chat``) stores each message once.
+Transcripts are read newest first through ``api.pagination``.
+
+Appends must carry an id per message: positions in a delta restart at 0 on
+every request, so an id derived from them would collide with earlier
+messages. Only the legacy full-transcript path derives ids from positions.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict, Iterable, List
+
+from django.utils import timezone
+
+from .models import Visitor, VisitorChatMessage
+
+# Most messages accepted per request, and characters kept per message.
+MAX_APPEND = 200
+MAX_TEXT = 5000
+# Messages inlined as ``chat_history`` in single-visitor responses (the rest are paged).
+HISTORY_PREVIEW = 200
+
+
+class ChatMessageError(ValueError):
+    """An append carries messages without an ``id``."""
+
+
+def clean_message(message: Dict[str, Any], position: int = 0) -> Dict[str, str]:
+    """A client message as stored.
+
+    One without an id gets an id derived from its ``position`` in the
+    submitted full transcript and its content: identical replies (two "ok"s
+    without timestamps) stay distinct, and re-sending the same transcript
+    still maps each message to the same id.
+    """
+
+    role = str(message.get("role", "user"))[:32]
+    text = str(message.get("text", ""))[:MAX_TEXT]
+    timestamp = str(message.get("timestamp", ""))[:64]
+    message_id = str(message.get("id") or "")[:128]
+    if not message_id:
+        digest = hashlib.sha256("\x00".join((str(position), role, timestamp, text)).encode()).hexdigest()
+        message_id = f"sha256:{digest[:32]}"
+    return {"id": message_id, "role": role, "text": text, "timestamp": timestamp}
+
+
+def clean_messages(messages: Iterable[Any]) -> List[Dict[str, str]]:
+    """Valid messages in order, each id once (first occurrence wins)."""
+
+    seen = set()
+    clean = []
+    for position, message in enumerate(messages):
+        if not isinstance(message, dict):
+            continue
+        message = clean_message(message, position)
+        if message["id"] not in seen:
+            seen.add(message["id"])
+            clean.append(message)
+    return clean
+
+
+def append_chat_messages(visitor: Visitor, messages: Iterable[Any], require_ids: bool = False) -> int:
+    """Store the messages not stored yet, in order; returns how many were new.
+
+    At most the last ``MAX_APPEND`` messages of a request are considered. With
+    ``require_ids`` (deltas), messages without an id raise ``ChatMessageError``.
+    """
+
+    messages = list(messages)
+    if require_ids:
+        missing = [i for i, m in enumerate(messages) if isinstance(m, dict) and not str(m.get("id") or "")]
+        if missing:
+            raise ChatMessageError(f"messages need an id (missing at {', '.join(str(i) for i in missing[:20])})")
+    clean = clean_messages(messages)[-MAX_APPEND:]
+    if not clean:
+        return 0
+    stored = set(
+        VisitorChatMessage.objects.filter(visitor=visitor, message_id__in=[m["id"] for m in clean])
+        .values_list("message_id", flat=True)
+    )
+    new = [
+        VisitorChatMessage(visitor=visitor, message_id=m["id"], role=m["role"], text=m["text"], timestamp=m["timestamp"])
+        for m in clean
+        if m["id"] not in stored
+    ]
+    if new:
+        # ignore_conflicts: a concurrent request may have stored some of them since the check above
+        VisitorChatMessage.objects.bulk_create(new, ignore_conflicts=True)
+        Visitor.objects.filter(pk=visitor.pk).update(updated_at=timezone.now())
+    return len(new)
+
+
+def chat_history(visitor: Visitor, limit: int = HISTORY_PREVIEW) -> List[Dict[str, str]]:
+    """The last ``limit`` messages, oldest first, shaped like the old ``chat_history`` items."""
+
+    rows = (
+        VisitorChatMessage.objects.filter(visitor=visitor)
+        .order_by("-id")
+        .values_list("message_id", "role", "text", "timestamp")[:limit]
+    )
+    return [{"id": i, "role": role, "text": text, "timestamp": ts} for i, role, text, ts in list(rows)[::-1]]
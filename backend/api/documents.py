@@ -0,0 +1,502 @@
+"""Streaming readers for Office Open XML uploads (XLSX, DOCX), stdlib only.
+
+Both formats are zip archives of XML parts. Parts are read straight from the
+archive (``zipfile`` decompresses on the fly) and parsed incrementally, so
+memory does not grow with the document:
+
+- ``iter_xlsx_rows`` yields the first worksheet's rows as lists of strings,
+  like ``csv.reader`` does. The sheet is fed to an ``XMLParser`` whose target
+  builds rows directly (no elements). Cells past ``max_columns`` are dropped
+  and cell text is cut to ``max_cell_chars`` while parsing, so a row's size is
+  bounded however far the compressed XML expands. The shared-string table is
+  the one part that has to be held (cells refer to it by index); it is
+  charged to the caller's budget.
+- ``iter_docx_paragraphs`` yields the body's paragraphs (including those in
+  tables) as text, from an ``XMLParser`` target as well. Paragraph text is cut
+  to ``max_paragraph_chars`` while parsing and charged to the budget while it
+  is held, and no elements are kept, so a huge paragraph or table costs no
+  more than its capped text.
+
+``budget`` is any object with ``check()`` (raises once the CPU budget is spent)
+and ``charge(nbytes)`` (raises once retained memory would exceed its limit);
+see ``api.ingest.Budget``.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import re
+import zipfile
+from datetime import datetime, timedelta
+from typing import IO, Dict, Iterator, List, Optional, Set, Tuple
+from xml.etree.ElementTree import Element, ParseError, XMLParser, iterparse
+
+SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+DOC_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+CHECK_EVERY = 1000
+FEED_BYTES = 64 * 1024
+MAX_CELL_CHARS = 32767  # Excel's own limit
+MAX_COLUMNS = 16384
+MAX_PARAGRAPH_CHARS = 1_000_000
+
+# Built-in number formats that are dates or times (ECMA-376 18.8.30)
+_DATE_FORMAT_IDS = set(range(14, 23)) | set(range(27, 37)) | set(range(45, 48)) | set(range(50, 59))
+_FORMAT_LITERALS_RE = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.')
+
+_ROW = SHEET_NS + "row"
+_CELL = SHEET_NS + "c"
+_VALUE = SHEET_NS + "v"
+_CELL_TEXT = SHEET_NS + "t"
+_PHONETIC = SHEET_NS + "rPh"
+
+
+class DocumentError(ValueError):
+    """The file is not a readable XLSX / DOCX document."""
+
+
+class _NoBudget:
+    def check(self) -> None:
+        pass
+
+    def charge(self, nbytes: int) -> None:
+        pass
+
+
+def _open_zip(fileobj: IO[bytes]) -> zipfile.ZipFile:
+    try:
+        return zipfile.ZipFile(getattr(fileobj, "file", fileobj))
+    except (zipfile.BadZipFile, OSError) as exc:
+        raise DocumentError(f"not a valid Office document (zip): {exc}") from exc
+
+
+def _has(zf: zipfile.ZipFile, name: str) -> bool:
+    try:
+        zf.getinfo(name)
+    except KeyError:
+        return False
+    return True
+
+
+def _iter_elements(zf: zipfile.ZipFile, name: str, events=("end",)) -> Iterator[Tuple[str, Element]]:
+    try:
+        with zf.open(name) as part:
+            yield from iterparse(part, events=events)
+    except KeyError as exc:
+        raise DocumentError(f"missing part {name}") from exc
+    except ParseError as exc:
+        raise DocumentError(f"malformed XML in {name}: {exc}") from exc
+    except (zipfile.BadZipFile, EOFError, RuntimeError) as exc:
+        # RuntimeError: encrypted member
+        raise DocumentError(f"cannot read {name}: {exc}") from exc
+
+
+def office_format(fileobj: IO[bytes]) -> Optional[str]:
+    """"xlsx" or "docx" if ``fileobj`` (seekable, at its start) is such a document, else None."""
+
+    if fileobj.read(4) != b"PK\x03\x04":
+        fileobj.seek(0)
+        return None
+    fileobj.seek(0)
+    try:
+        with zipfile.ZipFile(getattr(fileobj, "file", fileobj)) as zf:
+            if _has(zf, "xl/workbook.xml"):
+                return "xlsx"
+            if _has(zf, "word/document.xml"):
+                return "docx"
+    except (zipfile.BadZipFile, OSError):
+        pass
+    finally:
+        fileobj.seek(0)
+    return None
+
+
+# ---------------------------------------------------------------------------
+# XLSX
+# ---------------------------------------------------------------------------
+
+
+def _first_sheet(zf: zipfile.ZipFile) -> Tuple[str, str, int, bool]:
+    """``(part name, sheet name, sheet count, date1904)`` of the workbook's first sheet."""
+
+    sheets: List[Tuple[str, str]] = []
+    date1904 = False
+    for _, el in _iter_elements(zf, "xl/workbook.xml"):
+        if el.tag == SHEET_NS + "sheet":
+            sheets.append((el.get("name", ""), el.get(DOC_REL_NS + "id", "")))
+        elif el.tag == SHEET_NS + "workbookPr":
+            date1904 = el.get("date1904") in ("1", "true")
+    if not sheets:
+        raise DocumentError("workbook has no sheets")
+
+    targets: Dict[str, str] = {}
+    if _has(zf, "xl/_rels/workbook.xml.rels"):
+        for _, el in _iter_elements(zf, "xl/_rels/workbook.xml.rels"):
+            if el.tag == PKG_REL_NS + "Relationship":
+                targets[el.get("Id", "")] = el.get("Target", "")
+    name, rel_id = sheets[0]
+    target = targets.get(rel_id, "worksheets/sheet1.xml")
+    part = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+    return part, name, len(sheets), date1904
+
+
+def _shared_strings(zf: zipfile.ZipFile, budget, max_chars: int = MAX_CELL_CHARS) -> List[str]:
+    strings: List[str] = []
+    if not _has(zf, "xl/sharedStrings.xml"):
+        return strings
+    root: Optional[Element] = None
+    for event, el in _iter_elements(zf, "xl/sharedStrings.xml", events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = el
+            continue
+        if el.tag == SHEET_NS + "si":
+            # Plain (<t>) or rich text (<r><t>); phonetic runs (<rPh>) are not cell text.
+            phonetic = _phonetic_texts(el)
+            text = "".join(t.text or "" for t in el.iter(SHEET_NS + "t") if t not in phonetic)
+            text = text[:max_chars]
+            strings.append(text)
+            budget.charge(len(text) + 56)
+            root.clear()
+            if len(strings) % CHECK_EVERY == 0:
+                budget.check()
+    return strings
+
+
+def _phonetic_texts(si: Element) -> Set[Element]:
+    return {t for rph in si.iter(SHEET_NS + "rPh") for t in rph.iter(SHEET_NS + "t")}
+
+
+def _date_styles(zf: zipfile.ZipFile) -> Set[int]:
+    """Indexes of cell styles (``s`` attribute) whose number format is a date or time."""
+
+    if not _has(zf, "xl/styles.xml"):
+        return set()
+    custom: Dict[int, str] = {}
+    xf_formats: List[int] = []
+    in_cell_xfs = False
+    for event, el in _iter_elements(zf, "xl/styles.xml", events=("start", "end")):
+        if el.tag == SHEET_NS + "cellXfs":
+            in_cell_xfs = event == "start"
+        elif event == "end" and el.tag == SHEET_NS + "numFmt":
+            custom[int(el.get("numFmtId", "0"))] = el.get("formatCode", "")
+        elif event == "end" and el.tag == SHEET_NS + "xf" and in_cell_xfs:
+            xf_formats.append(int(el.get("numFmtId", "0")))
+
+    def is_date(fmt_id: int) -> bool:
+        if fmt_id in custom:
+            code = _FORMAT_LITERALS_RE.sub("", custom[fmt_id]).lower()
+            return bool(re.search(r"[dmyhs]", code)) and "general" not in code
+        return fmt_id in _DATE_FORMAT_IDS
+
+    return {i for i, fmt_id in enumerate(xf_formats) if is_date(fmt_id)}
+
+
+def _column_index(ref: str, cache: Dict[str, int]) -> int:
+    """0-based column of a cell reference like ``"AB12"`` (-1 if it has none)."""
+
+    letters = ref.rstrip("0123456789")
+    index = cache.get(letters)
+    if index is None:
+        index = 0
+        for ch in letters:
+            if not "A" <= ch <= "Z":
+                return -1
+            index = index * 26 + (ord(ch) - 64)
+        index -= 1
+        cache[letters] = index
+    return index
+
+
+def _serial_to_iso(value: str, epoch: datetime) -> str:
+    try:
+        serial = float(value)
+    except ValueError:
+        return value
+    if not 0 <= serial < 2958466:  # up to 9999-12-31
+        return value
+    moment = epoch + timedelta(days=serial)
+    if serial == int(serial):
+        return moment.date().isoformat()
+    return moment.isoformat(timespec="seconds")
+
+
+class _SheetHandler:
+    """``XMLParser`` target turning worksheet XML into rows without building elements.
+
+    Parsing a sheet with ``iterparse`` costs an Element (and an event) per
+    ``<c>`` and ``<v>``; expat calling these methods directly is several times
+    faster. Finished rows collect in ``rows`` until the reader takes them.
+    """
+
+    def __init__(
+        self,
+        strings: List[str],
+        date_styles: Set[int],
+        epoch: datetime,
+        max_columns: int = MAX_COLUMNS,
+        max_cell_chars: int = MAX_CELL_CHARS,
+    ):
+        self.strings = strings
+        self.max_columns = max_columns
+        self.max_cell_chars = max_cell_chars
+        self.date_styles = {str(i) for i in date_styles}
+        self.epoch = epoch
+        self.rows: List[List[str]] = []
+        self.seen = 0
+        self._columns: Dict[str, int] = {}
+        self._dates: Dict[str, str] = {}
+        self._row: List[str] = []
+        self._parts: List[str] = []
+        self._collected = 0
+        self._collect = False
+        self._in_cell = False
+        self._phonetic = 0
+        self._ref = ""
+        self._kind = "n"
+        self._style = ""
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if tag == _CELL:
+            self._in_cell = True
+            self._ref = attrib.get("r", "")
+            self._kind = attrib.get("t", "n")
+            self._style = attrib.get("s", "")
+            self._parts = []
+            self._collected = 0
+        elif tag == _VALUE or (tag == _CELL_TEXT and self._in_cell and not self._phonetic):
+            self._collect = True
+        elif tag == _PHONETIC:
+            self._phonetic += 1
+        elif tag == _ROW:
+            self._row = []
+
+    def data(self, text: str) -> None:
+        # Text past the cell limit is never kept, so one huge cell costs no memory.
+        if self._collect and self._collected < self.max_cell_chars:
+            self._parts.append(text)
+            self._collected += len(text)
+
+    def end(self, tag: str) -> None:
+        if tag == _VALUE or tag == _CELL_TEXT:
+            self._collect = False
+        elif tag == _PHONETIC:
+            self._phonetic -= 1
+        elif tag == _CELL:
+            self._in_cell = False
+            self._end_cell()
+        elif tag == _ROW:
+            self.seen += 1
+            if any(self._row):
+                self.rows.append(self._row)
+
+    def _end_cell(self) -> None:
+        row = self._row
+        col = _column_index(self._ref, self._columns) if self._ref else len(row)
+        if col < 0:
+            col = len(row)
+        if col >= self.max_columns:
+            return
+        value = "".join(self._parts)
+        kind = self._kind
+        if kind == "s":
+            try:
+                value = self.strings[int(value)]
+            except (ValueError, IndexError):
+                value = ""
+        elif kind == "b":
+            value = "TRUE" if value == "1" else "FALSE"
+        elif kind == "n" and value and self._style in self.date_styles:
+            iso = self._dates.get(value)
+            if iso is None:
+                if len(self._dates) >= 4096:
+                    self._dates.clear()
+                iso = self._dates[value] = _serial_to_iso(value, self.epoch)
+            value = iso
+        if len(value) > self.max_cell_chars:
+            value = value[:self.max_cell_chars]
+        if col == len(row):
+            row.append(value)
+        elif col > len(row):
+            row.extend([""] * (col - len(row)))
+            row.append(value)
+        else:
+            row[col] = value
+
+    def close(self) -> None:
+        pass
+
+
+def iter_xlsx_rows(
+    fileobj: IO[bytes],
+    budget=None,
+    info: Optional[Dict] = None,
+    max_columns: int = MAX_COLUMNS,
+    max_cell_chars: int = MAX_CELL_CHARS,
+) -> Iterator[List[str]]:
+    """Rows of the first worksheet as lists of strings (dates as ISO 8601, booleans as TRUE/FALSE).
+
+    Empty rows are skipped; missing cells inside a row come back as "". Rows
+    hold at most ``max_columns`` cells of at most ``max_cell_chars`` characters.
+    ``info``, if given, receives ``sheet`` and ``sheets``.
+    """
+
+    budget = budget or _NoBudget()
+    zf = _open_zip(fileobj)
+    with zf:
+        part, sheet_name, sheet_count, date1904 = _first_sheet(zf)
+        if info is not None:
+            info.update(sheet=sheet_name, sheets=sheet_count)
+        strings = _shared_strings(zf, budget, max_cell_chars)
+        epoch = datetime(1904, 1, 1) if date1904 else datetime(1899, 12, 30)
+        handler = _SheetHandler(strings, _date_styles(zf), epoch, max_columns, max_cell_chars)
+        parser = XMLParser(target=handler)
+        checked = 0
+        try:
+            with zf.open(part) as stream:
+                for block in iter(lambda: stream.read(FEED_BYTES), b""):
+                    parser.feed(block)
+                    if handler.rows:
+                        yield from handler.rows
+                        handler.rows.clear()
+                    if handler.seen - checked >= CHECK_EVERY:
+                        checked = handler.seen
+                        budget.check()
+                parser.close()
+        except KeyError as exc:
+            raise DocumentError(f"missing part {part}") from exc
+        except ParseError as exc:
+            raise DocumentError(f"malformed XML in {part}: {exc}") from exc
+        except (zipfile.BadZipFile, EOFError, RuntimeError) as exc:
+            raise DocumentError(f"cannot read {part}: {exc}") from exc
+        yield from handler.rows
+
+
+# ---------------------------------------------------------------------------
+# DOCX
+# ---------------------------------------------------------------------------
+
+_PARAGRAPH = WORD_NS + "p"
+_TEXT = WORD_NS + "t"
+_TAB = WORD_NS + "tab"
+_BREAKS = (WORD_NS + "br", WORD_NS + "cr")
+_STYLE = WORD_NS + "pStyle"
+_TABLE = WORD_NS + "tbl"
+
+
+class _DocumentHandler:
+    """``XMLParser`` target collecting paragraph text from ``word/document.xml`` without building elements.
+
+    With ``iterparse``, a paragraph's runs (and a table's rows) stay in memory
+    until the element ends. Here a paragraph keeps at most
+    ``max_paragraph_chars`` characters (the rest is dropped as it is parsed),
+    held text is charged to the budget, and nothing else survives the end of
+    its element. Nested paragraphs (text boxes) come out before the one
+    containing them. Finished paragraphs collect in ``paragraphs`` until the
+    reader takes them.
+    """
+
+    def __init__(self, budget, max_paragraph_chars: int = MAX_PARAGRAPH_CHARS):
+        self.budget = budget
+        self.max_paragraph_chars = max_paragraph_chars
+        self.paragraphs: List[Tuple[str, str]] = []
+        self.held = 0
+        self.tables = 0
+        self.seen = 0
+        # One [style, parts, collected] per open paragraph, innermost last
+        self._open: List[list] = []
+        self._collect = False
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if tag == _PARAGRAPH:
+            self._open.append(["", [], 0])
+        elif not self._open:
+            return
+        elif tag == _TEXT:
+            self._collect = True
+        elif tag == _TAB:
+            self._add("\t")
+        elif tag in _BREAKS:
+            self._add("\n")
+        elif tag == _STYLE:
+            self._open[-1][0] = attrib.get(WORD_NS + "val", "")
+
+    def data(self, text: str) -> None:
+        if self._collect:
+            self._add(text)
+
+    def _add(self, text: str) -> None:
+        paragraph = self._open[-1]
+        room = self.max_paragraph_chars - paragraph[2]
+        if room <= 0:
+            return
+        text = text[:room]
+        paragraph[1].append(text)
+        paragraph[2] += len(text)
+        self.held += len(text)
+        self.budget.charge(len(text))
+
+    def end(self, tag: str) -> None:
+        if tag == _TEXT:
+            self._collect = False
+        elif tag == _PARAGRAPH and self._open:
+            style, parts, _ = self._open.pop()
+            self.paragraphs.append((style, "".join(parts)))
+            self.seen += 1
+        elif tag == _TABLE:
+            self.tables += 1
+
+    def release(self) -> None:
+        """The reader has handed ``paragraphs`` on; their text is no longer held."""
+
+        held = sum(len(text) for _, text in self.paragraphs)
+        self.paragraphs.clear()
+        self.held -= held
+        self.budget.charge(-held)
+
+    def close(self) -> None:
+        pass
+
+
+def iter_docx_paragraphs(
+    fileobj: IO[bytes],
+    budget=None,
+    info: Optional[Dict] = None,
+    max_paragraph_chars: int = MAX_PARAGRAPH_CHARS,
+) -> Iterator[Tuple[str, str]]:
+    """``(style, text)`` for every paragraph of the document body, tables included.
+
+    Paragraph text is cut to ``max_paragraph_chars`` while parsing.
+    ``info``, if given, receives ``tables`` once the body has been read.
+    """
+
+    budget = budget or _NoBudget()
+    zf = _open_zip(fileobj)
+    part = "word/document.xml"
+    with zf:
+        handler = _DocumentHandler(budget, max_paragraph_chars)
+        parser = XMLParser(target=handler)
+        checked = 0
+        try:
+            with zf.open(part) as stream:
+                for block in iter(lambda: stream.read(FEED_BYTES), b""):
+                    parser.feed(block)
+                    if handler.paragraphs:
+                        yield from handler.paragraphs
+                        handler.release()
+                    if handler.seen - checked >= CHECK_EVERY:
+                        checked = handler.seen
+                        budget.check()
+                parser.close()
+        except KeyError as exc:
+            raise DocumentError(f"missing part {part}") from exc
+        except ParseError as exc:
+            raise DocumentError(f"malformed XML in {part}: {exc}") from exc
+        except (zipfile.BadZipFile, EOFError, RuntimeError) as exc:
+            raise DocumentError(f"cannot read {part}: {exc}") from exc
+        yield from handler.paragraphs
+        handler.release()
+        if info is not None:
+            info["tables"] = handler.tables
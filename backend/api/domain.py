@@ -1,9 +1,12 @@
 import hashlib
 import random
+import re
 import time
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 CANONICAL_SYSTEMS: List[str] = [
     "interdependency",
@@ -15,25 +18,31 @@ CANONICAL_SYSTEMS: List[str] = [
 ]
 
 
+LEGACY_SYSTEM_ALIASES: Dict[str, str] = {
+    "dependency": "interdependency",
+    "dependencies": "interdependency",
+    "analysis": "investigation",
+    "research": "investigation",
+    "insights": "interpretation",
+    "reporting": "illustration",
+    "visualization": "illustration",
+    "coordination": "inlignment",
+    "strategy": "inlignment",
+    "alignment": "inlignment",
+    "inlign": "inlignment",
+}
+
+
 def normalize_system_key(system_key: str | None) -> str:
     if not system_key:
         return "investigation"
     k = str(system_key).strip().lower()
+    return LEGACY_SYSTEM_ALIASES.get(k, k)
 
-    legacy_to_canonical = {
-        "dependency": "interdependency",
-        "dependencies": "interdependency",
-        "analysis": "investigation",
-        "research": "investigation",
-        "insights": "interpretation",
-        "reporting": "illustration",
-        "visualization": "illustration",
-        "coordination": "inlignment",
-        "strategy": "inlignment",
-        "alignment": "inlignment",
-        "inlign": "inlignment",
-    }
-    return legacy_to_canonical.get(k, k)
+
+def system_key_aliases(system_key: str) -> List[str]:
+    """Stored system_id values that normalize to ``system_key`` (canonical key first)."""
+    return [system_key] + [alias for alias, canonical in LEGACY_SYSTEM_ALIASES.items() if canonical == system_key]
 
 
 def _clip100(x: float) -> float:
@@ -165,29 +174,406 @@ def compute_org_health(system_scores: List[Dict[str, Any]] | None = None, system
     return {"orgHealth": org_health, "confidence": round(confidence, 3), "breakdown": breakdown}
 
 
+# ---------------------------------------------------------------------------
+# Batch scoring
+#
+# The *_batch functions below score whole portfolios at once. They take dense
+# float arrays whose last axis is the metric (or system) axis, so callers can
+# pass orgs x systems x metrics in one go. Sums are accumulated column by
+# column, in the same order as the scalar loops, so results match
+# score_system / compute_org_health exactly rather than "to within epsilon".
+# ---------------------------------------------------------------------------
+
+
+def _as_float_array(value: Any) -> np.ndarray:
+    return np.asarray(value, dtype=np.float64)
+
+
+def _clip100_array(x: np.ndarray) -> np.ndarray:
+    return np.where(np.isfinite(x), np.clip(x, 0.0, 100.0), 0.0)
+
+
+def _clip01_array(x: np.ndarray) -> np.ndarray:
+    return np.where(np.isfinite(x), np.clip(x, 0.0, 1.0), 0.0)
+
+
+def _round_like_python(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """np.round equivalent of Python's round(x, ndigits) for float arrays.
+
+    np.round scales by 10**ndigits before rounding, which can land on the other
+    side of a .5 tie than Python's correctly-rounded decimal result. Near-ties
+    are therefore re-rounded with the builtin.
+    """
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    out = np.rint(scaled) / scale
+    near_tie = np.isfinite(scaled) & (np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    if near_tie.any():
+        out[near_tie] = [round(float(v), ndigits) for v in values[near_tie]]
+    return out
+
+
+def metrics_to_matrix(
+    rows: Sequence[Dict[str, Any] | None],
+    keys: Optional[Sequence[str]] = None,
+) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """Pack metric dicts into (values, present, keys) for score_systems_batch.
+
+    ``present`` records which keys each dict actually supplied; values that
+    could not be parsed as floats are stored as NaN but still count as present,
+    mirroring how score_system computes coverage.
+    """
+    if keys is None:
+        seen: Dict[str, None] = {}
+        for row in rows:
+            for k in (row or {}):
+                seen.setdefault(k, None)
+        keys = list(seen)
+    keys = list(keys)
+    col = {k: j for j, k in enumerate(keys)}
+
+    values = np.full((len(rows), len(keys)), np.nan, dtype=np.float64)
+    present = np.zeros((len(rows), len(keys)), dtype=bool)
+    for i, row in enumerate(rows):
+        for k, v in (row or {}).items():
+            j = col.get(k)
+            if j is None:
+                continue
+            present[i, j] = True
+            if v is None:
+                continue
+            try:
+                values[i, j] = float(v)
+            except (TypeError, ValueError):
+                pass
+    return values, present, keys
+
+
+def weights_to_vector(weights: Dict[str, Any] | None, keys: Sequence[str], default: float = 1.0) -> np.ndarray:
+    weights = weights or {}
+    out = np.empty(len(keys), dtype=np.float64)
+    for j, k in enumerate(keys):
+        try:
+            out[j] = float(weights.get(k, default))
+        except (TypeError, ValueError):
+            out[j] = default
+    return out
+
+
+def score_systems_batch(
+    metrics_matrix: Any,
+    weights_matrix: Any = None,
+    required_mask: Any = None,
+    present_mask: Any = None,
+    top_k: int = 2,
+) -> Dict[str, np.ndarray]:
+    """Vectorised score_system over an array of shape (..., n_metrics).
+
+    NaN in ``metrics_matrix`` means "not supplied" unless ``present_mask`` says
+    otherwise (see metrics_to_matrix). ``weights_matrix`` broadcasts against the
+    metrics (a single (n_metrics,) vector is the common case) and defaults to 1.
+    ``required_mask`` is an optional (n_metrics,) boolean vector playing the role
+    of ``required_metrics``.
+
+    Returned arrays keep the leading dimensions of the input:
+    score, coverage, n_present, n_valid, inputMetrics (normalised values, -1
+    where unused) and top_idx / top_value / top_weighted with a trailing top_k
+    axis (padded with -1 / NaN).
+    """
+    values = _as_float_array(metrics_matrix)
+    if values.ndim == 0:
+        raise ValueError("metrics_matrix must have at least one dimension")
+    lead = values.shape[:-1]
+    m = values.shape[-1]
+    values = values.reshape(-1, m)
+    n = values.shape[0]
+
+    if present_mask is None:
+        present = ~np.isnan(values)
+    else:
+        present = np.broadcast_to(np.asarray(present_mask, dtype=bool), lead + (m,)).reshape(-1, m)
+    valid = present & np.isfinite(values)
+
+    if weights_matrix is None:
+        weights = np.ones((n, m), dtype=np.float64)
+    else:
+        weights = np.broadcast_to(_as_float_array(weights_matrix), lead + (m,)).reshape(-1, m)
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        unit = (values >= 0.0) & (values <= 1.0)
+        norm = np.where(unit, np.rint(values * 100.0), np.rint(_clip100_array(values)))
+    norm = np.where(valid, norm, 0.0)
+
+    n_present = present.sum(axis=1)
+    n_valid = valid.sum(axis=1)
+
+    w = np.where(valid, weights, 0.0)
+    wsum = np.zeros(n, dtype=np.float64)
+    for j in range(m):
+        wsum = wsum + w[:, j]
+    fallback = wsum <= 0
+    if fallback.any():
+        w = np.where(fallback[:, None], valid.astype(np.float64), w)
+        wsum = np.where(fallback, n_valid.astype(np.float64), wsum)
+
+    acc = np.zeros(n, dtype=np.float64)
+    for j in range(m):
+        acc = acc + norm[:, j] * w[:, j]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(n_valid > 0, acc / np.where(n_valid > 0, wsum, 1.0), 0.0)
+    score = np.rint(_clip100_array(mean)).astype(np.int64)
+
+    required = None if required_mask is None else np.asarray(required_mask, dtype=bool)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if required is not None and required.any():
+            coverage = (valid & required).sum(axis=1) / float(required.sum())
+        else:
+            coverage = np.where(n_present > 0, n_valid / np.maximum(n_present, 1), 0.0)
+    coverage = np.where(n_valid > 0, coverage, 0.0)
+    score = np.where(n_valid > 0, score, 0)
+
+    weighted = np.where(valid, norm * w, -np.inf)
+    k = max(0, int(top_k))
+    order = np.argsort(-weighted, axis=1, kind="stable")[:, :k]
+    top_ok = np.take_along_axis(valid, order, axis=1)
+    top_idx = np.where(top_ok, order, -1)
+    top_value = np.where(top_ok, np.take_along_axis(norm, order, axis=1), np.nan)
+    top_weighted = np.where(top_ok, np.take_along_axis(weighted, order, axis=1), np.nan)
+    if order.shape[1] < k:
+        pad = k - order.shape[1]
+        top_idx = np.pad(top_idx, ((0, 0), (0, pad)), constant_values=-1)
+        top_value = np.pad(top_value, ((0, 0), (0, pad)), constant_values=np.nan)
+        top_weighted = np.pad(top_weighted, ((0, 0), (0, pad)), constant_values=np.nan)
+
+    return {
+        "score": score.reshape(lead),
+        "coverage": coverage.reshape(lead),
+        "n_present": n_present.reshape(lead),
+        "n_valid": n_valid.reshape(lead),
+        "inputMetrics": np.where(valid, norm, -1).astype(np.int64).reshape(lead + (m,)),
+        "top_idx": top_idx.reshape(lead + (k,)),
+        "top_value": top_value.reshape(lead + (k,)),
+        "top_weighted": top_weighted.reshape(lead + (k,)),
+    }
+
+
+def score_result_from_batch(batch: Dict[str, np.ndarray], index: Any, keys: Sequence[str]) -> Dict[str, Any]:
+    """Render one row of score_systems_batch output in score_system's shape."""
+    if int(batch["n_present"][index]) == 0:
+        return {"score": 0, "coverage": 0, "inputMetrics": {}, "rationale": {"top": [], "text": "No data"}}
+    if int(batch["n_valid"][index]) == 0:
+        return {"score": 0, "coverage": 0, "inputMetrics": {}, "rationale": {"top": [], "text": "No valid metrics"}}
+
+    norm_row = batch["inputMetrics"][index]
+    input_metrics = {keys[j]: int(v) for j, v in enumerate(norm_row) if v >= 0}
+    top = []
+    for j, value, weighted in zip(batch["top_idx"][index], batch["top_value"][index], batch["top_weighted"][index]):
+        if j < 0:
+            continue
+        top.append({"key": keys[int(j)], "value": int(value), "weighted": float(weighted)})
+    if top:
+        parts = [f"{t['key']} ({t['value']})" for t in top]
+        text = f"Top drivers: {', '.join(parts)}"
+    else:
+        text = "No strong drivers"
+    return {
+        "score": int(batch["score"][index]),
+        "coverage": float(batch["coverage"][index]),
+        "inputMetrics": input_metrics,
+        "rationale": {"top": top, "text": text},
+    }
+
+
+def compute_org_health_batch(
+    scores_matrix: Any,
+    coverage_matrix: Any,
+    system_weights: Any = None,
+) -> Dict[str, np.ndarray]:
+    """Vectorised compute_org_health over arrays of shape (..., n_systems).
+
+    Columns are systems (CANONICAL_SYSTEMS order by convention); ``system_weights``
+    broadcasts against them and defaults to 1. Returns orgHealth and confidence
+    with the leading dimensions, plus the clipped per-system score / coverage
+    that make up the scalar ``breakdown``.
+    """
+    scores = _as_float_array(scores_matrix)
+    coverage = np.broadcast_to(_as_float_array(coverage_matrix), scores.shape)
+    lead = scores.shape[:-1]
+    s = scores.shape[-1]
+    scores = scores.reshape(-1, s)
+    coverage = coverage.reshape(-1, s)
+    n = scores.shape[0]
+
+    if s == 0:
+        zeros = np.zeros(lead, dtype=np.float64)
+        return {
+            "orgHealth": zeros.astype(np.int64),
+            "confidence": zeros,
+            "score": np.zeros(lead + (0,)),
+            "coverage": np.zeros(lead + (0,)),
+        }
+
+    if system_weights is None:
+        weights = np.ones((n, s), dtype=np.float64)
+    else:
+        weights = np.broadcast_to(_as_float_array(system_weights), lead + (s,)).reshape(-1, s)
+
+    acc = np.zeros(n, dtype=np.float64)
+    wsum = np.zeros(n, dtype=np.float64)
+    for j in range(s):
+        acc = acc + scores[:, j] * weights[:, j]
+        wsum = wsum + weights[:, j]
+    wsum = np.where(wsum <= 0, float(s), wsum)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        org_health = np.rint(_clip100_array(acc / wsum)).astype(np.int64)
+
+    clipped_cov = _clip01_array(coverage)
+    cov_sum = np.zeros(n, dtype=np.float64)
+    for j in range(s):
+        cov_sum = cov_sum + clipped_cov[:, j]
+    confidence = _round_like_python(np.minimum(1.0, 0.5 + 0.5 * (cov_sum / s)), 3)
+
+    return {
+        "orgHealth": org_health.reshape(lead),
+        "confidence": confidence.reshape(lead),
+        "score": _clip100_array(scores).reshape(lead + (s,)),
+        "coverage": clipped_cov.reshape(lead + (s,)),
+    }
+
+
+def org_health_result_from_batch(
+    batch: Dict[str, np.ndarray],
+    index: Any,
+    system_keys: Sequence[str] = CANONICAL_SYSTEMS,
+) -> Dict[str, Any]:
+    """Render one row of compute_org_health_batch output in compute_org_health's shape."""
+    if not len(system_keys):
+        return {"orgHealth": 0, "confidence": 0, "breakdown": []}
+    breakdown = [
+        {"key": normalize_system_key(k), "score": float(sc), "coverage": float(cv)}
+        for k, sc, cv in zip(system_keys, batch["score"][index], batch["coverage"][index])
+    ]
+    return {
+        "orgHealth": int(batch["orgHealth"][index]),
+        "confidence": float(batch["confidence"][index]),
+        "breakdown": breakdown,
+    }
+
+
+# ---------------------------------------------------------------------------
+# System keyword detection
+#
+# Every canonical system name, legacy alias and stem maps to a system. They are
+# compiled into one regex shaped like a trie (shared prefixes factored out,
+# longer keywords tried first), so text is scanned once however many keywords
+# there are and a keyword nested in a longer one ("dependency" in
+# "interdependency") is not counted twice. Matching is on substrings of the
+# lowercased text, as before.
+# ---------------------------------------------------------------------------
+
+SYSTEM_KEYWORD_STEMS: Dict[str, str] = {
+    "investig": "investigation",
+}
+
+
+def system_keywords() -> Dict[str, str]:
+    """Keyword -> canonical system, from CANONICAL_SYSTEMS, LEGACY_SYSTEM_ALIASES and stems."""
+
+    keywords = {k: k for k in CANONICAL_SYSTEMS}
+    keywords.update(LEGACY_SYSTEM_ALIASES)
+    keywords.update(SYSTEM_KEYWORD_STEMS)
+    return keywords
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        ends_here = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends_here:
+            # Greedy "?" prefers the longer keyword, falling back to the one ending here.
+            body = "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+_SYSTEM_KEYWORDS = system_keywords()
+_SYSTEM_KEYWORD_RE = re.compile(_trie_pattern(_SYSTEM_KEYWORDS))
+_MAX_KEYWORD_LEN = max(len(k) for k in _SYSTEM_KEYWORDS)
+
+
+def count_system_keywords(text: str) -> Dict[str, int]:
+    """Keyword hits per canonical system in ``text`` (systems without hits are omitted)."""
+
+    scanner = SystemKeywordScanner()
+    scanner.feed(text)
+    return scanner.counts
+
+
+class SystemKeywordScanner:
+    """Counts system keywords over text fed in pieces (e.g. a streamed file).
+
+    Up to ``_MAX_KEYWORD_LEN - 1`` characters after the last match are carried
+    into the next ``feed`` so keywords split across pieces are still found,
+    and never counted twice.
+    """
+
+    __slots__ = ("counts", "_tail")
+
+    def __init__(self) -> None:
+        self.counts: Dict[str, int] = {}
+        self._tail = ""
+
+    def feed(self, text: str) -> None:
+        buf = self._tail + text.lower()
+        counts = self.counts
+        last_end = 0
+        for m in _SYSTEM_KEYWORD_RE.finditer(buf):
+            system = _SYSTEM_KEYWORDS[m.group()]
+            counts[system] = counts.get(system, 0) + 1
+            last_end = m.end()
+        self._tail = buf[max(last_end, len(buf) - (_MAX_KEYWORD_LEN - 1)):]
+
+
+def systems_from_keyword_counts(counts: Dict[str, int], min_share: float = 0.2) -> Tuple[List[str], int]:
+    """Systems a document is about, most mentioned first, and a 0-100 confidence.
+
+    Systems mentioned less than ``min_share`` as often as the top one are
+    dropped. Confidence grows with the number of hits on the chosen systems.
+    """
+
+    if not counts:
+        return [], 0
+    top = max(counts.values())
+    chosen = sorted((k for k, n in counts.items() if n >= top * min_share), key=lambda k: (-counts[k], CANONICAL_SYSTEMS.index(k)))
+    hits = sum(counts[k] for k in chosen)
+    confidence = int(min(95, 40 + 15 * np.log2(1 + hits)))
+    return chosen, confidence
+
+
 def analyze_filename_or_text(name_or_text: str) -> List[str]:
+    found, _ = systems_from_keyword_counts(count_system_keywords(name_or_text or ""))
+    if found:
+        return found
+
+    # pick two deterministically from the text
     lowered = (name_or_text or "").lower()
-    found = set()
-
-    for k in CANONICAL_SYSTEMS:
-        if k in lowered:
-            found.add(k)
-        if k == "inlignment" and ("alignment" in lowered or "inlign" in lowered):
-            found.add("inlignment")
-        if k == "investigation" and "investig" in lowered:
-            found.add("investigation")
-
-    if not found:
-        # pick two deterministically from the text
-        h = int(hashlib.md5(lowered.encode("utf-8")).hexdigest(), 16)
-        idx1 = h % len(CANONICAL_SYSTEMS)
-        idx2 = (h // 7) % len(CANONICAL_SYSTEMS)
-        if idx2 == idx1:
-            idx2 = (idx2 + 1) % len(CANONICAL_SYSTEMS)
-        found.add(CANONICAL_SYSTEMS[idx1])
-        found.add(CANONICAL_SYSTEMS[idx2])
-
-    return list(found)
+    h = int(hashlib.md5(lowered.encode("utf-8")).hexdigest(), 16)
+    idx1 = h % len(CANONICAL_SYSTEMS)
+    idx2 = (h // 7) % len(CANONICAL_SYSTEMS)
+    if idx2 == idx1:
+        idx2 = (idx2 + 1) % len(CANONICAL_SYSTEMS)
+    return [CANONICAL_SYSTEMS[idx1], CANONICAL_SYSTEMS[idx2]]
 
 
 def make_series(base: int, days: int = 7) -> List[Dict[str, Any]]:
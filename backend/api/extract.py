@@ -0,0 +1,325 @@
+"""Turn analyzed uploads into the per-system metric dicts ``score_system`` consumes.
+
+Two published upload formats are understood (``public/sample-data``):
+
+- financials (``date, revenue, expenses, profit, department``): while the CSV
+  is streamed, ``FinancialSeries`` fits least-squares trends of margin, revenue
+  and expenses over time (over the date column when every date parses, over
+  row order otherwise) in constant memory;
+- surveys (``question_N_score ..., department``): level, dispersion and
+  completeness come straight from the per-column and per-department aggregates
+  that ``api.ingest`` already computes.
+
+``extract_metrics(analysis)`` maps those into 0-100 *signals* (``SIGNALS``) and
+combines them per system (``BASE_METRICS`` plus ``SYSTEM_EMPHASIS``). Metrics
+with no usable signal are left out, so ``score_system``'s coverage shows how
+much of the assessment the upload actually supports.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .domain import CANONICAL_SYSTEMS
+
+METRIC_KEYS: Tuple[str, ...] = ("throughput", "cycle_time", "quality", "predictability")
+
+REVENUE_HEADERS = ("revenue", "revenues", "sales", "turnover")
+EXPENSE_HEADERS = ("expenses", "expense", "costs", "cost", "opex", "spend")
+PROFIT_HEADERS = ("profit", "net_profit", "net_income", "earnings")
+DATE_HEADERS = ("date", "month", "period", "day", "week")
+_SURVEY_RE = re.compile(r"(score|rating|^q\d+|question)")
+
+# Signal -> human description; every signal is a 0-100 score.
+SIGNALS: Dict[str, str] = {
+    "margin_level": "overall profit margin (50% or more scores 100)",
+    "margin_trend": "change of the fitted margin over the period (+/-10pp moves it 50 points)",
+    "margin_stability": "spread of per-row margins (a 20pp standard deviation scores 0)",
+    "revenue_growth": "fitted revenue change over the period relative to its mean",
+    "cost_discipline": "revenue growth minus expense growth",
+    "department_spread": "how evenly margins or survey scores hold up across departments",
+    "survey_level": "mean survey answer on its scale",
+    "survey_consistency": "dispersion of survey answers (half the scale as std scores 0)",
+    "response_rate": "share of survey answers present",
+}
+
+# Signals averaged into each metric, for every system...
+BASE_METRICS: Dict[str, Tuple[str, ...]] = {
+    "throughput": ("margin_trend", "revenue_growth"),
+    "cycle_time": ("cost_discipline",),
+    "quality": ("margin_level", "survey_level"),
+    "predictability": ("margin_stability", "survey_consistency"),
+}
+
+# ...plus what each system weighs in addition.
+SYSTEM_EMPHASIS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "interdependency": {"predictability": ("department_spread",)},
+    "orchestration": {"throughput": ("cost_discipline",)},
+    "investigation": {"quality": ("response_rate",)},
+    "interpretation": {"predictability": ("margin_stability",)},
+    "illustration": {"cycle_time": ("response_rate",)},
+    "inlignment": {"quality": ("department_spread",)},
+}
+
+
+def _normalize_header(header: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", header.lower()).strip("_")
+
+
+def _find(headers: Sequence[str], wanted: Sequence[str]) -> Optional[int]:
+    normalized = [_normalize_header(h) for h in headers]
+    for name in wanted:
+        for i, header in enumerate(normalized):
+            if header == name or header.startswith(name + "_") or header.endswith("_" + name):
+                return i
+    return None
+
+
+def _clip100(x: float) -> Optional[float]:
+    if x is None or not math.isfinite(x):
+        return None
+    return max(0.0, min(100.0, x))
+
+
+class _Fit:
+    """Running least-squares fit of y on x, plus y's mean and variance."""
+
+    __slots__ = ("n", "x0", "sx", "sy", "sxx", "sxy", "syy", "lo", "hi")
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.x0: Optional[float] = None
+        self.sx = self.sy = self.sxx = self.sxy = self.syy = 0.0
+        self.lo = math.inf
+        self.hi = -math.inf
+
+    def add(self, x: np.ndarray, y: np.ndarray) -> None:
+        valid = np.isfinite(x) & np.isfinite(y)
+        if not valid.any():
+            return
+        x, y = x[valid], y[valid]
+        if self.x0 is None:
+            self.x0 = float(x[0])
+        # Centre x on the first value so the sums keep their precision.
+        x = x - self.x0
+        self.n += int(x.size)
+        self.sx += float(x.sum())
+        self.sy += float(y.sum())
+        self.sxx += float(x @ x)
+        self.sxy += float(x @ y)
+        self.syy += float(y @ y)
+        self.lo = min(self.lo, float(x.min()))
+        self.hi = max(self.hi, float(x.max()))
+
+    def as_dict(self) -> Optional[Dict[str, float]]:
+        if not self.n:
+            return None
+        mean = self.sy / self.n
+        var = max(0.0, self.syy / self.n - mean * mean)
+        denom = self.n * self.sxx - self.sx * self.sx
+        slope = (self.n * self.sxy - self.sx * self.sy) / denom if denom > 0 else 0.0
+        return {"n": self.n, "mean": mean, "std": math.sqrt(var), "change": slope * (self.hi - self.lo)}
+
+
+class FinancialSeries:
+    """Streaming trends of a financial upload; fed chunk by chunk by ``api.ingest``."""
+
+    def __init__(self, headers: Sequence[str], revenue: int, expenses: Optional[int], profit: Optional[int], date: Optional[int]):
+        self.headers = list(headers)
+        self.revenue = revenue
+        self.expenses = expenses
+        self.profit = profit
+        self.date = date
+        self.rows = 0
+        self.dates_ok = date is not None
+        self.revenue_sum = 0.0
+        self.profit_sum = 0.0
+        # One set of fits over row order and one over dates; dates win if all of them parse.
+        self.by_row = {"margin": _Fit(), "revenue": _Fit(), "expenses": _Fit()}
+        self.by_date = {"margin": _Fit(), "revenue": _Fit(), "expenses": _Fit()}
+
+    @classmethod
+    def for_headers(cls, headers: Sequence[str]) -> Optional["FinancialSeries"]:
+        revenue = _find(headers, REVENUE_HEADERS)
+        expenses = _find(headers, EXPENSE_HEADERS)
+        profit = _find(headers, PROFIT_HEADERS)
+        if revenue is None or (expenses is None and profit is None):
+            return None
+        return cls(headers, revenue, expenses, profit, _find(headers, DATE_HEADERS))
+
+    def add_chunk(self, numbers: List[np.ndarray], cells: List[Sequence[str]]) -> None:
+        revenue = numbers[self.revenue]
+        expenses = numbers[self.expenses] if self.expenses is not None else None
+        if self.profit is not None:
+            profit = numbers[self.profit]
+        else:
+            profit = revenue - expenses
+        if expenses is None:
+            expenses = revenue - profit
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            margin = np.where(revenue > 0, profit / revenue, np.nan)
+        both = np.isfinite(margin)
+        self.revenue_sum += float(revenue[both].sum())
+        self.profit_sum += float(profit[both].sum())
+
+        series = {"margin": margin, "revenue": revenue, "expenses": expenses}
+        rows = np.arange(self.rows, self.rows + revenue.size, dtype=np.float64)
+        self.rows += revenue.size
+        for key, values in series.items():
+            self.by_row[key].add(rows, values)
+
+        if self.dates_ok:
+            try:
+                days = np.array([v.strip()[:10] for v in cells[self.date]], dtype="datetime64[D]")
+            except ValueError:
+                self.dates_ok = False
+            else:
+                x = days.astype(np.float64)
+                x[np.isnat(days)] = np.nan
+                for key, values in series.items():
+                    self.by_date[key].add(x, values)
+
+    def as_dict(self) -> Dict[str, Any]:
+        fits = self.by_date if self.dates_ok and self.by_date["margin"].n else self.by_row
+        return {
+            "columns": {
+                role: self.headers[i] if i is not None else None
+                for role, i in (("revenue", self.revenue), ("expenses", self.expenses), ("profit", self.profit), ("date", self.date))
+            },
+            "axis": "date" if fits is self.by_date else "row",
+            "marginLevel": self.profit_sum / self.revenue_sum if self.revenue_sum > 0 else None,
+            **{key: fit.as_dict() for key, fit in fits.items()},
+        }
+
+
+def _dispersion(values: List[float], weights: List[float]) -> Optional[float]:
+    """Weighted standard deviation across groups (None for fewer than two groups)."""
+
+    v, w = np.asarray(values, dtype=np.float64), np.asarray(weights, dtype=np.float64)
+    if v.size < 2 or w.sum() <= 0:
+        return None
+    mean = np.average(v, weights=w)
+    return math.sqrt(float(np.average((v - mean) ** 2, weights=w)))
+
+
+def _group_sum(group: Dict[str, Any], column: Optional[str]) -> Optional[float]:
+    stats = group["metrics"].get(column) if column else None
+    return stats["sum"] if stats else None
+
+
+def _financial_signals(analysis: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    fin = analysis.get("financials")
+    if not fin:
+        return {}
+    out: Dict[str, Optional[float]] = {}
+    if fin["marginLevel"] is not None:
+        out["margin_level"] = _clip100(fin["marginLevel"] * 200)
+    if fin["margin"]:
+        out["margin_trend"] = _clip100(50 + fin["margin"]["change"] * 500)
+        out["margin_stability"] = _clip100(100 - fin["margin"]["std"] * 500)
+    revenue, expenses = fin["revenue"], fin["expenses"]
+    if revenue and revenue["mean"] > 0:
+        growth = revenue["change"] / revenue["mean"]
+        out["revenue_growth"] = _clip100(50 + growth * 100)
+        if expenses and expenses["mean"] > 0:
+            out["cost_discipline"] = _clip100(50 + (growth - expenses["change"] / expenses["mean"]) * 100)
+
+    departments = analysis.get("departments")
+    if departments:
+        cols = fin["columns"]
+        margins, weights = [], []
+        for group in departments["groups"]:
+            rev = _group_sum(group, cols["revenue"])
+            profit = _group_sum(group, cols["profit"])
+            if profit is None and rev is not None:
+                expense = _group_sum(group, cols["expenses"])
+                profit = rev - expense if expense is not None else None
+            if rev and rev > 0 and profit is not None:
+                margins.append(profit / rev)
+                weights.append(rev)
+        spread = _dispersion(margins, weights)
+        if spread is not None:
+            out["department_spread"] = _clip100(100 - spread * 500)
+    return out
+
+
+def _survey_scale(lo: float, hi: float) -> Optional[Tuple[float, float]]:
+    for top in (5.0, 7.0, 10.0, 100.0):
+        if hi <= top:
+            return (1.0 if lo >= 1 and top <= 10 else 0.0), top
+    return None
+
+
+def _survey_signals(analysis: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    columns = [
+        c for c in analysis.get("columns", [])
+        if c["type"] == "numeric" and _SURVEY_RE.search(_normalize_header(c["name"]))
+    ]
+    if not columns:
+        return {}
+    scale = _survey_scale(min(c["min"] for c in columns), max(c["max"] for c in columns))
+    if scale is None:
+        return {}
+    low, top = scale
+    span = top - low
+
+    present = np.array([c["count"] - c["missing"] for c in columns], dtype=np.float64)
+    total = float(sum(c["count"] for c in columns))
+    means = (np.array([c["mean"] for c in columns]) - low) / span
+    stds = np.array([c["std"] for c in columns]) / span
+    out: Dict[str, Optional[float]] = {
+        "survey_level": _clip100(float(np.average(means, weights=present)) * 100) if present.sum() else None,
+        "survey_consistency": _clip100(100 - float(np.average(stds, weights=present)) * 200) if present.sum() else None,
+        "response_rate": _clip100(present.sum() / total * 100) if total else None,
+    }
+
+    departments = analysis.get("departments")
+    if departments:
+        names = [c["name"] for c in columns]
+        levels, weights = [], []
+        for group in departments["groups"]:
+            stats = [group["metrics"][n] for n in names if n in group["metrics"]]
+            if stats:
+                levels.append((float(np.mean([s["mean"] for s in stats])) - low) / span)
+                weights.append(group["rows"])
+        spread = _dispersion(levels, weights)
+        if spread is not None:
+            out["survey_spread"] = _clip100(100 - spread * 400)
+    return out
+
+
+def extract_signals(analysis: Dict[str, Any]) -> Dict[str, int]:
+    """0-100 signals (see ``SIGNALS``) supported by an ``api.ingest`` analysis."""
+
+    financial = _financial_signals(analysis)
+    survey = _survey_signals(analysis)
+    # Both formats can speak to department spread; average them when a file has both.
+    spreads = [v for v in (financial.pop("department_spread", None), survey.pop("survey_spread", None)) if v is not None]
+    merged = {**financial, **survey}
+    if spreads:
+        merged["department_spread"] = sum(spreads) / len(spreads)
+    return {key: int(round(value)) for key, value in merged.items() if value is not None}
+
+
+def system_metrics(signals: Dict[str, int], system_id: str) -> Dict[str, int]:
+    """Metric dict for ``score_system``; metrics without any signal are omitted."""
+
+    emphasis = SYSTEM_EMPHASIS.get(system_id, {})
+    metrics: Dict[str, int] = {}
+    for key in METRIC_KEYS:
+        values = [signals[s] for s in BASE_METRICS[key] + emphasis.get(key, ()) if s in signals]
+        if values:
+            metrics[key] = int(round(sum(values) / len(values)))
+    return metrics
+
+
+def extract_metrics(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Signals plus per-system metric dicts for every canonical system."""
+
+    signals = extract_signals(analysis)
+    return {"signals": signals, "systems": {s: system_metrics(signals, s) for s in CANONICAL_SYSTEMS}}
@@ -0,0 +1,194 @@
+"""Read-only fast path for list serializers: ``values_list()`` rows straight to dicts.
+
+``ModelSerializer(rows, many=True)`` builds a model instance per row and then,
+for every field of every row, goes through ``get_attribute`` and
+``to_representation`` (and ``SerializerMethodField`` dispatch). For read-heavy
+list endpoints, ``ValuesSerializer`` selects only the serializer's columns with
+``values_list()`` and turns each tuple into the same dict: same keys, same
+order, same values. Each field's converter is resolved once per request, and
+values that are already JSON-ready (strings, ints, bools, JSON fields) are
+copied as they are.
+
+A serializer opts in with a ``values_fields`` attribute that maps each of its
+``SerializerMethodField``s to ``(column, converter)``; the converter gets the
+raw column value, ``None`` included. ``column`` may be a tuple of columns, in
+which case the converter gets a tuple of their values, and a converter
+wrapped in ``with_context`` is built once per request from the serializer
+context (e.g. to build absolute URLs). Other fields are read from their
+``source`` column. ``api.pagination.paginated`` uses this path whenever the
+serializer opts in.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import FileSystemStorage
+from django.utils.encoding import filepath_to_uri
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+Converter = Optional[Callable[[Any], Any]]
+
+# DRF fields whose to_representation returns database values unchanged
+_PASSTHROUGH = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def str_or_none(value) -> Optional[str]:
+    """``str(obj.<fk>_id) if obj.<fk>_id else None``, the usual id method field."""
+
+    return str(value) if value else None
+
+
+def default_if_none(default) -> Callable[[Any], Any]:
+    """Converter for columns reached through a LEFT JOIN: ``None`` means the related row is missing."""
+
+    return lambda value: default if value is None else value
+
+
+def with_context(factory: Callable[[Dict[str, Any]], Callable[[Any], Any]]):
+    """Mark a ``values_fields`` converter as a factory taking the serializer context."""
+
+    factory.needs_context = True
+    return factory
+
+
+def supports_values(serializer_class) -> bool:
+    return getattr(serializer_class, "values_fields", None) is not None
+
+
+def _file_converter(field: serializers.FileField, model_field) -> Callable[[Any], Any]:
+    """``FileField.to_representation`` from the stored file name instead of a ``FieldFile``.
+
+    For ``FileSystemStorage`` the (absolute) media URL prefix is built once
+    rather than going through ``urljoin`` and ``build_absolute_uri`` per row.
+    """
+
+    use_url = getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL)
+    request = field.context.get("request")
+    storage = model_field.storage
+    prefix = None
+    if use_url and isinstance(storage, FileSystemStorage):
+        prefix = request.build_absolute_uri(storage.base_url) if request is not None else storage.base_url
+
+    def url(name):
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    def convert(name):
+        if not name:
+            return None
+        if not use_url:
+            return name
+        if prefix is None:
+            return url(name)
+        path = filepath_to_uri(name).lstrip("/")
+        if path.startswith(".") or "/." in path:  # urljoin would normalise these segments
+            return url(name)
+        return prefix + path
+
+    return convert
+
+
+def _datetime_converter(field: serializers.DateTimeField) -> Callable[[Any], Any]:
+    """``DateTimeField.to_representation`` with the output time zone looked up once, not per value."""
+
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+    tz = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+    if tz is None:
+        return field.to_representation
+
+    def convert(value):
+        if isinstance(value, str) or value.utcoffset() is None:
+            return field.to_representation(value)
+        text = value.astimezone(tz).isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+    return convert
+
+
+def _converter(field: serializers.Field, model) -> Converter:
+    if isinstance(field, serializers.JSONField):
+        return None if not field.binary else field.to_representation
+    if isinstance(field, serializers.ChoiceField) and not isinstance(field, serializers.MultipleChoiceField):
+        return None
+    if isinstance(field, _PASSTHROUGH):
+        return None
+    if isinstance(field, serializers.UUIDField) and field.uuid_format == "hex_verbose":
+        return str
+    if isinstance(field, serializers.FloatField):
+        return float
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, serializers.FileField):
+        return _file_converter(field, model._meta.get_field(field.source))
+    return field.to_representation
+
+
+def _row_converter(indexes: List[int], convert: Callable[[Any], Any]) -> Callable[[Sequence[Any]], Any]:
+    return lambda row: convert(tuple(row[i] for i in indexes))
+
+
+class ValuesSerializer:
+    """Renders ``values_list(*self.columns)`` rows like ``serializer_class(many=True).data``.
+
+    With ``fields`` (``api.fieldsets``), only those fields are rendered and only their columns selected.
+    """
+
+    def __init__(self, serializer_class, context: Optional[Dict[str, Any]] = None, fields: Optional[Sequence[str]] = None):
+        method_fields = getattr(serializer_class, "values_fields", None)
+        if method_fields is None:
+            raise ImproperlyConfigured(f"{serializer_class.__name__} has no values_fields")
+        serializer = serializer_class(context=context or {})
+        model = serializer_class.Meta.model
+
+        columns: List[str] = []
+        # (output key, column index or None for the whole row, converter, None bypasses the converter)
+        plan: List[Tuple[str, Optional[int], Converter, bool]] = []
+        for name, field in serializer.fields.items():
+            if field.write_only or (fields is not None and name not in fields):
+                continue
+            if name in method_fields:
+                column, convert = method_fields[name]
+                skip_none = False
+                if getattr(convert, "needs_context", False):
+                    convert = convert(serializer.context)
+                if isinstance(column, tuple):
+                    for col in column:
+                        if col not in columns:
+                            columns.append(col)
+                    plan.append((name, None, _row_converter([columns.index(col) for col in column], convert), False))
+                    continue
+            elif isinstance(field, serializers.SerializerMethodField) or field.source == "*" or "." in field.source:
+                raise ImproperlyConfigured(f"{serializer_class.__name__}.{name} needs a values_fields entry")
+            else:
+                column, convert, skip_none = field.source, _converter(field, model), True
+            if column not in columns:
+                columns.append(column)
+            plan.append((name, columns.index(column), convert, skip_none))
+
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self._plan = plan
+
+    def to_representation(self, rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+        """Rows may carry extra trailing columns (e.g. pagination keys); they are ignored."""
+
+        plan = self._plan
+        data = []
+        for row in rows:
+            item = {}
+            for name, index, convert, skip_none in plan:
+                value = row if index is None else row[index]
+                if convert is not None and not (skip_none and value is None):
+                    value = convert(value)
+                item[name] = value
+            data.append(item)
+        return data
@@ -0,0 +1,85 @@
+"""Sparse fieldsets: ``?fields=a,b,c`` limits a response to those serializer fields.
+
+Visitor rows carry large JSON columns (``assessment_data``,
+``current_answers``) and uploads and jobs do too (``summary``,
+``analyzed_preview``, ``payload``, ``result``), while most screens show a few
+scalar columns. With ``?fields=`` the columns behind unrequested fields are
+not selected at all, so they are neither transferred nor decoded: paginated
+lists select only the requested columns with ``values_list()``
+(``api.fastserialize``), and single-object reads ``defer()`` the columns of the
+fields left out. Requested fields keep the serializer's order; unknown names
+are a 400. Without ``?fields=`` responses are unchanged.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+
+FIELDS_PARAM = "fields"
+
+
+class FieldsetError(ValueError):
+    """``?fields=`` names a field the serializer doesn't have."""
+
+
+def readable_fields(serializer_class, context=None) -> List[str]:
+    return [name for name, field in serializer_class(context=context or {}).fields.items() if not field.write_only]
+
+
+def requested_fields(request, serializer_class, context=None) -> Optional[Tuple[str, ...]]:
+    """The ``?fields=`` names in the serializer's order, or None for all fields; raises ``FieldsetError``."""
+
+    raw = request.query_params.get(FIELDS_PARAM)
+    if raw is None:
+        return None
+    names = {name.strip() for name in raw.split(",") if name.strip()}
+    if not names:
+        return None
+    available = readable_fields(serializer_class, context)
+    unknown = sorted(names.difference(available))
+    if unknown:
+        raise FieldsetError(f"unknown field(s) {', '.join(unknown)}; available: {', '.join(available)}")
+    return tuple(name for name in available if name in names)
+
+
+def _columns(serializer_class, names: Iterable[str], context=None) -> set:
+    """Concrete model fields backing the named serializer fields (method fields via ``values_fields``)."""
+
+    model = serializer_class.Meta.model
+    method_fields = getattr(serializer_class, "values_fields", None) or {}
+    fields = serializer_class(context=context or {}).fields
+    columns = set()
+    for name in names:
+        sources = method_fields[name][0] if name in method_fields else fields[name].source
+        for source in sources if isinstance(sources, tuple) else (sources,):
+            try:
+                field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.primary_key:
+                columns.add(field.name)
+    return columns
+
+
+def sparse_queryset(qs: QuerySet, serializer_class, fields: Optional[Tuple[str, ...]], keep: Iterable[str] = (), context=None) -> QuerySet:
+    """``qs`` deferring the columns only unrequested fields need (``keep``: columns the caller reads itself)."""
+
+    if fields is None:
+        return qs
+    unrequested = [name for name in readable_fields(serializer_class, context) if name not in fields]
+    deferred = _columns(serializer_class, unrequested, context) - _columns(serializer_class, fields, context) - set(keep)
+    return qs.defer(*sorted(deferred)) if deferred else qs
+
+
+def sparse_serializer(serializer_class, instance, fields: Optional[Tuple[str, ...]], **kwargs):
+    """A serializer for ``instance`` (or ``many=True`` rows) without the unrequested fields (their method fields don't run)."""
+
+    serializer = serializer_class(instance, **kwargs)
+    if fields is not None:
+        target = getattr(serializer, "child", serializer)  # many=True
+        for name in [name for name in target.fields if name not in fields]:
+            target.fields.pop(name)
+    return serializer
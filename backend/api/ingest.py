@@ -0,0 +1,595 @@
+"""Streaming analysis of uploaded CSV, XLSX and DOCX files.
+
+``analyze_csv`` reads a binary file object through ``csv`` (``analyze_xlsx``
+through ``api.documents.iter_xlsx_rows``) in chunks of ``CHUNK_ROWS`` rows
+(or ``CHUNK_CHARS`` characters of cell text, whichever comes first),
+transposes each chunk into columns and folds it into fixed-size running
+aggregates with NumPy, so memory stays flat however large the file is:
+
+- per column: count, missing, inferred type, mean / std (merged per chunk with
+  Chan's parallel update), min, max, distinct count (exact up to
+  ``MAX_DISTINCT``) and the most frequent values (a mergeable Misra-Gries
+  summary with ``TOP_K_SLOTS`` counters);
+- per department (first column named like "department", "dept", "team", ...):
+  row count and sum / mean / min / max of every numeric column, for up to
+  ``MAX_DEPARTMENTS`` departments (the rest are folded into "(other)");
+- for financial files (revenue plus expenses or profit): margin, revenue and
+  expense trends, via ``api.extract.FinancialSeries``;
+- system keyword hits over the whole text (``api.domain.SystemKeywordScanner``),
+  fed in batches of ``SCAN_BATCH_LINES`` lines (or ``SCAN_BATCH_CHARS``).
+
+XLSX rows are cut to the columns the analysis keeps and to ``XLSX_CELL_CHARS``
+per cell while the sheet is parsed: a zip can expand a small upload into
+gigabytes of cell text, and only the cut rows are ever held.
+
+``analyze_docx`` streams a Word document's paragraphs, cut to
+``DOCX_PARAGRAPH_CHARS`` while parsing, into text statistics and the keyword
+scanner. Every analysis runs under a per-file ``Budget`` (CPU
+seconds and retained memory, ``INGEST_MAX_CPU_SECONDS`` /
+``INGEST_MAX_MEMORY_BYTES``); exceeding it fails the file.
+
+The result is a compact JSON-ready dict stored in ``Upload.analyzed_preview``
+by the ``ingest_upload`` job (see ``api.jobs``).
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import hashlib
+import io
+import math
+import re
+import time
+from collections import Counter
+from itertools import islice
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+
+from .documents import DocumentError, iter_docx_paragraphs, iter_xlsx_rows
+from .domain import SystemKeywordScanner
+from .extract import FinancialSeries
+
+# Bump when the shape or meaning of the analysis changes; cached analyses of other versions are recomputed.
+ANALYSIS_VERSION = 2
+
+CHUNK_ROWS = 8192
+CHUNK_CHARS = 16 * 1024 * 1024
+SNIFF_BYTES = 64 * 1024
+MAX_COLUMNS = 200
+MAX_DISTINCT = 1000
+MAX_DEPARTMENTS = 100
+TOP_K_SLOTS = 32
+TOP_K_REPORT = 5
+MAX_VALUE_CHARS = 80
+PROGRESS_EVERY_ROWS = 50_000
+HASH_BLOCK_BYTES = 1024 * 1024
+SCAN_BATCH_LINES = 4096
+SCAN_BATCH_CHARS = 4 * 1024 * 1024
+# Cell text kept from XLSX sheets: values use MAX_VALUE_CHARS of it, the keyword scan all of it.
+XLSX_CELL_CHARS = 1024
+# Text kept per DOCX paragraph (a 64K-character paragraph is already ~10k words)
+DOCX_PARAGRAPH_CHARS = 64 * 1024
+MAX_HEADINGS = 50
+
+BLANK_DEPARTMENT = "(blank)"
+OTHER_DEPARTMENT = "(other)"
+DEPARTMENT_HEADERS = ("department", "dept", "team", "division", "business_unit", "unit", "function")
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2})?)?")
+
+
+class IngestError(ValueError):
+    """The file cannot be analyzed (unparseable, or over its budget); retrying will not help."""
+
+
+class Budget:
+    """Per-file resource budget: CPU time of the analyzing thread and retained memory.
+
+    ``check()`` and ``charge(nbytes)`` raise ``IngestError`` once either limit
+    is exceeded. Memory is what the analysis holds on to (e.g. an XLSX shared
+    string table), as charged by the readers; streamed data is not counted.
+    """
+
+    def __init__(self, cpu_seconds: Optional[float] = None, memory_bytes: Optional[int] = None):
+        self.cpu_seconds = float(cpu_seconds if cpu_seconds is not None else getattr(settings, "INGEST_MAX_CPU_SECONDS", 300))
+        self.memory_bytes = int(memory_bytes if memory_bytes is not None else getattr(settings, "INGEST_MAX_MEMORY_BYTES", 256 * 1024 * 1024))
+        self.memory = 0
+        self._started = time.thread_time()
+
+    def check(self) -> None:
+        used = time.thread_time() - self._started
+        if self.cpu_seconds > 0 and used > self.cpu_seconds:
+            raise IngestError(f"file exceeds the CPU budget ({self.cpu_seconds:g}s)")
+
+    def charge(self, nbytes: int) -> None:
+        self.memory += nbytes
+        if self.memory_bytes > 0 and self.memory > self.memory_bytes:
+            raise IngestError(f"file exceeds the memory budget ({self.memory_bytes:,} bytes)")
+
+
+def _as_number(value: str) -> float:
+    try:
+        num = float(value)
+    except ValueError:
+        return math.nan
+    return num if math.isfinite(num) else math.nan
+
+
+def _round(value: Optional[float], places: int = 4) -> Optional[float]:
+    return None if value is None else round(float(value), places)
+
+
+class ColumnStats:
+    """Running statistics for one column, in O(MAX_DISTINCT + TOP_K_SLOTS) memory."""
+
+    __slots__ = ("name", "count", "missing", "numeric", "dates", "mean", "m2", "lo", "hi", "distinct", "distinct_capped", "top", "textual")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.missing = 0
+        self.numeric = 0
+        self.dates = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.lo = math.inf
+        self.hi = -math.inf
+        self.distinct: set = set()
+        self.distinct_capped = False
+        self.top: Dict[str, int] = {}
+        # Set once a whole chunk had values but no numbers; later chunks skip number parsing.
+        self.textual = False
+
+    def add_chunk(self, cells: Sequence[str]) -> np.ndarray:
+        """Fold a chunk of raw cells in; returns their numeric values (NaN where none)."""
+
+        values = [v.strip() for v in cells]
+        self.count += len(values)
+        missing = values.count("")
+        self.missing += missing
+
+        nums = self._parse(values)
+        finite = ~np.isnan(nums)
+        n_num = int(finite.sum())
+        if n_num:
+            self._merge_numbers(nums[finite])
+        elif missing < len(values):
+            self.textual = True
+
+        if n_num == len(values) - missing:
+            texts = []
+        elif n_num:
+            texts = [v for v, is_num in zip(values, finite) if v and not is_num]
+        else:
+            texts = [v for v in values if v]
+        if texts:
+            self.dates += sum(1 for v in texts if _DATE_RE.match(v))
+            self._merge_top(Counter(v[:MAX_VALUE_CHARS] for v in texts))
+
+        if not self.distinct_capped:
+            self.distinct.update(hash(v) for v in values if v)
+            if len(self.distinct) > MAX_DISTINCT:
+                self.distinct_capped = True
+                self.distinct = set()
+        return nums
+
+    def _parse(self, values: List[str]) -> np.ndarray:
+        if self.textual:
+            return np.full(len(values), np.nan)
+        try:
+            # Fast path: every cell in the chunk is a number.
+            nums = np.asarray(values, dtype=np.float64)
+        except ValueError:
+            nums = np.fromiter((_as_number(v) for v in values), dtype=np.float64, count=len(values))
+        nums[~np.isfinite(nums)] = np.nan
+        return nums
+
+    def _merge_numbers(self, chunk: np.ndarray) -> None:
+        n_a, n_b = self.numeric, chunk.size
+        mean_b = float(chunk.mean())
+        m2_b = float(((chunk - mean_b) ** 2).sum())
+        delta = mean_b - self.mean
+        total = n_a + n_b
+        self.mean += delta * n_b / total
+        self.m2 += m2_b + delta * delta * n_a * n_b / total
+        self.numeric = total
+        self.lo = min(self.lo, float(chunk.min()))
+        self.hi = max(self.hi, float(chunk.max()))
+
+    def _merge_top(self, counts: Counter) -> None:
+        # Misra-Gries merge: any value with frequency > n / TOP_K_SLOTS is guaranteed to survive.
+        top = self.top
+        for value, n in counts.items():
+            top[value] = top.get(value, 0) + n
+        if len(top) > TOP_K_SLOTS:
+            cut = sorted(top.values(), reverse=True)[TOP_K_SLOTS]
+            self.top = {value: n - cut for value, n in top.items() if n > cut}
+
+    @property
+    def kind(self) -> str:
+        present = self.count - self.missing
+        if not present:
+            return "empty"
+        if self.numeric >= 0.9 * present:
+            return "numeric"
+        if self.dates >= 0.9 * present:
+            return "date"
+        return "text"
+
+    def as_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "name": self.name,
+            "type": self.kind,
+            "count": self.count,
+            "missing": self.missing,
+            "distinct": MAX_DISTINCT if self.distinct_capped else len(self.distinct),
+            "distinctCapped": self.distinct_capped,
+        }
+        if self.kind == "numeric":
+            std = math.sqrt(self.m2 / (self.numeric - 1)) if self.numeric > 1 else 0.0
+            out.update(mean=_round(self.mean), std=_round(std), min=_round(self.lo), max=_round(self.hi))
+        else:
+            top = sorted(self.top.items(), key=lambda kv: (-kv[1], kv[0]))[:TOP_K_REPORT]
+            out["top"] = [value for value, _ in top]
+        return out
+
+
+class DepartmentStats:
+    """Per-department row counts and numeric column aggregates, in fixed-size arrays."""
+
+    def __init__(self, column: str, n_columns: int):
+        self.column = column
+        size = MAX_DEPARTMENTS + 1  # last slot collects overflow departments
+        self.names: Dict[str, int] = {}
+        self.rows = np.zeros(size, dtype=np.int64)
+        self.n = np.zeros((n_columns, size), dtype=np.int64)
+        self.sum = np.zeros((n_columns, size))
+        self.lo = np.full((n_columns, size), np.inf)
+        self.hi = np.full((n_columns, size), -np.inf)
+
+    def _code(self, name: str) -> int:
+        code = self.names.get(name)
+        if code is None:
+            if len(self.names) >= MAX_DEPARTMENTS:
+                return MAX_DEPARTMENTS
+            code = self.names[name] = len(self.names)
+        return code
+
+    def add_chunk(self, cells: Sequence[str], numbers: List[np.ndarray]) -> None:
+        size = self.rows.size
+        codes = np.fromiter(
+            (self._code(v.strip()[:MAX_VALUE_CHARS] or BLANK_DEPARTMENT) for v in cells), dtype=np.int64, count=len(cells)
+        )
+        self.rows += np.bincount(codes, minlength=size)
+        for i, nums in enumerate(numbers):
+            valid = ~np.isnan(nums)
+            if not valid.any():
+                continue
+            c, v = codes[valid], nums[valid]
+            self.n[i] += np.bincount(c, minlength=size)
+            self.sum[i] += np.bincount(c, weights=v, minlength=size)
+            np.minimum.at(self.lo[i], c, v)
+            np.maximum.at(self.hi[i], c, v)
+
+    def as_dict(self, headers: List[str], numeric_cols: List[int]) -> Dict[str, Any]:
+        labels = [(code, name) for name, code in self.names.items()]
+        if self.rows[MAX_DEPARTMENTS]:
+            labels.append((MAX_DEPARTMENTS, OTHER_DEPARTMENT))
+        groups = []
+        for code, name in sorted(labels, key=lambda cn: -int(self.rows[cn[0]])):
+            metrics = {}
+            for i in numeric_cols:
+                n = int(self.n[i, code])
+                if not n:
+                    continue
+                total = float(self.sum[i, code])
+                metrics[headers[i]] = {
+                    "sum": _round(total),
+                    "mean": _round(total / n),
+                    "min": _round(self.lo[i, code]),
+                    "max": _round(self.hi[i, code]),
+                }
+            groups.append({"name": name, "rows": int(self.rows[code]), "metrics": metrics})
+        return {"column": self.column, "groups": groups, "truncated": bool(self.rows[MAX_DEPARTMENTS])}
+
+
+def _department_column(headers: List[str]) -> Optional[int]:
+    normalized = [re.sub(r"[^a-z]+", "_", h.lower()).strip("_") for h in headers]
+    for wanted in DEPARTMENT_HEADERS:
+        for i, name in enumerate(normalized):
+            if name == wanted or name.startswith(wanted + "_") or name.endswith("_" + wanted):
+                return i
+    return None
+
+
+def _sniff_dialect(sample: str):
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        return csv.excel
+
+
+def file_sha256(fileobj: IO[bytes]) -> str:
+    """SHA-256 of a binary file object's content; rewinds it afterwards."""
+
+    raw = getattr(fileobj, "file", fileobj)
+    raw.seek(0)
+    digest = hashlib.sha256()
+    for block in iter(lambda: raw.read(HASH_BLOCK_BYTES), b""):
+        digest.update(block)
+    raw.seek(0)
+    return digest.hexdigest()
+
+
+def scan_keywords(fileobj: IO[bytes], scanner: SystemKeywordScanner, limit_bytes: Optional[int] = None) -> None:
+    """Feed a binary file's text (UTF-8, undecodable bytes dropped) to ``scanner``; rewinds it afterwards."""
+
+    raw = getattr(fileobj, "file", fileobj)
+    raw.seek(0)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    remaining = limit_bytes
+    while remaining is None or remaining > 0:
+        block = raw.read(HASH_BLOCK_BYTES if remaining is None else min(HASH_BLOCK_BYTES, remaining))
+        if not block:
+            break
+        if remaining is not None:
+            remaining -= len(block)
+        scanner.feed(decoder.decode(block))
+    scanner.feed(decoder.decode(b"", final=True))
+    raw.seek(0)
+
+
+def _scanned_lines(text: IO[str], scanner: SystemKeywordScanner):
+    """Yield ``text``'s lines for ``csv.reader`` while feeding them to ``scanner`` in batches."""
+
+    lines = iter(text)
+    while True:
+        batch = list(islice(lines, SCAN_BATCH_LINES))
+        if not batch:
+            return
+        scanner.feed("".join(batch))
+        yield from batch
+
+
+def analyze_csv(
+    fileobj: IO[bytes],
+    progress: Optional[Callable[[int], None]] = None,
+    budget: Optional[Budget] = None,
+) -> Dict[str, Any]:
+    """Stream ``fileobj`` (binary, UTF-8) and return a compact statistical summary.
+
+    ``progress(rows)`` is called roughly every ``PROGRESS_EVERY_ROWS`` rows,
+    e.g. to extend the job's lease on long files.
+    """
+
+    started = time.perf_counter()
+    # Django File objects proxy to the underlying OS file; wrap that directly.
+    text = io.TextIOWrapper(getattr(fileobj, "file", fileobj), encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        result = _analyze(text, progress, budget or Budget())
+    finally:
+        # Leave the caller's file open (a collected TextIOWrapper closes its buffer).
+        text.detach()
+    result["elapsedMs"] = int((time.perf_counter() - started) * 1000)
+    return result
+
+
+def _analyze(text: io.TextIOWrapper, progress: Optional[Callable[[int], None]], budget: Budget) -> Dict[str, Any]:
+    dialect = _sniff_dialect(text.read(SNIFF_BYTES))
+    text.seek(0)
+    keywords = SystemKeywordScanner()
+    reader = csv.reader(_scanned_lines(text, keywords), dialect)
+    try:
+        result = _analyze_rows(reader, progress, budget)
+    except csv.Error as exc:
+        raise IngestError(f"CSV parse error on line {reader.line_num}: {exc}") from exc
+    return {
+        "format": "csv",
+        **result,
+        "delimiter": getattr(dialect, "delimiter", ","),
+        "keywords": keywords.counts,
+    }
+
+
+def analyze_xlsx(
+    fileobj: IO[bytes],
+    progress: Optional[Callable[[int], None]] = None,
+    budget: Optional[Budget] = None,
+) -> Dict[str, Any]:
+    """Like ``analyze_csv``, over the first worksheet of an XLSX workbook (header in its first row)."""
+
+    started = time.perf_counter()
+    budget = budget or Budget()
+    keywords = SystemKeywordScanner()
+    info: Dict[str, Any] = {}
+    try:
+        # One column past MAX_COLUMNS, so the result can still say the sheet had more.
+        rows = iter_xlsx_rows(fileobj, budget, info, max_columns=MAX_COLUMNS + 1, max_cell_chars=XLSX_CELL_CHARS)
+        result = _analyze_rows(_scanned_rows(rows, keywords), progress, budget)
+    except DocumentError as exc:
+        raise IngestError(str(exc)) from exc
+    return {
+        "format": "xlsx",
+        **result,
+        "sheet": info.get("sheet"),
+        "sheets": info.get("sheets"),
+        "keywords": keywords.counts,
+        "elapsedMs": int((time.perf_counter() - started) * 1000),
+    }
+
+
+def analyze_docx(
+    fileobj: IO[bytes],
+    progress: Optional[Callable[[int], None]] = None,
+    budget: Optional[Budget] = None,
+) -> Dict[str, Any]:
+    """Text statistics and system keyword hits of a Word document, streamed paragraph by paragraph."""
+
+    started = time.perf_counter()
+    budget = budget or Budget()
+    keywords = SystemKeywordScanner()
+    info: Dict[str, Any] = {}
+    paragraphs = words = characters = 0
+    headings: List[str] = []
+    batch: List[str] = []
+    chars = 0
+    try:
+        for style, text in iter_docx_paragraphs(fileobj, budget, info, max_paragraph_chars=DOCX_PARAGRAPH_CHARS):
+            if not text.strip():
+                continue
+            paragraphs += 1
+            words += len(text.split())
+            characters += len(text)
+            if style.lower().startswith(("heading", "title")) and len(headings) < MAX_HEADINGS:
+                headings.append(text.strip()[:MAX_VALUE_CHARS])
+            batch.append(text)
+            chars += len(text)
+            if len(batch) == SCAN_BATCH_LINES or chars >= SCAN_BATCH_CHARS:
+                keywords.feed("\n".join(batch) + "\n")
+                batch.clear()
+                chars = 0
+                if progress:
+                    progress(paragraphs)
+    except DocumentError as exc:
+        raise IngestError(str(exc)) from exc
+    keywords.feed("\n".join(batch))
+    if not paragraphs:
+        raise IngestError("document has no text")
+    return {
+        "format": "docx",
+        "paragraphs": paragraphs,
+        "words": words,
+        "characters": characters,
+        "tables": info.get("tables", 0),
+        "headings": headings,
+        "keywords": keywords.counts,
+        "elapsedMs": int((time.perf_counter() - started) * 1000),
+    }
+
+
+# Upload extension -> analyzer; files of other types are not ingested (PDF has no stdlib reader).
+ANALYZERS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "csv": analyze_csv,
+    "xlsx": analyze_xlsx,
+    "docx": analyze_docx,
+}
+
+
+def ingest_format(filename: str) -> Optional[str]:
+    """The ``ANALYZERS`` key for ``filename``, or None if the file type is not analyzed."""
+
+    ext = filename.lower().rsplit(".", 1)[-1] if "." in filename else ""
+    return ext if ext in ANALYZERS else None
+
+
+def analyze_upload(
+    fileobj: IO[bytes],
+    fmt: str,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Dict[str, Any]:
+    """Analyze ``fileobj`` as ``fmt`` ("csv", "xlsx" or "docx") within a fresh per-file ``Budget``."""
+
+    try:
+        analyzer = ANALYZERS[fmt]
+    except KeyError:
+        raise IngestError(f"unsupported format {fmt!r}") from None
+    return analyzer(fileobj, progress=progress, budget=Budget())
+
+
+def _scanned_rows(rows: Iterable[List[str]], scanner: SystemKeywordScanner):
+    """Yield ``rows`` while feeding their text cells to ``scanner`` in batches."""
+
+    batch: List[str] = []
+    chars = 0
+    for row in rows:
+        line = "\t".join(row)
+        batch.append(line)
+        chars += len(line)
+        if len(batch) == SCAN_BATCH_LINES or chars >= SCAN_BATCH_CHARS:
+            scanner.feed("\n".join(batch) + "\n")
+            batch.clear()
+            chars = 0
+        yield row
+    scanner.feed("\n".join(batch))
+
+
+def _analyze_rows(
+    reader: Iterable[List[str]],
+    progress: Optional[Callable[[int], None]],
+    budget: Budget,
+) -> Dict[str, Any]:
+    """Fold rows (the first one being the header) into column, department and financial aggregates."""
+
+    reader = iter(reader)
+    try:
+        raw_headers = next(reader)
+    except StopIteration:
+        raise IngestError("file is empty") from None
+
+    headers = [h.strip() or f"column_{i + 1}" for i, h in enumerate(raw_headers[:MAX_COLUMNS])]
+    n_cols = len(headers)
+    columns = [ColumnStats(h) for h in headers]
+    dept_idx = _department_column(headers)
+    departments = DepartmentStats(headers[dept_idx], n_cols) if dept_idx is not None else None
+    financials = FinancialSeries.for_headers(headers)
+
+    rows = 0
+    ragged = 0
+    next_progress = PROGRESS_EVERY_ROWS
+    chunk: List[List[str]] = []
+    chunk_chars = 0
+
+    def flush() -> None:
+        cells = list(zip(*chunk))
+        numbers = [col.add_chunk(cells[i]) for i, col in enumerate(columns)]
+        if departments is not None:
+            departments.add_chunk(cells[dept_idx], numbers)
+        if financials is not None:
+            financials.add_chunk(numbers, cells)
+        chunk.clear()
+        budget.check()
+
+    for row in reader:
+        if not row or (len(row) == 1 and not row[0].strip()):
+            continue
+        if len(row) != len(raw_headers):
+            ragged += 1
+        if len(row) != n_cols:
+            row = row[:n_cols] + [""] * (n_cols - len(row))
+        chunk.append(row)
+        chunk_chars += sum(map(len, row))
+        if len(chunk) == CHUNK_ROWS or chunk_chars >= CHUNK_CHARS:
+            rows += len(chunk)
+            flush()
+            chunk_chars = 0
+            if progress and rows >= next_progress:
+                progress(rows)
+                next_progress = rows + PROGRESS_EVERY_ROWS
+    if chunk:
+        rows += len(chunk)
+        flush()
+
+    numeric_cols = [i for i, col in enumerate(columns) if col.kind == "numeric" and i != dept_idx]
+    return {
+        "rows": rows,
+        "raggedRows": ragged,
+        "columns": [col.as_dict() for col in columns],
+        "columnsTruncated": len(raw_headers) > MAX_COLUMNS,
+        "departments": departments.as_dict(headers, numeric_cols) if departments is not None else None,
+        "financials": financials.as_dict() if financials is not None else None,
+    }
+
+
+def summary_text(analysis: Dict[str, Any]) -> str:
+    """One-line human summary for ``Upload.summary``."""
+
+    if analysis.get("format") == "docx":
+        return f"Analyzed {analysis['paragraphs']:,} paragraphs, {analysis['words']:,} words"
+    numeric = sum(1 for c in analysis["columns"] if c["type"] == "numeric")
+    parts = [f"{analysis['rows']:,} rows", f"{len(analysis['columns'])} columns ({numeric} numeric)"]
+    if analysis.get("departments"):
+        parts.append(f"{len(analysis['departments']['groups'])} departments")
+    return "Analyzed " + ", ".join(parts)
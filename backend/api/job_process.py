@@ -0,0 +1,16 @@
+"""Process-pool bootstrap for ``process_jobs --pool process``.
+
+Kept free of model imports: spawned children unpickle the initializer before
+Django's app registry is ready, then run ``api.jobs.process_job_id``.
+"""
+
+import signal
+
+
+def init_worker() -> None:
+    import django
+
+    # The parent owns shutdown: children finish their current job instead of dying mid-write.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    django.setup()
@@ -0,0 +1,850 @@
+"""Job queue worker.
+
+Workers claim pending jobs in batches and flip them to ``running`` under their
+own ``claimed_by`` token, so several ``process_jobs`` processes (or containers)
+can drain the same table without processing a job twice.
+
+Each batch is first split between organizations by weighted fair share of
+running jobs (weights per subscription tier, capped per tenant), so one
+tenant's backlog cannot starve the others. Each tenant's share is then claimed:
+
+- PostgreSQL: candidate rows are locked with ``SELECT ... FOR UPDATE SKIP LOCKED``
+  so concurrent workers never wait on, or pick, each other's rows.
+- SQLite (no row locks): jobs are claimed with a single conditional
+  ``UPDATE ... WHERE id IN (oldest pending) AND status = 'pending'``; SQLite
+  serialises writers, so each row is flipped by exactly one worker.
+
+A claim is a lease (``JOB_LEASE_SECONDS``). Daemon workers heartbeat to extend
+it while jobs run; if a worker dies, ``reap_expired_leases`` puts its jobs back
+in the queue. Failed attempts are retried with exponential backoff via
+``next_attempt_at`` until ``max_attempts`` is reached, then marked failed.
+
+Job kinds: ``analysis`` (mock scoring; batches are written in bulk),
+``ingest_upload`` (streams an uploaded CSV, XLSX or DOCX file through
+``api.ingest``) and ``index_upload`` (adds an upload to its org's search index,
+``api.search``).
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import Count, F, Max, Min
+from django.utils import timezone
+
+from .domain import CANONICAL_SYSTEMS, SystemKeywordScanner, count_system_keywords, normalize_system_key, systems_from_keyword_counts
+from .extract import extract_metrics
+from .ingest import ANALYSIS_VERSION, IngestError, analyze_upload, file_sha256, ingest_format, scan_keywords, summary_text
+from .job_process import init_worker
+from .materialized import record_assessment_runs
+from .models import AssessmentRun, Job, Notification, Organization, Upload, UploadAnalysis
+from .search import index_upload
+
+logger = logging.getLogger(__name__)
+
+LEASE_LOST = "lease_lost"
+
+# Errors caused by the job's input: fail immediately instead of retrying.
+PERMANENT_ERRORS = (IngestError,)
+
+
+class LeaseLost(Exception):
+    """The job's lease expired and it was re-queued while this worker still held it."""
+
+
+def make_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def lease_duration() -> timedelta:
+    return timedelta(seconds=max(1, int(getattr(settings, "JOB_LEASE_SECONDS", 60))))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff before the next attempt: base * 2^(attempts-1), capped, with +/-20% jitter."""
+
+    base = float(getattr(settings, "JOB_RETRY_BASE_SECONDS", 5))
+    cap = float(getattr(settings, "JOB_RETRY_MAX_SECONDS", 900))
+    delay = min(cap, base * (2 ** max(0, attempts - 1)))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+@dataclass
+class TenantQueue:
+    """One organization's share of the queue when planning a claim."""
+
+    org_id: object
+    weight: float
+    running: int
+    due: int
+    top_priority: int
+    oldest_due: datetime
+
+
+def _tenant_queues(now: datetime) -> List[TenantQueue]:
+    due = (
+        Job.objects.filter(status=Job.Status.PENDING, next_attempt_at__lte=now)
+        .values("organization_id")
+        .annotate(n=Count("id"), top=Max("priority"), oldest=Min("next_attempt_at"))
+    )
+    stats = {row["organization_id"]: row for row in due}
+    if not stats:
+        return []
+    running = dict(
+        Job.objects.filter(status=Job.Status.RUNNING)
+        .values("organization_id")
+        .annotate(n=Count("id"))
+        .values_list("organization_id", "n")
+    )
+    tiers = dict(Organization.objects.filter(id__in=[k for k in stats if k]).values_list("id", "subscription_tier"))
+    weights = getattr(settings, "JOB_TIER_WEIGHTS", {})
+    return [
+        TenantQueue(
+            org_id=org_id,
+            weight=max(0.01, float(weights.get(tiers.get(org_id), 1.0))),
+            running=int(running.get(org_id, 0)),
+            due=int(row["n"]),
+            top_priority=int(row["top"]),
+            oldest_due=row["oldest"],
+        )
+        for org_id, row in stats.items()
+    ]
+
+
+def plan_claims(queues: List[TenantQueue], limit: int, max_running: int = 0) -> Dict[object, int]:
+    """Split ``limit`` claim slots across tenants by weighted fair share.
+
+    Each slot goes to the tenant with the lowest ``(running + planned) / weight``
+    that still has due work and is under ``max_running`` (0 = uncapped); ties go
+    to the tenant with the higher-priority job, then the longest-waiting one.
+    Because ``running`` comes from the database, the share is fair across all
+    workers, not just this one. Returns ``{org_id: slots}``.
+    """
+
+    planned: Dict[object, int] = {}
+    heap = [(q.running / q.weight, -q.top_priority, q.oldest_due, i) for i, q in enumerate(queues)]
+    heapq.heapify(heap)
+    remaining = limit
+    while heap and remaining > 0:
+        _load, prio, oldest, i = heapq.heappop(heap)
+        q = queues[i]
+        taken = planned.get(q.org_id, 0)
+        if taken >= q.due or (max_running and q.running + taken >= max_running):
+            continue
+        planned[q.org_id] = taken + 1
+        remaining -= 1
+        heapq.heappush(heap, ((q.running + taken + 1) / q.weight, prio, oldest, i))
+    return planned
+
+
+def claim_jobs(worker_id: str, limit: int) -> List[Job]:
+    """Atomically lease up to ``limit`` due pending jobs to this worker.
+
+    Slots are shared fairly between organizations (see ``plan_claims``);
+    within an organization jobs run by priority, then by due time. The
+    per-tenant cap is checked before claiming, so concurrent workers can
+    overshoot it by at most one batch between them.
+    """
+
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    claim = dict(
+        status=Job.Status.RUNNING,
+        claimed_by=worker_id,
+        claimed_at=now,
+        heartbeat_at=now,
+        lease_expires_at=now + lease_duration(),
+        attempts=F("attempts") + 1,
+        updated_at=now,
+    )
+    plan = plan_claims(_tenant_queues(now), limit, int(getattr(settings, "JOB_TENANT_MAX_RUNNING", 0)))
+    if not plan:
+        return []
+
+    def tenant_pending(org_id):
+        qs = Job.objects.filter(status=Job.Status.PENDING, next_attempt_at__lte=now)
+        qs = qs.filter(organization__isnull=True) if org_id is None else qs.filter(organization_id=org_id)
+        return qs.order_by("-priority", "next_attempt_at", "created_at")
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = []
+            for org_id, slots in plan.items():
+                ids += tenant_pending(org_id).select_for_update(skip_locked=True).values_list("id", flat=True)[:slots]
+            if not ids:
+                return []
+            Job.objects.filter(id__in=ids).update(**claim)
+    else:
+        # One statement per tenant, so SQLite takes the write lock up front
+        # instead of upgrading a read lock (which fails immediately under contention).
+        claimed = 0
+        for org_id, slots in plan.items():
+            claimed += Job.objects.filter(
+                id__in=tenant_pending(org_id).values("id")[:slots], status=Job.Status.PENDING
+            ).update(**claim)
+        if not claimed:
+            return []
+
+    return list(
+        Job.objects.filter(status=Job.Status.RUNNING, claimed_by=worker_id, claimed_at=now)
+        .select_related("organization", "upload")
+        .order_by("-priority", "next_attempt_at", "created_at")
+    )
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def queue_stats(window: timedelta) -> List[Dict[str, object]]:
+    """Per-tenant queue depth and wait times, for checking scheduling fairness.
+
+    Wait time is ``claimed_at - next_attempt_at`` (how long a due job sat in the
+    queue before a worker took it) over jobs claimed within ``window``.
+    """
+
+    now = timezone.now()
+    tenants: Dict[object, Dict[str, object]] = {}
+
+    def tenant(org_id):
+        return tenants.setdefault(org_id, {"pending": 0, "due": 0, "running": 0, "oldest_due": None, "waits": []})
+
+    pending = Job.objects.filter(status=Job.Status.PENDING).values("organization_id")
+    for row in pending.annotate(n=Count("id")):
+        tenant(row["organization_id"])["pending"] = row["n"]
+    for row in pending.filter(next_attempt_at__lte=now).annotate(n=Count("id"), oldest=Min("next_attempt_at")):
+        t = tenant(row["organization_id"])
+        t["due"] = row["n"]
+        t["oldest_due"] = row["oldest"]
+    for row in Job.objects.filter(status=Job.Status.RUNNING).values("organization_id").annotate(n=Count("id")):
+        tenant(row["organization_id"])["running"] = row["n"]
+    claimed = Job.objects.filter(claimed_at__gte=now - window).exclude(status=Job.Status.PENDING)
+    for org_id, claimed_at, due_at in claimed.values_list("organization_id", "claimed_at", "next_attempt_at").iterator():
+        tenant(org_id)["waits"].append(max(0.0, (claimed_at - due_at).total_seconds()))
+
+    orgs = {
+        org.id: org
+        for org in Organization.objects.filter(id__in=[k for k in tenants if k]).only("id", "name", "slug", "subscription_tier")
+    }
+    weights = getattr(settings, "JOB_TIER_WEIGHTS", {})
+    out = []
+    for org_id, t in tenants.items():
+        org = orgs.get(org_id)
+        waits = sorted(t["waits"])
+        out.append({
+            "orgId": str(org_id) if org_id else None,
+            "orgName": org.name if org else None,
+            "orgSlug": org.slug if org else None,
+            "weight": float(weights.get(org.subscription_tier if org else None, 1.0)),
+            "pending": t["pending"],
+            "due": t["due"],
+            "running": t["running"],
+            "oldestDueAgeSeconds": round((now - t["oldest_due"]).total_seconds(), 3) if t["oldest_due"] else None,
+            "claimed": len(waits),
+            "waitSeconds": {
+                "avg": round(sum(waits) / len(waits), 3) if waits else None,
+                "p50": round(_percentile(waits, 50), 3) if waits else None,
+                "p95": round(_percentile(waits, 95), 3) if waits else None,
+                "max": round(waits[-1], 3) if waits else None,
+            },
+        })
+    out.sort(key=lambda row: (-row["due"], -row["running"], row["orgSlug"] or ""))
+    return out
+
+
+def heartbeat(worker_id: str) -> int:
+    """Extend the lease on every job this worker is running."""
+
+    now = timezone.now()
+    return Job.objects.filter(status=Job.Status.RUNNING, claimed_by=worker_id).update(
+        heartbeat_at=now,
+        lease_expires_at=now + lease_duration(),
+    )
+
+
+def fail_or_retry(
+    job_id,
+    worker_id: str,
+    attempts: int,
+    max_attempts: int,
+    error: str,
+    now: Optional[datetime] = None,
+    expired_before: Optional[datetime] = None,
+) -> int:
+    """Release a running job: back to pending with backoff, or failed when out of attempts.
+
+    Only applies while ``worker_id`` still holds the job (and, with
+    ``expired_before``, while its lease expires before then); returns rows updated.
+    """
+
+    now = now or timezone.now()
+    held = Job.objects.filter(id=job_id, status=Job.Status.RUNNING, claimed_by=worker_id)
+    if expired_before is not None:
+        held = held.filter(lease_expires_at__lt=expired_before)
+    release = dict(claimed_by="", lease_expires_at=None, error=error[:2000], updated_at=now)
+    if attempts >= max_attempts:
+        return held.update(status=Job.Status.FAILED, **release)
+    return held.update(status=Job.Status.PENDING, next_attempt_at=now + retry_delay(attempts), **release)
+
+
+def reap_expired_leases(limit: int = 500) -> int:
+    """Re-queue running jobs whose worker stopped heartbeating."""
+
+    now = timezone.now()
+    expired = (
+        Job.objects.filter(status=Job.Status.RUNNING, lease_expires_at__lt=now)
+        .order_by("lease_expires_at")
+        .values_list("id", "claimed_by", "attempts", "max_attempts")[:limit]
+    )
+    reaped = 0
+    for job_id, worker_id, attempts, max_attempts in expired:
+        # expired_before: a heartbeat since the SELECT renewed the lease, and the worker keeps its job.
+        reaped += fail_or_retry(
+            job_id, worker_id, attempts, max_attempts, f"lease expired (worker {worker_id})", now, expired_before=now
+        )
+    return reaped
+
+
+@dataclass
+class JobOutput:
+    """A job's computed result and the (unsaved) rows completing it will write."""
+
+    job: Job
+    result: Dict[str, object]
+    run: Optional[AssessmentRun]
+    notification: Notification
+
+
+def analyze_job(job: Job) -> JobOutput:
+    """Run the (mock) analysis for a claimed job. Does not touch the database."""
+
+    system_id = normalize_system_key(job.system_id or job.payload.get("system") or job.payload.get("systemId"))
+    if system_id not in CANONICAL_SYSTEMS:
+        system_id = ""
+
+    score = max(10, min(99, int(40 + random.random() * 50)))
+    result = {
+        "jobId": str(job.id),
+        "status": "completed",
+        "timestamp": int(time.time() * 1000),
+        "orgId": str(job.organization_id) if job.organization_id else None,
+        "system": system_id or None,
+        "score": score,
+        "summary": f"Auto-generated analysis for {job.name or 'upload'}",
+    }
+
+    run = None
+    if job.organization_id and system_id:
+        run = AssessmentRun(
+            organization=job.organization,
+            system_id=system_id,
+            title=f"{system_id.title()} Assessment",
+            score=score,
+            coverage=1.0,
+            timestamp_ms=result["timestamp"],
+            meta={"job": str(job.id), "source": "process_jobs"},
+        )
+    notification = Notification(
+        organization=job.organization,
+        channel=Notification.Channel.EMAIL if job.notify_to else Notification.Channel.INTERNAL,
+        to=job.notify_to or "",
+        subject=f"Analysis ready for {job.name or system_id or 'your upload'}",
+        body=f"Your analysis is ready. Score: {score}%\n\nSummary: {result['summary']}",
+        timestamp_ms=result["timestamp"],
+        meta={"jobId": str(job.id)},
+    )
+    return JobOutput(job=job, result=result, run=run, notification=notification)
+
+
+def _mark_completed(job: Job, result: Dict[str, object], now: datetime) -> None:
+    job.status = Job.Status.COMPLETED
+    job.result = result
+    job.error = ""
+    job.lease_expires_at = None
+    job.updated_at = now
+
+
+def _attempt_failed(job: Job, exc: Exception) -> str:
+    logger.error("Job %s attempt %s failed", job.id, job.attempts, exc_info=exc)
+    # Bad input fails the job straight away; anything else may be transient and is retried.
+    max_attempts = job.attempts if isinstance(exc, PERMANENT_ERRORS) else job.max_attempts
+    if not fail_or_retry(job.id, job.claimed_by, job.attempts, max_attempts, str(exc)):
+        return LEASE_LOST
+    job.refresh_from_db(fields=["status", "error", "next_attempt_at", "claimed_by", "lease_expires_at"])
+    return job.status
+
+
+def extend_lease(job: Job) -> bool:
+    """Heartbeat a single long-running job; False if the lease was already lost."""
+
+    now = timezone.now()
+    return bool(
+        Job.objects.filter(id=job.id, status=Job.Status.RUNNING, claimed_by=job.claimed_by).update(
+            heartbeat_at=now,
+            lease_expires_at=now + lease_duration(),
+        )
+    )
+
+
+def _complete(job: Job, result: Dict[str, object], now: datetime) -> None:
+    """Mark the job completed (inside the caller's transaction) if we still hold it."""
+
+    completed = Job.objects.filter(id=job.id, status=Job.Status.RUNNING, claimed_by=job.claimed_by).update(
+        status=Job.Status.COMPLETED,
+        result=result,
+        error="",
+        lease_expires_at=None,
+        updated_at=now,
+    )
+    if not completed:
+        raise LeaseLost(str(job.id))
+
+
+def _analyze_upload(upload: Upload, fmt: str, keep_alive: Callable[[int], None]) -> Tuple[UploadAnalysis, bool]:
+    """Analysis for the upload's content: reused by SHA-256 when cached, else computed (as ``fmt``) and cached.
+
+    Returns ``(analysis, cached)``.
+    """
+
+    with upload.file.open("rb") as fh:
+        # Uploads are hashed while they stream in; only legacy rows need hashing here.
+        sha256 = upload.sha256 or file_sha256(fh)
+        cached = UploadAnalysis.objects.filter(sha256=sha256, version=ANALYSIS_VERSION).first()
+        if cached is not None:
+            return cached, True
+        analysis = analyze_upload(fh, fmt, progress=keep_alive)
+
+    # Another worker may have analyzed the same content meanwhile; keep the first row.
+    record, created = UploadAnalysis.objects.get_or_create(
+        sha256=sha256,
+        version=ANALYSIS_VERSION,
+        defaults={
+            "analysis": analysis,
+            "metrics": extract_metrics(analysis),
+            "rows": analysis.get("rows", 0),
+            "elapsed_ms": analysis["elapsedMs"],
+        },
+    )
+    return record, not created
+
+
+def analysis_preview(preview: Dict, record: UploadAnalysis, name: str = "") -> Dict:
+    """``Upload.analyzed_preview`` once ``record`` is known for the upload's content.
+
+    Systems detected from keywords in the whole file (plus ``name``) replace the
+    guess made from the upload's first bytes; without any hits the guess stays.
+    """
+
+    preview = {
+        **(preview or {}),
+        "status": "analyzed",
+        "analysis": record.analysis,
+        "signals": record.metrics.get("signals", {}),
+    }
+    counts = dict(record.analysis.get("keywords") or {})
+    for system, n in count_system_keywords(name).items():
+        counts[system] = counts.get(system, 0) + n
+    systems, confidence = systems_from_keyword_counts(counts)
+    if systems:
+        preview.update(detected=systems, confidence=confidence, keywordHits=counts)
+    return preview
+
+
+def process_ingest_job(job: Job) -> str:
+    """Analyze the job's uploaded CSV, XLSX or DOCX file (``api.ingest``) and link the upload to the result.
+
+    Analyses are cached by content hash; uploads of already analyzed content
+    are linked to the cached analysis on upload and never get a job.
+    """
+
+    try:
+        upload = job.upload
+        if upload is None or not upload.file:
+            raise IngestError("upload has no stored file")
+
+        def keep_alive(_rows: int) -> None:
+            if not extend_lease(job):
+                raise LeaseLost(str(job.id))
+
+        # Jobs queued before XLSX/DOCX support carry no format; they were all CSVs.
+        fmt = job.payload.get("format") or ingest_format(upload.name) or "csv"
+        record, cached = _analyze_upload(upload, fmt, keep_alive)
+        analysis = record.analysis
+        preview = analysis_preview(upload.analyzed_preview, record, upload.name)
+        result = {
+            "jobId": str(job.id),
+            "status": "completed",
+            "uploadId": str(upload.id),
+            "sha256": record.sha256,
+            "cached": cached,
+            "format": analysis.get("format", fmt),
+            "rows": analysis.get("rows", 0),
+            "columns": len(analysis.get("columns", ())),
+            "elapsedMs": analysis["elapsedMs"],
+        }
+        now = timezone.now()
+        with transaction.atomic():
+            _complete(job, result, now)
+            Upload.objects.filter(id=upload.id).update(
+                sha256=record.sha256,
+                analysis=record,
+                analyzed_systems=preview.get("detected", upload.analyzed_systems),
+                analyzed_preview=preview,
+                summary=summary_text(analysis),
+            )
+        _mark_completed(job, result, now)
+        return Job.Status.COMPLETED
+    except LeaseLost:
+        logger.warning("Job %s lost its lease before completing; discarded this attempt", job.id)
+        return LEASE_LOST
+    except Exception as exc:
+        return _attempt_failed(job, exc)
+
+
+def keyword_preview(upload: Upload) -> Optional[Dict]:
+    """``analyzed_preview`` with the systems found in the upload's whole text (and name), or None without hits.
+
+    Plain-text uploads are only scanned by their first bytes on upload; their
+    index job scans the rest.
+    """
+
+    scanner = SystemKeywordScanner()
+    scanner.feed(upload.name)
+    with upload.file.open("rb") as fh:
+        scan_keywords(fh, scanner)
+    systems, confidence = systems_from_keyword_counts(scanner.counts)
+    if not systems:
+        return None
+    return {**(upload.analyzed_preview or {}), "detected": systems, "confidence": confidence, "keywordHits": scanner.counts}
+
+
+def process_index_job(job: Job) -> str:
+    """Add the job's upload to its organization's search index (``api.search``).
+
+    Jobs of plain-text uploads (``payload.keywords``) also detect the upload's
+    systems from its whole text.
+    """
+
+    try:
+        upload = job.upload
+        if upload is None:
+            raise IngestError("upload no longer exists")
+        started = time.perf_counter()
+        preview = keyword_preview(upload) if job.payload.get("keywords") and upload.file else None
+        document = index_upload(upload)
+        result = {
+            "jobId": str(job.id),
+            "status": "completed",
+            "uploadId": str(upload.id),
+            "terms": document.term_count if document is not None else 0,
+            "length": document.length if document is not None else 0,
+            "elapsedMs": int((time.perf_counter() - started) * 1000),
+        }
+        if preview is not None:
+            result["detected"] = preview["detected"]
+        now = timezone.now()
+        with transaction.atomic():
+            _complete(job, result, now)
+            if preview is not None:
+                Upload.objects.filter(id=upload.id).update(analyzed_systems=preview["detected"], analyzed_preview=preview)
+        _mark_completed(job, result, now)
+        return Job.Status.COMPLETED
+    except LeaseLost:
+        logger.warning("Job %s lost its lease before completing; discarded this attempt", job.id)
+        return LEASE_LOST
+    except Exception as exc:
+        return _attempt_failed(job, exc)
+
+
+def process_job(job: Job) -> str:
+    """Run one claimed job, producing a score and a notification.
+
+    The job's writes commit together, and only if this worker still holds the
+    lease. Errors reschedule the job with backoff until it runs out of attempts.
+    """
+
+    if job.kind == Job.Kind.INGEST_UPLOAD:
+        return process_ingest_job(job)
+    if job.kind == Job.Kind.INDEX_UPLOAD:
+        return process_index_job(job)
+    try:
+        out = analyze_job(job)
+        now = timezone.now()
+        with transaction.atomic():
+            _complete(job, out.result, now)
+            if out.run is not None:
+                out.run.save(force_insert=True)
+                record_assessment_runs([out.run])
+            out.notification.save(force_insert=True)
+        _mark_completed(job, out.result, now)
+        return Job.Status.COMPLETED
+    except LeaseLost:
+        logger.warning("Job %s lost its lease before completing; discarded this attempt", job.id)
+        return LEASE_LOST
+    except Exception as exc:
+        return _attempt_failed(job, exc)
+
+
+def process_jobs_bulk(jobs: List[Job]) -> Dict[object, str]:
+    """Run a claimed batch and write all of its results in one transaction.
+
+    Instead of three-plus autocommitted statements per job, the batch costs a
+    lease check, two UPDATEs of the jobs (a ``bulk_update`` for the results),
+    ``bulk_create`` of the runs and notifications, and the rollup upserts.
+    Failures stay per job: an analysis error reschedules only that job, and if
+    the flush itself fails the batch falls back to ``process_job`` one job at a
+    time. Jobs whose lease was lost are skipped; jobs of other kinds (upload
+    ingestion and indexing) are processed one by one. Returns ``{job_id: status}``.
+    """
+
+    statuses: Dict[object, str] = {}
+    outputs: List[JobOutput] = []
+    for job in jobs:
+        if job.kind != Job.Kind.ANALYSIS:
+            statuses[job.id] = process_job(job)
+            continue
+        try:
+            outputs.append(analyze_job(job))
+        except Exception as exc:
+            statuses[job.id] = _attempt_failed(job, exc)
+    if not outputs:
+        return statuses
+
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            # Touch the rows first: this takes the write lock (row locks on
+            # PostgreSQL, the database lock on SQLite) before reading who holds them.
+            held_by = Job.objects.filter(
+                id__in=[out.job.id for out in outputs],
+                status=Job.Status.RUNNING,
+                claimed_by__in={out.job.claimed_by for out in outputs},
+            )
+            held_by.update(heartbeat_at=now)
+            holders = dict(held_by.values_list("id", "claimed_by"))
+
+            flushed = [out for out in outputs if holders.get(out.job.id) == out.job.claimed_by]
+            for out in flushed:
+                _mark_completed(out.job, out.result, now)
+            # Only ``result`` differs per job; keep the CASE expression bulk_update builds to that one column.
+            Job.objects.filter(id__in=[out.job.id for out in flushed]).update(
+                status=Job.Status.COMPLETED, error="", lease_expires_at=None, updated_at=now
+            )
+            Job.objects.bulk_update([out.job for out in flushed], ["result"])
+            runs = [out.run for out in flushed if out.run is not None]
+            if runs:
+                AssessmentRun.objects.bulk_create(runs)
+                record_assessment_runs(runs)
+            Notification.objects.bulk_create([out.notification for out in flushed])
+    except Exception:
+        logger.exception("Bulk flush of %d jobs failed; processing them one by one", len(outputs))
+        for out in outputs:
+            statuses[out.job.id] = process_job(out.job)
+        return statuses
+
+    for out in outputs:
+        if holders.get(out.job.id) == out.job.claimed_by:
+            statuses[out.job.id] = Job.Status.COMPLETED
+        else:
+            logger.warning("Job %s lost its lease before completing; discarded this attempt", out.job.id)
+            statuses[out.job.id] = LEASE_LOST
+    return statuses
+
+
+def _load_running(job_ids) -> List[Job]:
+    return list(Job.objects.select_related("organization", "upload").filter(id__in=job_ids, status=Job.Status.RUNNING))
+
+
+def process_job_id(job_id) -> str:
+    """Pool entry point: load a claimed job by id and process it.
+
+    Runs on pool threads / child processes, each with its own DB connection.
+    """
+
+    close_old_connections()
+    jobs = _load_running([job_id])
+    return process_job(jobs[0]) if jobs else "skipped"
+
+
+def process_job_ids_bulk(job_ids) -> Dict[object, str]:
+    """Pool entry point for a chunk of a batch, flushed with ``process_jobs_bulk``."""
+
+    close_old_connections()
+    statuses = {job_id: "skipped" for job_id in job_ids}
+    statuses.update(process_jobs_bulk(_load_running(job_ids)))
+    return statuses
+
+
+class Worker:
+    """Long-running queue consumer used by ``process_jobs --daemon``."""
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        pool: str = "thread",
+        batch_size: Optional[int] = None,
+        poll_interval: float = 0.5,
+        max_poll_interval: float = 10.0,
+        reap_interval: float = 15.0,
+        analytics_interval: float = 300.0,
+        bulk: bool = True,
+        log: Callable[[str], None] = logger.info,
+    ):
+        self.worker_id = make_worker_id()
+        self.concurrency = max(1, int(concurrency))
+        self.pool = pool
+        self.batch_size = max(1, int(batch_size or self.concurrency * 2))
+        self.poll_interval = max(0.01, float(poll_interval))
+        self.max_poll_interval = max(self.poll_interval, float(max_poll_interval))
+        self.reap_interval = max(0.1, float(reap_interval))
+        self.analytics_interval = max(0.0, float(analytics_interval))
+        self.bulk = bool(bulk)
+        self.log = log
+        self.stop_event = threading.Event()
+        self._last_reap = float("-inf")
+        self._last_analytics = float("-inf")
+
+    def install_signal_handlers(self) -> None:
+        def _stop(signum, _frame):
+            self.log(f"Received signal {signum}; finishing in-flight jobs")
+            self.stop_event.set()
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+
+    def _make_executor(self) -> Executor:
+        if self.pool == "process":
+            # "spawn" gives each child a fresh interpreter with its own DB connections.
+            return ProcessPoolExecutor(
+                max_workers=self.concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+            )
+        return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job")
+
+    def _heartbeat_loop(self, done: threading.Event) -> None:
+        interval = lease_duration().total_seconds() / 3
+        while not done.wait(interval):
+            try:
+                heartbeat(self.worker_id)
+            except DatabaseError as exc:
+                self.log(f"Heartbeat failed: {exc}")
+            finally:
+                close_old_connections()
+
+    def _maybe_reap(self) -> None:
+        if time.monotonic() - self._last_reap < self.reap_interval:
+            return
+        self._last_reap = time.monotonic()
+        reaped = reap_expired_leases()
+        if reaped:
+            self.log(f"Re-queued {reaped} job(s) with expired leases")
+
+    def _maybe_refresh_analytics(self) -> None:
+        """Keep the SuperAdmin analytics snapshot fresh; with several workers, only a stale one is refreshed."""
+
+        if not self.analytics_interval or time.monotonic() - self._last_analytics < self.analytics_interval:
+            return
+        self._last_analytics = time.monotonic()
+        from .analytics import platform_analytics
+
+        try:
+            platform_analytics(max_age=self.analytics_interval)
+        except Exception as exc:  # never let the snapshot stop job processing
+            self.log(f"Analytics refresh failed: {exc}")
+
+    def run(self) -> None:
+        mode = "bulk" if self.bulk else "single"
+        self.log(f"Worker {self.worker_id} started ({self.pool} pool x{self.concurrency}, batch {self.batch_size}, {mode} writes)")
+        idle_sleep = self.poll_interval
+        executor = self._make_executor()
+        beat_done = threading.Event()
+        beat = threading.Thread(target=self._heartbeat_loop, args=(beat_done,), name="job-heartbeat", daemon=True)
+        beat.start()
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    self._maybe_reap()
+                    self._maybe_refresh_analytics()
+                    jobs = claim_jobs(self.worker_id, self.batch_size)
+                except DatabaseError as exc:
+                    # Transient (lock timeout, dropped connection): back off and retry.
+                    self.log(f"Claim failed: {exc}")
+                    close_old_connections()
+                    jobs = []
+                if not jobs:
+                    # Idle: back off exponentially (with jitter) up to max_poll_interval.
+                    self.stop_event.wait(idle_sleep * random.uniform(0.8, 1.2))
+                    idle_sleep = min(self.max_poll_interval, idle_sleep * 2)
+                    continue
+                idle_sleep = self.poll_interval
+                if not self._run_batch(executor, jobs):
+                    # A child process died; the executor is unusable from here on.
+                    executor.shutdown(wait=False)
+                    executor = self._make_executor()
+        finally:
+            executor.shutdown(wait=True)
+            beat_done.set()
+            beat.join()
+            self.log(f"Worker {self.worker_id} stopped")
+
+    def _run_batch(self, executor: Executor, jobs: List[Job]) -> bool:
+        """Run a claimed batch; returns False if the pool broke and must be replaced.
+
+        In bulk mode the batch is split into one chunk per pool worker, each
+        written in a single transaction; otherwise every job is its own task.
+        """
+
+        if self.bulk:
+            n_chunks = min(self.concurrency, len(jobs))
+            tasks = [(process_job_ids_bulk, [job.id for job in jobs[i::n_chunks]], jobs[i::n_chunks]) for i in range(n_chunks)]
+        else:
+            tasks = [(process_job_id, job.id, [job]) for job in jobs]
+
+        healthy = True
+        futures = {}
+        for fn, arg, task_jobs in tasks:
+            try:
+                futures[executor.submit(fn, arg)] = task_jobs
+            except BrokenProcessPool as exc:
+                healthy = False
+                self._release(task_jobs, f"worker pool broken: {exc}")
+        done, _pending = wait(futures)
+        for fut in done:
+            task_jobs = futures[fut]
+            try:
+                outcome = fut.result()
+            except Exception as exc:  # pool-level failure (e.g. a child process died)
+                if isinstance(exc, BrokenProcessPool):
+                    healthy = False
+                self.log(f"{len(task_jobs)} job(s) crashed in the pool: {exc}")
+                self._release(task_jobs, str(exc))
+                continue
+            statuses = outcome if isinstance(outcome, dict) else {task_jobs[0].id: outcome}
+            for job_id, job_status in statuses.items():
+                self.log(f"Job {job_id}: {job_status}")
+        return healthy
+
+    def _release(self, jobs: List[Job], error: str) -> None:
+        for job in jobs:
+            fail_or_retry(job.id, self.worker_id, job.attempts, job.max_attempts, error)
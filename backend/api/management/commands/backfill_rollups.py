@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.domain import normalize_system_key
+from api.materialized import merge_stats
+from api.models import DailyScoreRollup, LatestSystemScore, Organization
+from api.queries import daily_score_stats, last_runs_per_system
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild DailyScoreRollup and LatestSystemScore rows from existing AssessmentRun history. "
+        "Runs written while an org is being rebuilt may be missed; re-run for that org if so."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--org", action="append", default=[], help="Organization id to rebuild (repeatable). Defaults to all orgs.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        org_ids = options["org"]
+        orgs = Organization.objects.all().order_by("created_at")
+        if org_ids:
+            orgs = orgs.filter(id__in=org_ids)
+            if orgs.count() != len(set(org_ids)):
+                raise CommandError("Unknown --org id")
+
+        batch_size = int(options["batch_size"])
+        total_rows = 0
+        for org in orgs.iterator():
+            total_rows += self._rebuild_org(org, batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {total_rows} rollup rows"))
+
+    def _rebuild_org(self, org: Organization, batch_size: int) -> int:
+        # Aggregation happens in the database; only one row per (stored system id, day) comes back.
+        stats = {}
+        for g in daily_score_stats(org, by_system=True):
+            row = (int(g["n"]), int(g["total"] or 0), int(g["lo"] or 0), int(g["hi"] or 0))
+            for system_id in (normalize_system_key(g["system_id"]), DailyScoreRollup.ALL_SYSTEMS):
+                stats[(system_id, g["day"])] = merge_stats(stats.get((system_id, g["day"])), row)
+
+        rollups = [
+            DailyScoreRollup(
+                organization=org,
+                system_id=system_id,
+                day=day,
+                run_count=n,
+                score_sum=total,
+                score_min=lo,
+                score_max=hi,
+            )
+            for (system_id, day), (n, total, lo, hi) in stats.items()
+        ]
+
+        latest = []
+        for system_id, runs in last_runs_per_system(org, 2).items():
+            newest = runs[0]
+            previous = runs[1] if len(runs) > 1 else None
+            latest.append(
+                LatestSystemScore(
+                    organization=org,
+                    system_id=system_id,
+                    run=newest,
+                    score=int(newest.score or 0),
+                    coverage=float(newest.coverage or 0.0),
+                    timestamp_ms=int(newest.timestamp_ms),
+                    previous_score=int(previous.score or 0) if previous else None,
+                    previous_timestamp_ms=int(previous.timestamp_ms) if previous else None,
+                )
+            )
+
+        with transaction.atomic():
+            DailyScoreRollup.objects.filter(organization=org).delete()
+            DailyScoreRollup.objects.bulk_create(rollups, batch_size=batch_size)
+            LatestSystemScore.objects.filter(organization=org).delete()
+            LatestSystemScore.objects.bulk_create(latest, batch_size=batch_size)
+
+        self.stdout.write(f"{org.slug}: {len(rollups)} rollup rows, {len(latest)} latest-score rows")
+        return len(rollups)
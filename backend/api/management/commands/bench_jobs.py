@@ -0,0 +1,100 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from api.domain import CANONICAL_SYSTEMS
+from api.jobs import lease_duration, make_worker_id, process_job, process_jobs_bulk
+from api.models import AssessmentRun, Job, Notification, Organization
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the job worker's write path: per-job writes (process_job) against one "
+        "transaction per batch (process_jobs_bulk). Runs against the configured database "
+        "using throwaway organizations, which are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=2000, help="jobs per mode")
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--orgs", type=int, default=4)
+        parser.add_argument("--keep", action="store_true", help="keep the benchmark organizations and rows")
+
+    def handle(self, *args, **options):
+        n_jobs = int(options["jobs"])
+        batch_size = int(options["batch_size"])
+        if n_jobs <= 0 or batch_size <= 0 or options["orgs"] <= 0:
+            raise CommandError("--jobs, --batch-size and --orgs must be positive")
+
+        tag = uuid.uuid4().hex[:8]
+        orgs = [
+            Organization.objects.create(name=f"Bench jobs {tag} #{i}", slug=f"bench-jobs-{tag}-{i}")
+            for i in range(int(options["orgs"]))
+        ]
+        self.stdout.write(f"{connection.vendor}: {n_jobs} jobs per mode, batches of {batch_size}, {len(orgs)} orgs")
+        try:
+            results = {}
+            for mode in ("single", "bulk"):
+                results[mode] = self._run(mode, orgs, n_jobs, batch_size)
+            self.stdout.write(f"speedup: {results['bulk'] / max(results['single'], 1e-9):.1f}x")
+        finally:
+            if not options["keep"]:
+                Job.objects.filter(organization__in=orgs).delete()
+                AssessmentRun.objects.filter(organization__in=orgs).delete()
+                Notification.objects.filter(organization__in=orgs).delete()
+                Organization.objects.filter(id__in=[o.id for o in orgs]).delete()
+
+    def _run(self, mode: str, orgs, n_jobs: int, batch_size: int) -> float:
+        # Jobs are created already claimed so only the write path is measured.
+        worker_id = make_worker_id()
+        now = timezone.now()
+        Job.objects.bulk_create(
+            [
+                Job(
+                    organization=orgs[i % len(orgs)],
+                    name=f"bench-{mode}-{i}",
+                    system_id=CANONICAL_SYSTEMS[i % len(CANONICAL_SYSTEMS)],
+                    status=Job.Status.RUNNING,
+                    claimed_by=worker_id,
+                    claimed_at=now,
+                    lease_expires_at=now + lease_duration() * 100,
+                    attempts=1,
+                )
+                for i in range(n_jobs)
+            ],
+            batch_size=500,
+        )
+        ids = list(Job.objects.filter(claimed_by=worker_id).order_by("created_at").values_list("id", flat=True))
+
+        elapsed = 0.0
+        statements = 0
+
+        def count_statements(execute, sql, params, many, context):
+            nonlocal statements
+            statements += 1
+            return execute(sql, params, many, context)
+
+        for start in range(0, len(ids), batch_size):
+            # Loading the batch is the same for both modes; only the writes are timed.
+            batch = list(Job.objects.select_related("organization").filter(id__in=ids[start:start + batch_size]))
+            t0 = time.perf_counter()
+            with connection.execute_wrapper(count_statements):
+                if mode == "bulk":
+                    process_jobs_bulk(batch)
+                else:
+                    for job in batch:
+                        process_job(job)
+            elapsed += time.perf_counter() - t0
+
+        done = Job.objects.filter(id__in=ids, status=Job.Status.COMPLETED).count()
+        if done != len(ids):
+            raise CommandError(f"{mode}: only {done}/{len(ids)} jobs completed")
+
+        rate = len(ids) / max(elapsed, 1e-9)
+        self.stdout.write(
+            f"{mode:<7} {elapsed * 1000:9.1f} ms  {rate:>10,.0f} jobs/s  {statements / len(ids):5.2f} statements/job"
+        )
+        return rate
@@ -0,0 +1,84 @@
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.models import Visitor
+from api.progress import ProgressBuffer, apply_patch
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark visitor progress autosave (api.progress): active visitors each save one answer change "
+        "every --save-interval seconds, written through on every save against the write-behind buffer "
+        "flushing every --flush-seconds. Reports visitor row writes per active visitor per minute. Uses "
+        "throwaway visitors, deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--visitors", type=int, default=20, help="active visitors")
+        parser.add_argument("--seconds", type=float, default=15.0, help="run time per mode")
+        parser.add_argument("--save-interval", type=float, default=0.5, help="seconds between one visitor's saves")
+        parser.add_argument("--flush-seconds", type=float, default=3.0, help="buffer flush interval")
+
+    def handle(self, *args, **options):
+        n_visitors = int(options["visitors"])
+        seconds = float(options["seconds"])
+        save_interval = float(options["save_interval"])
+        flush_seconds = float(options["flush_seconds"])
+        if n_visitors <= 0 or seconds <= 0 or save_interval <= 0 or flush_seconds <= 0:
+            raise CommandError("--visitors, --seconds, --save-interval and --flush-seconds must be positive")
+
+        domain = f"bench-progress-{uuid.uuid4().hex[:8]}.invalid"
+        visitors = Visitor.objects.bulk_create([
+            Visitor(organization_name=f"Lead {i}", email=f"lead{i}@{domain}") for i in range(n_visitors)
+        ])
+        visitor_ids = [str(v.id) for v in visitors]
+        self.stdout.write(
+            f"{connection.vendor}: {n_visitors} visitors saving every {save_interval:g}s for {seconds:g}s per mode"
+        )
+        try:
+            for mode, interval in (("write-through", 0.0), (f"buffered {flush_seconds:g}s", flush_seconds)):
+                Visitor.objects.filter(id__in=visitor_ids).update(current_answers={})
+                buffer = ProgressBuffer(interval)
+                saves, latencies, expected = self._run(buffer, visitor_ids, seconds, save_interval)
+                buffer.stop()
+                self._check(mode, expected)
+                per_minute = buffer.writes / n_visitors / (seconds / 60)
+                self.stdout.write(
+                    f"{mode:<16} {saves:6d} saves  {buffer.writes:6d} row writes  "
+                    f"{per_minute:7.1f} writes/visitor/min  save p50 {statistics.median(latencies) * 1000:.2f} ms"
+                )
+        finally:
+            Visitor.objects.filter(email__endswith=domain).delete()
+
+    @staticmethod
+    def _run(buffer: ProgressBuffer, visitor_ids, seconds: float, save_interval: float):
+        rng = random.Random(7)
+        saves, latencies = 0, []
+        expected = {visitor_id: {} for visitor_id in visitor_ids}
+        started = time.monotonic()
+        next_round = started
+        while time.monotonic() - started < seconds:
+            for visitor_id in visitor_ids:
+                op = {"op": "replace", "path": f"/system{rng.randrange(4)}/q{rng.randrange(20)}", "value": rng.randrange(1, 6)}
+                t0 = time.perf_counter()
+                buffer.enqueue(visitor_id, [op], step=3, system_id="interdependency")
+                latencies.append(time.perf_counter() - t0)
+                expected[visitor_id] = apply_patch(expected[visitor_id], [op])
+                saves += 1
+            next_round += save_interval
+            time.sleep(max(0.0, next_round - time.monotonic()))
+        return saves, latencies, expected
+
+    @staticmethod
+    def _check(mode: str, expected):
+        """The stored answers are every save applied in order."""
+
+        stored = dict(Visitor.objects.filter(id__in=list(expected)).values_list("id", "current_answers"))
+        wrong = sum(stored.get(uuid.UUID(visitor_id)) != answers for visitor_id, answers in expected.items())
+        if wrong:
+            raise CommandError(f"{mode}: {wrong} visitor(s) have answers that differ from the saves")
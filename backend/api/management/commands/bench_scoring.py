@@ -0,0 +1,90 @@
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from api.domain import (
+    CANONICAL_SYSTEMS,
+    compute_org_health,
+    compute_org_health_batch,
+    metrics_to_matrix,
+    org_health_result_from_batch,
+    score_result_from_batch,
+    score_system,
+    score_systems_batch,
+    weights_to_vector,
+)
+
+METRIC_KEYS = ["throughput", "cycle_time", "quality", "predictability"]
+
+
+class Command(BaseCommand):
+    help = "Benchmark per-call score_system/compute_org_health against the batch scoring path."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000, help="org x system rows to score")
+        parser.add_argument("--seed", type=int, default=7)
+        parser.add_argument("--verify", type=int, default=2000, help="rows to cross-check against the scalar path")
+
+    def handle(self, *args, **options):
+        n_rows = int(options["rows"])
+        n_systems = len(CANONICAL_SYSTEMS)
+        if n_rows < n_systems:
+            raise CommandError(f"--rows must be at least {n_systems}")
+        n_orgs = n_rows // n_systems
+        n_rows = n_orgs * n_systems
+
+        rnd = random.Random(int(options["seed"]))
+        rows = []
+        for _ in range(n_rows):
+            metrics = {}
+            for k in METRIC_KEYS:
+                if rnd.random() < 0.9:
+                    metrics[k] = rnd.choice([rnd.randint(30, 100), round(rnd.random(), 2)])
+            rows.append(metrics)
+        weights = {"throughput": 2, "cycle_time": 1, "quality": 1.5, "predictability": 1}
+
+        self.stdout.write(f"Scoring {n_rows} rows ({n_orgs} orgs x {n_systems} systems x {len(METRIC_KEYS)} metrics)")
+
+        t0 = time.perf_counter()
+        scalar = [score_system(m, weights) for m in rows]
+        scalar_health = [
+            compute_org_health(
+                [
+                    {"key": k, "score": scalar[o * n_systems + j]["score"], "coverage": scalar[o * n_systems + j]["coverage"]}
+                    for j, k in enumerate(CANONICAL_SYSTEMS)
+                ]
+            )
+            for o in range(n_orgs)
+        ]
+        scalar_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        values, present, keys = metrics_to_matrix(rows, METRIC_KEYS)
+        pack_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        batch = score_systems_batch(values, weights_to_vector(weights, keys), present_mask=present)
+        health = compute_org_health_batch(
+            batch["score"].reshape(n_orgs, n_systems),
+            batch["coverage"].reshape(n_orgs, n_systems),
+        )
+        batch_s = time.perf_counter() - t0
+
+        self._report("per-call", n_rows, scalar_s)
+        self._report("batch (incl. packing dicts)", n_rows, pack_s + batch_s)
+        self._report("batch (arrays only)", n_rows, batch_s)
+        self.stdout.write(f"speedup (arrays only): {scalar_s / max(batch_s, 1e-9):.1f}x")
+
+        checked = min(int(options["verify"]), n_rows)
+        for i in np.random.default_rng(int(options["seed"])).choice(n_rows, size=checked, replace=False):
+            if score_result_from_batch(batch, int(i), keys) != scalar[int(i)]:
+                raise CommandError(f"batch score mismatch on row {int(i)}")
+        for o in range(min(checked, n_orgs)):
+            if org_health_result_from_batch(health, o) != scalar_health[o]:
+                raise CommandError(f"batch org health mismatch on org {o}")
+        self.stdout.write(self.style.SUCCESS(f"verified {checked} rows against the scalar path"))
+
+    def _report(self, label: str, n_rows: int, seconds: float):
+        self.stdout.write(f"{label:<30} {seconds * 1000:9.1f} ms  {n_rows / max(seconds, 1e-9):>12,.0f} rows/s")
@@ -0,0 +1,138 @@
+import random
+import statistics
+import time
+import uuid
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.models import Organization, SearchCorpus, SearchDocument, SearchPostingBlock, SearchTerm, Upload
+from api.search import BATCH_SIZE, BLOCK_POSTINGS, POSTING, WRITE_BATCH_SIZE, index_upload, search_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark upload search (api.search) on a synthetic per-org index with a Zipf-distributed "
+        "vocabulary: query latency, then the cost of indexing more uploads incrementally. Runs against "
+        "the configured database using a throwaway organization, which is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--docs", type=int, default=100_000)
+        parser.add_argument("--terms-per-doc", type=int, default=60, help="distinct terms per document")
+        parser.add_argument("--vocabulary", type=int, default=50_000)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--index", type=int, default=100, help="uploads to index incrementally afterwards")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--keep", action="store_true", help="keep the benchmark organization and index")
+
+    def handle(self, *args, **options):
+        n_docs = int(options["docs"])
+        per_doc = int(options["terms_per_doc"])
+        vocab = int(options["vocabulary"])
+        if n_docs <= 0 or per_doc <= 0 or vocab < per_doc or options["queries"] <= 0:
+            raise CommandError("--docs, --terms-per-doc and --queries must be positive, --vocabulary >= --terms-per-doc")
+
+        rng = random.Random(options["seed"])
+        tag = uuid.uuid4().hex[:8]
+        org = Organization.objects.create(name=f"Bench search {tag}", slug=f"bench-search-{tag}")
+        try:
+            t0 = time.perf_counter()
+            self._build(org, rng, n_docs, per_doc, vocab)
+            self.stdout.write(
+                f"{connection.vendor}: built {n_docs:,} docs x {per_doc} terms in {time.perf_counter() - t0:.1f}s"
+            )
+            # Query terms follow the same Zipf law, so most queries include a very frequent term.
+            for words in (1, 2, 4):
+                timings = []
+                for _ in range(int(options["queries"])):
+                    query = " ".join(f"w{self._zipf(rng, vocab)}" for _ in range(words))
+                    t1 = time.perf_counter()
+                    search_uploads(org, query, limit=10)
+                    timings.append((time.perf_counter() - t1) * 1000)
+                self.stdout.write(f"{words}-term queries: {self._summary(timings)}")
+
+            timings = []
+            for i in range(int(options["index"])):
+                text = " ".join(f"w{self._zipf(rng, vocab)}" for _ in range(per_doc * 2))
+                upload = Upload.objects.create(organization=org, name=f"bench-new-{i}", timestamp_ms=n_docs + i)
+                t1 = time.perf_counter()
+                index_upload(upload, text=text)
+                timings.append((time.perf_counter() - t1) * 1000)
+            if timings:
+                self.stdout.write(f"index_upload:     {self._summary(timings)}")
+        finally:
+            if not options["keep"]:
+                # Index rows first, so deleting the uploads does not unindex them one by one.
+                SearchPostingBlock.objects.filter(term__organization=org).delete()
+                SearchDocument.objects.filter(organization=org).delete()
+                Upload.objects.filter(organization=org).delete()
+                org.delete()
+
+    @staticmethod
+    def _summary(timings) -> str:
+        timings = sorted(timings)
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        return f"median {statistics.median(timings):7.2f} ms  p95 {p95:7.2f} ms  max {timings[-1]:7.2f} ms"
+
+    @staticmethod
+    def _zipf(rng: random.Random, vocab: int) -> int:
+        # P(rank <= r) = log r / log vocab, i.e. frequency ~ 1/rank
+        return min(vocab, int(vocab ** rng.random()))
+
+    def _build(self, org, rng, n_docs: int, per_doc: int, vocab: int) -> None:
+        # Written straight into the index tables in the layout index_upload maintains.
+        SearchTerm.objects.bulk_create(
+            [SearchTerm(organization=org, term=f"w{i}") for i in range(1, vocab + 1)], batch_size=BATCH_SIZE
+        )
+        term_ids = dict(SearchTerm.objects.filter(organization=org).values_list("term", "id"))
+        postings = {rank: [] for rank in range(1, vocab + 1)}
+        total_length = 0
+        step = 5000
+        for start in range(0, n_docs, step):
+            count = min(step, n_docs - start)
+            with transaction.atomic():
+                uploads = Upload.objects.bulk_create(
+                    [Upload(organization=org, name=f"bench-{start + i}", timestamp_ms=start + i) for i in range(count)],
+                    batch_size=BATCH_SIZE,
+                )
+                docs = []
+                for upload in uploads:
+                    ranks = set()
+                    while len(ranks) < per_doc:
+                        ranks.add(self._zipf(rng, vocab))
+                    tfs = {rank: 1 + int(rng.expovariate(1.0) * 2) for rank in ranks}
+                    length = sum(tfs.values())
+                    total_length += length
+                    terms = np.array(sorted(term_ids[f"w{rank}"] for rank in ranks), dtype="<i8").tobytes()
+                    docs.append((SearchDocument(organization=org, upload=upload, length=length, terms=terms), tfs))
+                SearchDocument.objects.bulk_create([doc for doc, _ in docs], batch_size=BATCH_SIZE)
+            for doc, tfs in docs:
+                for rank, tf in tfs.items():
+                    postings[rank].append((doc.id, tf, doc.length))
+
+        blocks = []
+        for rank, records in postings.items():
+            records = np.array(records, dtype=POSTING)
+            for start in range(0, len(records), BLOCK_POSTINGS):
+                part = records[start:start + BLOCK_POSTINGS]
+                blocks.append(
+                    SearchPostingBlock(
+                        term_id=term_ids[f"w{rank}"],
+                        first_doc=int(part["doc"][0]),
+                        last_doc=int(part["doc"][-1]),
+                        count=len(part),
+                        data=part.tobytes(),
+                    )
+                )
+            if len(blocks) >= 5000:
+                SearchPostingBlock.objects.bulk_create(blocks, batch_size=WRITE_BATCH_SIZE)
+                blocks = []
+        SearchPostingBlock.objects.bulk_create(blocks, batch_size=WRITE_BATCH_SIZE)
+        SearchTerm.objects.bulk_update(
+            [SearchTerm(id=term_ids[f"w{rank}"], doc_freq=len(records)) for rank, records in postings.items()],
+            ["doc_freq"],
+            batch_size=BATCH_SIZE,
+        )
+        SearchCorpus.objects.create(organization=org, documents=n_docs, total_length=total_length)
@@ -0,0 +1,132 @@
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from api.fastserialize import ValuesSerializer
+from api.models import Job, Notification, Organization, Upload, Visitor
+from api.renderers import ORJSONRenderer
+from api.serializers import JobSerializer, NotificationSerializer, UploadSerializer, VisitorSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark list serialization: ModelSerializer + JSONRenderer against values_list() rows "
+        "(api.fastserialize) + ORJSONRenderer, on synthetic pages of uploads, jobs, notifications and "
+        "visitors, and the two renderers alone. Checks both paths produce the same bytes. Uses throwaway rows, deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500, help="rows per page")
+        parser.add_argument("--repeat", type=int, default=30, help="timed runs per path")
+
+    def handle(self, *args, **options):
+        rows = int(options["rows"])
+        repeat = int(options["repeat"])
+        if rows <= 0 or repeat <= 0:
+            raise CommandError("--rows and --repeat must be positive")
+
+        tag = uuid.uuid4().hex[:8]
+        org = Organization.objects.create(name=f"Bench serialization {tag}", slug=f"bench-serialization-{tag}")
+        visitor_domain = f"bench-{tag}.invalid"
+        try:
+            self._build(org, rows, visitor_domain)
+            request = RequestFactory().get("/api/uploads")
+            cases = [
+                ("uploads", Upload.objects.filter(organization=org), "timestamp_ms", UploadSerializer, {"request": request}),
+                ("jobs", Job.objects.filter(organization=org), "created_at", JobSerializer, {}),
+                ("notifications", Notification.objects.filter(organization=org), "timestamp_ms", NotificationSerializer, {}),
+                ("visitors", Visitor.objects.filter(email__endswith=visitor_domain), "created_at", VisitorSerializer, {}),
+            ]
+            self.stdout.write(f"{connection.vendor}: {rows}-row pages, median of {repeat} runs (query + serialize + render)")
+            for name, qs, key, serializer_class, context in cases:
+                qs = qs.order_by(f"-{key}", "-pk")[:rows]
+
+                def model_path():
+                    data = serializer_class(list(qs), many=True, context=context).data
+                    return JSONRenderer().render(data)
+
+                def values_path():
+                    fast = ValuesSerializer(serializer_class, context)
+                    data = fast.to_representation(list(qs.values_list(*fast.columns)))
+                    return ORJSONRenderer().render(data)
+
+                expected, got = model_path(), values_path()
+                if expected != got:
+                    raise CommandError(f"{name}: fast path output differs from the ModelSerializer output")
+                slow_ms, fast_ms = self._time(model_path, repeat), self._time(values_path, repeat)
+                data = serializer_class(list(qs), many=True, context=context).data
+                json_ms = self._time(lambda: JSONRenderer().render(data), repeat)
+                orjson_ms = self._time(lambda: ORJSONRenderer().render(data), repeat)
+                self.stdout.write(
+                    f"{name:<14} {len(expected) / 1024:7.1f} KB  model {slow_ms:7.2f} ms  values+orjson {fast_ms:7.2f} ms"
+                    f"  x{slow_ms / fast_ms:.1f}   render only: json {json_ms:6.2f} ms  orjson {orjson_ms:6.2f} ms"
+                )
+        finally:
+            Upload.objects.filter(organization=org).delete()
+            Job.objects.filter(organization=org).delete()
+            Notification.objects.filter(organization=org).delete()
+            Visitor.objects.filter(email__endswith=visitor_domain).delete()
+            org.delete()
+
+    @staticmethod
+    def _time(fn, repeat: int) -> float:
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - t0) * 1000)
+        return statistics.median(timings)
+
+    @staticmethod
+    def _build(org: Organization, rows: int, visitor_domain: str) -> None:
+        preview = {
+            "status": "done",
+            "summary": "CSV with 12 columns and 1,204 rows",
+            "detected": [{"systemId": "interdependency", "confidence": 70}, {"systemId": "alignment", "confidence": 55}],
+            "analysis": {"columns": [{"name": f"col{i}", "type": "number", "mean": i * 1.5, "missing": 0} for i in range(12)]},
+        }
+        Upload.objects.bulk_create([
+            Upload(
+                organization=org,
+                name=f"export-{i}.csv",
+                file=f"blobs/ab/cd/{uuid.uuid4().hex}",
+                timestamp_ms=1_700_000_000_000 + i,
+                analyzed_systems=["interdependency", "alignment"],
+                meta={"size": 1024 * i, "type": "text/csv"},
+                summary="Quarterly export — café revenue",
+                analyzed_preview=preview,
+                sha256=uuid.uuid4().hex * 2,
+            )
+            for i in range(rows)
+        ])
+        Job.objects.bulk_create([
+            Job(
+                organization=org,
+                kind=Job.Kind.ANALYSIS,
+                status=Job.Status.COMPLETED,
+                name=f"Assessment {i}",
+                system_id="interdependency",
+                payload={"systemId": "interdependency", "answers": {f"q{j}": j % 5 for j in range(10)}},
+                result={"score": 60 + i % 40, "coverage": 0.75},
+            )
+            for i in range(rows)
+        ])
+        Notification.objects.bulk_create([
+            Notification(organization=org, to="ceo@example.com", subject=f"Score {i}", body="Your assessment is ready.", timestamp_ms=1_700_000_000_000 + i)
+            for i in range(rows)
+        ])
+        Visitor.objects.bulk_create([
+            Visitor(
+                organization_name=f"Lead {i}",
+                name="Ada",
+                email=f"lead{i}@{visitor_domain}",
+                systems_attempted=["interdependency"],
+                ip_address="203.0.113.7",
+            )
+            for i in range(rows)
+        ])
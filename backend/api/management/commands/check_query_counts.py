@@ -0,0 +1,88 @@
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from api.models import AssessmentRun, Job, Notification, Organization, Upload, UserProfile, Visitor
+from api.tokens import TenantRefreshToken
+
+# Most queries a request may run, whatever the page size, with a JWT as clients
+# send it: one query loads the user on a principal cache miss (none on a hit,
+# api.principals), one reads the page, plus the org lookup on admin org pages.
+# Anything that grows with the rows is an N+1.
+QUERY_CEILINGS = {
+    "/api/uploads": 2,
+    "/api/jobs": 2,
+    "/api/notifications": 2,
+    "/api/orgs": 2,
+    "/api/admin/users": 2,
+    "/api/admin/visitors": 2,
+    "/api/admin/orgs/{org}/uploads": 3,
+    "/api/admin/orgs/{org}/assessments": 3,
+    "/api/admin/orgs/{org}/jobs": 3,
+    "/api/admin/orgs/{org}/notifications": 3,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Fail if a list endpoint runs more SQL queries than its ceiling (QUERY_CEILINGS), e.g. after an "
+        "N+1 regression. Runs against the configured database with throwaway rows, deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50, help="rows per list (users, uploads, jobs, ...)")
+
+    def handle(self, *args, **options):
+        rows = int(options["rows"])
+        if rows <= 0:
+            raise CommandError("--rows must be positive")
+
+        tag = uuid.uuid4().hex[:8]
+        domain = f"query-check-{tag}.invalid"
+        org = Organization.objects.create(name=f"Query check {tag}", slug=f"query-check-{tag}")
+        try:
+            tenant, admin = self._build(org, rows, domain)
+            failures = []
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                for path, ceiling in QUERY_CEILINGS.items():
+                    user = admin if "/admin/" in path or path == "/api/orgs" else tenant
+                    client = APIClient()
+                    client.credentials(HTTP_AUTHORIZATION=f"Bearer {TenantRefreshToken.for_user(user).access_token}")
+                    url = path.format(org=org.id)
+                    with CaptureQueriesContext(connection) as queries:
+                        response = client.get(url, {"limit": rows})
+                    if response.status_code != 200:
+                        raise CommandError(f"{url}: HTTP {response.status_code}")
+                    count = len(queries.captured_queries)
+                    ok = count <= ceiling
+                    self.stdout.write(f"{'ok  ' if ok else 'FAIL'} {path:<40} {count:3d} queries (ceiling {ceiling})")
+                    if not ok:
+                        failures.append(path)
+            if failures:
+                raise CommandError(f"query ceiling exceeded: {', '.join(failures)}")
+        finally:
+            Upload.objects.filter(organization=org).delete()
+            Job.objects.filter(organization=org).delete()
+            Notification.objects.filter(organization=org).delete()
+            Visitor.objects.filter(email__endswith=domain).delete()
+            User.objects.filter(email__endswith=domain).delete()
+            org.delete()
+
+    @staticmethod
+    def _build(org: Organization, rows: int, domain: str):
+        users = User.objects.bulk_create([User(username=f"user{i}@{domain}", email=f"user{i}@{domain}") for i in range(rows)])
+        UserProfile.objects.bulk_create([UserProfile(user=user, organization=org) for user in users])
+        admin = User.objects.create(username=f"admin@{domain}", email=f"admin@{domain}", is_superuser=True, is_staff=True)
+        Upload.objects.bulk_create([Upload(organization=org, name=f"file-{i}.csv", timestamp_ms=i) for i in range(rows)])
+        AssessmentRun.objects.bulk_create([
+            AssessmentRun(organization=org, system_id="interdependency", score=50, timestamp_ms=i) for i in range(rows)
+        ])
+        Job.objects.bulk_create([Job(organization=org, kind=Job.Kind.ANALYSIS) for _ in range(rows)])
+        Notification.objects.bulk_create([Notification(organization=org, timestamp_ms=i) for i in range(rows)])
+        Visitor.objects.bulk_create([Visitor(organization_name=f"Lead {i}", email=f"lead{i}@{domain}") for i in range(rows)])
+        return users[0], admin
@@ -0,0 +1,177 @@
+import math
+import multiprocessing
+import socketserver
+import statistics
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.throttling import BUCKET_SCRIPT, BUCKET_SCRIPT_SHA, store_from_url
+
+
+def _hammer(url: str, timeout: float, key: str, capacity: int, rate: float, requests: int, start_at: float):
+    """One client process: ``requests`` takes from the shared bucket; returns (allowed, latencies in seconds)."""
+
+    store = store_from_url(url, timeout)
+    store.take(f"{key}:warmup", 1, 1.0)  # connect (and create the table) before the clock starts
+    while time.time() < start_at:
+        time.sleep(0.001)
+    allowed, latencies = 0, []
+    for _ in range(requests):
+        started = time.perf_counter()
+        ok, _wait = store.take(key, capacity, rate)
+        latencies.append(time.perf_counter() - started)
+        allowed += ok
+    return allowed, latencies
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    """A local Redis-protocol server that knows ``api.throttling.BUCKET_SCRIPT`` and nothing else.
+
+    It runs a Python port of the script instead of Lua, so it checks the
+    client side (protocol, ``EVALSHA`` / ``NOSCRIPT`` / ``EVAL``, reply
+    parsing) and the bucket arithmetic, not the Lua itself.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _RespHandler)
+        self.lock = threading.Lock()
+        self.hashes = {}
+        self.scripts = set()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+    def bucket(self, key: str, capacity: float, rate: float, now: float):
+        with self.lock:
+            tokens, ts = self.hashes.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            allowed = 0
+            if tokens >= 1:
+                tokens, allowed = tokens - 1, 1
+            self.hashes[key] = (tokens, now)
+        # Lua's tostring() of a float with an integral value: "5.0" on 5.4, "5" before; both parse back
+        return [allowed, repr(tokens).encode()]
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server: RespStandIn = self.server
+        while True:
+            try:
+                args = self._command()
+            except (EOFError, ConnectionError):
+                return
+            name = args[0].upper()
+            if name in (b"PING", b"AUTH", b"SELECT"):
+                self._send(b"PONG" if name == b"PING" else b"OK")
+            elif name == b"DEL":
+                with server.lock:
+                    self._send(sum(server.hashes.pop(key.decode(), None) is not None for key in args[1:]))
+            elif name in (b"EVAL", b"EVALSHA"):
+                if name == b"EVAL":
+                    if args[1].decode() != BUCKET_SCRIPT:
+                        self._error(b"ERR stand-in only runs the throttle bucket script")
+                        continue
+                    server.scripts.add(BUCKET_SCRIPT_SHA)
+                elif args[1].decode() not in server.scripts:
+                    self._error(b"NOSCRIPT No matching script. Please use EVAL.")
+                    continue
+                key = args[3].decode()
+                capacity, rate, now = (float(arg) for arg in args[4:7])
+                self._send(server.bucket(key, capacity, rate, now))
+            else:
+                self._error(b"ERR unknown command '" + args[0] + b"'")
+
+    def _command(self):
+        line = self.rfile.readline()
+        if not line:
+            raise EOFError
+        if not line.startswith(b"*"):
+            raise ConnectionError("inline commands are not supported")
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def _encode(self, value) -> bytes:
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, bytes) and value in (b"OK", b"PONG"):
+            return b"+" + value + b"\r\n"
+        if isinstance(value, bytes):
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        return b"*%d\r\n" % len(value) + b"".join(self._encode(item) for item in value)
+
+    def _send(self, value):
+        self.wfile.write(self._encode(value))
+
+    def _error(self, message: bytes):
+        self.wfile.write(b"-" + message + b"\r\n")
+
+
+class Command(BaseCommand):
+    help = (
+        "Check the throttle store (THROTTLE_STORE_URL, api.throttling) under concurrent processes: several "
+        "processes drain one token bucket, and exactly its capacity must be let through. Reports per-request "
+        "latency. --standin runs the check against a local Redis-protocol stand-in instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default=None, help="store URL (default: THROTTLE_STORE_URL)")
+        parser.add_argument("--standin", action="store_true", help="use a local Redis-protocol stand-in")
+        parser.add_argument("--processes", type=int, default=4, help="client processes")
+        parser.add_argument("--requests", type=int, default=500, help="requests per process")
+        parser.add_argument("--capacity", type=int, default=200, help="bucket capacity (allowed requests)")
+
+    def handle(self, *args, **options):
+        processes, requests, capacity = int(options["processes"]), int(options["requests"]), int(options["capacity"])
+        if processes <= 0 or requests <= 0 or capacity <= 0:
+            raise CommandError("--processes, --requests and --capacity must be positive")
+        if processes * requests <= capacity:
+            raise CommandError("--processes x --requests must exceed --capacity to drain the bucket")
+
+        standin = None
+        url = options["url"] or settings.THROTTLE_STORE_URL
+        if options["standin"]:
+            standin = RespStandIn()
+            threading.Thread(target=standin.serve_forever, daemon=True).start()
+            url = standin.url
+        timeout = max(1.0, float(getattr(settings, "THROTTLE_STORE_TIMEOUT_SECONDS", 0.25)))
+        # One token per day: nothing refills while the check runs.
+        rate = 1 / 86400
+        key = f"throttle_check_{uuid.uuid4().hex}"
+
+        try:
+            ctx = multiprocessing.get_context("spawn")
+            start_at = time.time() + 2 + 0.2 * processes  # spawned interpreters need a moment to start
+            with ctx.Pool(processes) as pool:
+                results = pool.starmap(
+                    _hammer, [(url, timeout, key, capacity, rate, requests, start_at)] * processes
+                )
+            store = store_from_url(url, timeout)
+            store.reset(key)
+            store.reset(f"{key}:warmup")
+        finally:
+            if standin is not None:
+                standin.shutdown()
+                standin.server_close()
+
+        allowed = sum(n for n, _latencies in results)
+        latencies = sorted(latency for _n, latencies in results for latency in latencies)
+        p99 = latencies[min(len(latencies) - 1, math.ceil(0.99 * len(latencies)) - 1)]
+        self.stdout.write(
+            f"{url}: {processes} processes x {requests} requests, capacity {capacity}: {allowed} allowed; "
+            f"latency p50 {statistics.median(latencies) * 1e6:.0f}us, p99 {p99 * 1e6:.0f}us"
+        )
+        if allowed != capacity:
+            raise CommandError(f"{allowed} requests allowed, expected exactly {capacity}")
@@ -1,78 +1,86 @@
-import random
+import argparse
 import time
 
 from django.core.management.base import BaseCommand
 
-from api.models import AssessmentRun, Job, Notification
-from api.domain import CANONICAL_SYSTEMS, normalize_system_key
+from api.jobs import LEASE_LOST, Worker, claim_jobs, make_worker_id, process_job, process_jobs_bulk, reap_expired_leases
+from api.models import Job
 
 
 class Command(BaseCommand):
     help = "Process pending jobs (mock worker), producing scores and notifications."
 
     def add_arguments(self, parser):
-        parser.add_argument("--limit", type=int, default=5)
-        parser.add_argument("--sleep", type=float, default=0.0)
+        parser.add_argument("--limit", type=int, default=5, help="One-shot mode: number of jobs to claim")
+        parser.add_argument("--sleep", type=float, default=0.0, help="One-shot mode: delay before each job")
+        parser.add_argument(
+            "--bulk",
+            action=argparse.BooleanOptionalAction,
+            default=True,
+            help="Write each batch's results in one transaction (default); --no-bulk writes job by job",
+        )
+        parser.add_argument("--daemon", action="store_true", help="Keep polling for jobs until SIGTERM/SIGINT")
+        parser.add_argument("--workers", type=int, default=4, help="Daemon mode: pool size")
+        parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+        parser.add_argument("--batch-size", type=int, default=None, help="Daemon mode: jobs claimed per poll (default 2x workers)")
+        parser.add_argument("--poll-interval", type=float, default=0.5, help="Daemon mode: initial idle poll delay in seconds")
+        parser.add_argument("--max-poll-interval", type=float, default=10.0, help="Daemon mode: idle backoff ceiling in seconds")
+        parser.add_argument("--reap-interval", type=float, default=15.0, help="Daemon mode: seconds between expired-lease sweeps")
+        parser.add_argument(
+            "--analytics-interval",
+            type=float,
+            default=300.0,
+            help="Daemon mode: seconds between refreshes of the SuperAdmin analytics snapshot (0 disables)",
+        )
 
     def handle(self, *args, **options):
+        if options["daemon"]:
+            worker = Worker(
+                concurrency=options["workers"],
+                pool=options["pool"],
+                batch_size=options["batch_size"],
+                poll_interval=options["poll_interval"],
+                max_poll_interval=options["max_poll_interval"],
+                reap_interval=options["reap_interval"],
+                analytics_interval=options["analytics_interval"],
+                bulk=options["bulk"],
+                log=self.stdout.write,
+            )
+            worker.install_signal_handlers()
+            worker.run()
+            return
+
         limit = int(options["limit"])
         sleep_s = float(options["sleep"])
 
-        pending = list(Job.objects.filter(status=Job.Status.PENDING).order_by("created_at")[:limit])
+        reaped = reap_expired_leases()
+        if reaped:
+            self.stdout.write(f"Re-queued {reaped} job(s) with expired leases")
+
+        pending = claim_jobs(make_worker_id(), limit)
         if not pending:
             self.stdout.write("No pending jobs")
             return
 
+        if options["bulk"] and not sleep_s:
+            self.stdout.write(f"Processing {len(pending)} job(s)")
+            statuses = process_jobs_bulk(pending)
+            for job in pending:
+                self._report(job, statuses[job.id])
+            return
+
         for job in pending:
             self.stdout.write(f"Processing job {job.id}")
             if sleep_s:
                 time.sleep(sleep_s)
+            self._report(job, process_job(job))
 
-            try:
-                system_id = normalize_system_key(job.system_id or job.payload.get("system") or job.payload.get("systemId"))
-                if system_id not in CANONICAL_SYSTEMS:
-                    system_id = ""
-
-                score = max(10, min(99, int(40 + random.random() * 50)))
-                result = {
-                    "jobId": str(job.id),
-                    "status": "completed",
-                    "timestamp": int(time.time() * 1000),
-                    "orgId": str(job.organization_id) if job.organization_id else None,
-                    "system": system_id or None,
-                    "score": score,
-                    "summary": f"Auto-generated analysis for {job.name or 'upload'}",
-                }
-
-                job.status = Job.Status.COMPLETED
-                job.result = result
-                job.error = ""
-                job.save(update_fields=["status", "result", "error", "updated_at"])
-
-                if job.organization_id and system_id:
-                    AssessmentRun.objects.create(
-                        organization=job.organization,
-                        system_id=system_id,
-                        title=f"{system_id.title()} Assessment",
-                        score=score,
-                        coverage=1.0,
-                        timestamp_ms=result["timestamp"],
-                        meta={"job": str(job.id), "source": "process_jobs"},
-                    )
-
-                Notification.objects.create(
-                    organization=job.organization,
-                    channel=Notification.Channel.EMAIL if job.notify_to else Notification.Channel.INTERNAL,
-                    to=job.notify_to or "",
-                    subject=f"Analysis ready for {job.name or system_id or 'your upload'}",
-                    body=f"Your analysis is ready. Score: {score}%\n\nSummary: {result['summary']}",
-                    timestamp_ms=result["timestamp"],
-                    meta={"jobId": str(job.id)},
-                )
-
-                self.stdout.write(f"Completed job {job.id}")
-            except Exception as exc:
-                job.status = Job.Status.FAILED
-                job.error = str(exc)
-                job.save(update_fields=["status", "error", "updated_at"])
-                self.stderr.write(f"Job {job.id} failed: {exc}")
+    def _report(self, job: Job, status: str) -> None:
+        if status == Job.Status.COMPLETED:
+            self.stdout.write(f"Completed job {job.id}")
+        elif status == Job.Status.PENDING:
+            self.stderr.write(f"Job {job.id} attempt {job.attempts} failed, retrying at {job.next_attempt_at:%Y-%m-%d %H:%M:%S}: {job.error}")
+        elif status == LEASE_LOST:
+            self.stderr.write(f"Job {job.id} lost its lease; skipped")
+        else:
+            self.stderr.write(f"Job {job.id} failed: {job.error}")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.upload_sessions import purge_expired_sessions
+
+
+class Command(BaseCommand):
+    help = "Abort resumable upload sessions past their expiry and delete their part files (run periodically)."
+
+    def handle(self, *args, **options):
+        purged = purge_expired_sessions()
+        self.stdout.write(f"purged {purged} expired upload session(s)")
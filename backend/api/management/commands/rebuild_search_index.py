@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import Organization, SearchCorpus, SearchDocument, SearchPostingBlock, SearchTerm, Upload
+from api.search import index_upload
+
+
+class Command(BaseCommand):
+    help = (
+        "Index existing uploads into the per-org search index (api.search). Uploads are normally "
+        "indexed by their index_upload job; use this for uploads made before search existed, or "
+        "with --reset to rebuild an org's index from scratch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--org", action="append", default=[], help="Organization id to index (repeatable). Defaults to all orgs.")
+        parser.add_argument("--reset", action="store_true", help="drop the org's index first instead of only adding missing uploads")
+
+    def handle(self, *args, **options):
+        org_ids = options["org"]
+        orgs = Organization.objects.all().order_by("created_at")
+        if org_ids:
+            orgs = orgs.filter(id__in=org_ids)
+            if orgs.count() != len(set(org_ids)):
+                raise CommandError("Unknown --org id")
+
+        total = 0
+        for org in orgs.iterator():
+            if options["reset"]:
+                with transaction.atomic():
+                    SearchPostingBlock.objects.filter(term__organization=org).delete()
+                    SearchDocument.objects.filter(organization=org).delete()
+                    SearchTerm.objects.filter(organization=org).delete()
+                    SearchCorpus.objects.filter(organization=org).delete()
+            uploads = Upload.objects.filter(organization=org, search_document__isnull=True).order_by("timestamp_ms")
+            count = 0
+            for upload in uploads.iterator():
+                index_upload(upload)
+                count += 1
+            total += count
+            self.stdout.write(f"{org.slug}: indexed {count} uploads")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} uploads"))
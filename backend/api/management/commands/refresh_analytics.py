@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.analytics import refresh_platform_analytics
+
+
+class Command(BaseCommand):
+    help = "Refresh the SuperAdmin platform analytics snapshot (incrementally unless --full)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Recount everything instead of only the recent months")
+
+    def handle(self, *args, **options):
+        snapshot = refresh_platform_analytics(full=options["full"])
+        self.stdout.write(f"analytics snapshot computed at {snapshot.computed_at.isoformat()} in {snapshot.duration_ms} ms")
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Least
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .domain import normalize_system_key, system_key_aliases
+from .models import AssessmentRun, DailyScoreRollup, LatestSystemScore
+
+DAY_MS = 24 * 3600 * 1000
+EPOCH = datetime.date(1970, 1, 1)
+
+# (count, sum, min, max)
+RollupStats = Tuple[int, int, int, int]
+
+
+def day_from_ms(timestamp_ms: int) -> datetime.date:
+    """UTC day bucket for a millisecond timestamp (same buckets as the overview series)."""
+
+    return EPOCH + datetime.timedelta(days=int(timestamp_ms) // DAY_MS)
+
+
+def day_start_ms(day: datetime.date) -> int:
+    return (day - EPOCH).days * DAY_MS
+
+
+def merge_stats(a: RollupStats | None, b: RollupStats) -> RollupStats:
+    if a is None:
+        return b
+    return (a[0] + b[0], a[1] + b[1], min(a[2], b[2]), max(a[3], b[3]))
+
+
+def record_assessment_runs(runs: Iterable[AssessmentRun]) -> None:
+    """Fold freshly written runs into the materialized read models.
+
+    Call this in the same transaction that inserts the runs (RunAssessmentView,
+    process_jobs). Runs without an organization are ignored. Runs are grouped
+    first, so a batch costs one upsert per (org, system) and per (org, system, day).
+    """
+
+    latest: Dict[Tuple[object, str], List[AssessmentRun]] = {}
+    rollups: Dict[Tuple[object, str, datetime.date], RollupStats] = {}
+    for run in runs:
+        if not run.organization_id:
+            continue
+        system_id = normalize_system_key(run.system_id)
+        latest.setdefault((run.organization_id, system_id), []).append(run)
+
+        score = int(run.score or 0)
+        day = day_from_ms(run.timestamp_ms)
+        stats = (1, score, score, score)
+        for key_system in (system_id, DailyScoreRollup.ALL_SYSTEMS):
+            key = (run.organization_id, key_system, day)
+            rollups[key] = merge_stats(rollups.get(key), stats)
+
+    for (org_id, system_id), system_runs in latest.items():
+        _upsert_latest(org_id, system_id, sorted(system_runs, key=lambda r: int(r.timestamp_ms)))
+    for (org_id, system_id, day), stats in rollups.items():
+        _upsert_rollup(org_id, system_id, day, stats)
+
+
+def _fold_run(row: LatestSystemScore, run: AssessmentRun) -> bool:
+    """Merge one run into a latest-score row in memory; returns whether it changed."""
+
+    ts = int(run.timestamp_ms)
+    if ts >= row.timestamp_ms:
+        row.previous_score = row.score
+        row.previous_timestamp_ms = row.timestamp_ms
+        row.run = run
+        row.score = int(run.score or 0)
+        row.coverage = float(run.coverage or 0.0)
+        row.timestamp_ms = ts
+        return True
+    if row.previous_timestamp_ms is None or ts >= row.previous_timestamp_ms:
+        # Late-arriving run that lands between the previous and latest runs.
+        row.previous_score = int(run.score or 0)
+        row.previous_timestamp_ms = ts
+        return True
+    return False
+
+
+def _upsert_latest(org_id, system_id: str, runs: List[AssessmentRun]) -> None:
+    """Apply ``runs`` (oldest first) to the org's latest-score row for ``system_id``."""
+
+    with transaction.atomic():
+        row = LatestSystemScore.objects.select_for_update().filter(organization_id=org_id, system_id=system_id).first()
+        if row is None:
+            first = runs[0]
+            candidate = LatestSystemScore(
+                organization_id=org_id,
+                system_id=system_id,
+                run=first,
+                score=int(first.score or 0),
+                coverage=float(first.coverage or 0.0),
+                timestamp_ms=int(first.timestamp_ms),
+            )
+            for run in runs[1:]:
+                _fold_run(candidate, run)
+            try:
+                with transaction.atomic():
+                    candidate.save(force_insert=True)
+                return
+            except IntegrityError:
+                # Another writer created the row first; fall through and merge.
+                row = LatestSystemScore.objects.select_for_update().get(organization_id=org_id, system_id=system_id)
+
+        changed = False
+        for run in runs:
+            changed = _fold_run(row, run) or changed
+        if changed:
+            row.save()
+
+
+def refresh_latest_score(org_id, system_id: str) -> None:
+    """Recompute one latest-score row from the two newest runs left for ``system_id``.
+
+    Used when runs are deleted, which ``_fold_run`` cannot undo. The row is
+    removed when the system has no runs left.
+    """
+
+    with transaction.atomic():
+        row = LatestSystemScore.objects.select_for_update().filter(organization_id=org_id, system_id=system_id).first()
+        runs = list(
+            AssessmentRun.objects.filter(organization_id=org_id, system_id__in=system_key_aliases(system_id))
+            .order_by("-timestamp_ms", "-id")[:2]
+        )
+        if not runs:
+            if row is not None:
+                row.delete()
+            return
+        newest = runs[0]
+        previous = runs[1] if len(runs) > 1 else None
+        fields = dict(
+            run=newest,
+            score=int(newest.score or 0),
+            coverage=float(newest.coverage or 0.0),
+            timestamp_ms=int(newest.timestamp_ms),
+            previous_score=int(previous.score or 0) if previous else None,
+            previous_timestamp_ms=int(previous.timestamp_ms) if previous else None,
+        )
+        if row is None:
+            LatestSystemScore.objects.create(organization_id=org_id, system_id=system_id, **fields)
+            return
+        for name, value in fields.items():
+            setattr(row, name, value)
+        row.save()
+
+
+@receiver(post_delete, sender=AssessmentRun)
+def _refresh_after_run_delete(sender, instance: AssessmentRun, **kwargs) -> None:
+    if not instance.organization_id:
+        return
+    system_id = normalize_system_key(instance.system_id)
+    row = LatestSystemScore.objects.filter(organization_id=instance.organization_id, system_id=system_id).first()
+    # Runs older than the row's previous score never show up in it.
+    if row is None or (row.previous_timestamp_ms is not None and int(instance.timestamp_ms) < row.previous_timestamp_ms):
+        return
+    refresh_latest_score(instance.organization_id, system_id)
+
+
+def _upsert_rollup(org_id, system_id: str, day: datetime.date, stats: RollupStats) -> None:
+    count, total, lo, hi = stats
+    qs = DailyScoreRollup.objects.filter(organization_id=org_id, system_id=system_id, day=day)
+    increment = dict(
+        run_count=F("run_count") + count,
+        score_sum=F("score_sum") + total,
+        score_min=Least(F("score_min"), Value(lo)),
+        score_max=Greatest(F("score_max"), Value(hi)),
+    )
+    # Single-statement increments are atomic without row locks.
+    if qs.update(**increment):
+        return
+    try:
+        with transaction.atomic():
+            DailyScoreRollup.objects.create(
+                organization_id=org_id,
+                system_id=system_id,
+                day=day,
+                run_count=count,
+                score_sum=total,
+                score_min=lo,
+                score_max=hi,
+            )
+    except IntegrityError:
+        qs.update(**increment)
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of api.domain's alias map at the time of this migration: later changes there must not change it.
+LEGACY_SYSTEM_ALIASES = {
+    "dependency": "interdependency",
+    "dependencies": "interdependency",
+    "analysis": "investigation",
+    "research": "investigation",
+    "insights": "interpretation",
+    "reporting": "illustration",
+    "visualization": "illustration",
+    "coordination": "inlignment",
+    "strategy": "inlignment",
+    "alignment": "inlignment",
+    "inlign": "inlignment",
+}
+
+
+def normalize_system_key(system_key):
+    if not system_key:
+        return "investigation"
+    k = str(system_key).strip().lower()
+    return LEGACY_SYSTEM_ALIASES.get(k, k)
+
+
+def backfill_latest_scores(apps, schema_editor):
+    AssessmentRun = apps.get_model("api", "AssessmentRun")
+    LatestSystemScore = apps.get_model("api", "LatestSystemScore")
+
+    latest = {}
+    runs = (
+        AssessmentRun.objects.exclude(organization=None)
+        .order_by("timestamp_ms")
+        .values_list("id", "organization_id", "system_id", "score", "coverage", "timestamp_ms")
+    )
+    for run_id, org_id, system_id, score, coverage, ts in runs.iterator(chunk_size=2000):
+        key = (org_id, normalize_system_key(system_id))
+        prev = latest.get(key)
+        latest[key] = LatestSystemScore(
+            organization_id=org_id,
+            system_id=key[1],
+            run_id=run_id,
+            score=int(score or 0),
+            coverage=float(coverage or 0.0),
+            timestamp_ms=int(ts),
+            previous_score=prev.score if prev else None,
+            previous_timestamp_ms=prev.timestamp_ms if prev else None,
+        )
+    LatestSystemScore.objects.bulk_create(latest.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_add_visitor_progress_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestSystemScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('system_id', models.CharField(max_length=64)),
+                ('score', models.PositiveIntegerField(default=0)),
+                ('coverage', models.FloatField(default=0.0)),
+                ('timestamp_ms', models.BigIntegerField()),
+                ('previous_score', models.PositiveIntegerField(blank=True, null=True)),
+                ('previous_timestamp_ms', models.BigIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='latest_scores', to='api.organization')),
+                ('run', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.assessmentrun')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('organization', 'system_id'), name='uniq_latest_score_org_system')],
+            },
+        ),
+        migrations.RunPython(backfill_latest_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_latestsystemscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyScoreRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('system_id', models.CharField(blank=True, default='', max_length=64)),
+                ('day', models.DateField()),
+                ('run_count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('score_min', models.PositiveIntegerField(default=0)),
+                ('score_max', models.PositiveIntegerField(default=0)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='api.organization')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('organization', 'system_id', 'day'), name='uniq_rollup_org_system_day')],
+            },
+        ),
+    ]
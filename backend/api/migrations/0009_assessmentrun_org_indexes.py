@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_dailyscorerollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assessmentrun',
+            index=models.Index(fields=['organization', 'system_id', '-timestamp_ms'], name='run_org_system_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessmentrun',
+            index=models.Index(fields=['organization', '-timestamp_ms'], name='run_org_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_job_priority_fairness'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='kind',
+            field=models.CharField(choices=[('analysis', 'Analysis'), ('ingest_upload', 'Ingest upload')], default='analysis', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='upload',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='api.upload'),
+        ),
+    ]
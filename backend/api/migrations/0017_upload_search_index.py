@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchCorpus',
+            fields=[
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_corpus', serialize=False, to='api.organization')),
+                ('documents', models.PositiveIntegerField(default=0)),
+                ('total_length', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='kind',
+            field=models.CharField(choices=[('analysis', 'Analysis'), ('ingest_upload', 'Ingest upload'), ('index_upload', 'Index upload')], default='analysis', max_length=32),
+        ),
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('length', models.PositiveIntegerField(default=0)),
+                ('terms', models.BinaryField(default=bytes)),
+                ('indexed_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.organization')),
+                ('upload', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_document', to='api.upload')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('doc_freq', models.PositiveIntegerField(default=0)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.organization')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchPostingBlock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_doc', models.BigIntegerField()),
+                ('last_doc', models.BigIntegerField()),
+                ('count', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+                ('term', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='blocks', to='api.searchterm')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('organization', 'term'), name='uniq_search_term_org_term'),
+        ),
+        migrations.AddIndex(
+            model_name='searchpostingblock',
+            index=models.Index(fields=['term', 'first_doc'], name='search_block_term_first_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_upload_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assessmentrun',
+            index=models.Index(fields=['organization', '-timestamp_ms', '-id'], name='run_page_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='assessmentrun',
+            name='run_org_ts_idx',
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['organization', '-created_at', '-id'], name='job_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['organization', '-updated_at', '-id'], name='job_updated_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['organization', '-timestamp_ms', '-id'], name='notification_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='organization',
+            index=models.Index(fields=['-created_at', '-id'], name='org_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='upload',
+            index=models.Index(fields=['organization', '-timestamp_ms', '-id'], name='upload_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(fields=['-created_at', '-id'], name='visitor_page_idx'),
+        ),
+        # Keyset pagination of /api/admin/users on the built-in auth table.
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS user_page_idx ON auth_user (date_joined DESC, id DESC)',
+            reverse_sql='DROP INDEX IF EXISTS user_page_idx',
+        ),
+    ]
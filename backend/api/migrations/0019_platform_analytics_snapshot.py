@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_list_page_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformAnalyticsSnapshot',
+            fields=[
+                ('key', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('version', models.PositiveSmallIntegerField(default=0)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('computed_at', models.DateTimeField()),
+                ('full_computed_at', models.DateTimeField()),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
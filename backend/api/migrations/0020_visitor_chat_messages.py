@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:38
+
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copies of api.chat at the time of this migration: later changes there must not change it.
+HISTORY_PREVIEW = 200
+
+
+def clean_messages(messages):
+    seen = set()
+    clean = []
+    for position, message in enumerate(messages):
+        if not isinstance(message, dict):
+            continue
+        role = str(message.get("role", "user"))[:32]
+        text = str(message.get("text", ""))[:5000]
+        timestamp = str(message.get("timestamp", ""))[:64]
+        message_id = str(message.get("id") or "")[:128]
+        if not message_id:
+            digest = hashlib.sha256("\x00".join((str(position), role, timestamp, text)).encode()).hexdigest()
+            message_id = f"sha256:{digest[:32]}"
+        if message_id not in seen:
+            seen.add(message_id)
+            clean.append({"id": message_id, "role": role, "text": text, "timestamp": timestamp})
+    return clean
+
+
+def explode_chat_history(apps, schema_editor):
+    Visitor = apps.get_model("api", "Visitor")
+    VisitorChatMessage = apps.get_model("api", "VisitorChatMessage")
+
+    batch = []
+    visitors = Visitor.objects.exclude(chat_history=[]).values_list("id", "chat_history")
+    for visitor_id, history in visitors.iterator(chunk_size=200):
+        if not isinstance(history, list):
+            continue
+        for m in clean_messages(history):
+            batch.append(VisitorChatMessage(
+                visitor_id=visitor_id, message_id=m["id"], role=m["role"], text=m["text"], timestamp=m["timestamp"],
+            ))
+        if len(batch) >= 2000:
+            VisitorChatMessage.objects.bulk_create(batch, batch_size=500)
+            batch = []
+    VisitorChatMessage.objects.bulk_create(batch, batch_size=500)
+
+
+def collapse_chat_history(apps, schema_editor):
+    Visitor = apps.get_model("api", "Visitor")
+    VisitorChatMessage = apps.get_model("api", "VisitorChatMessage")
+
+    for visitor_id in VisitorChatMessage.objects.values_list("visitor_id", flat=True).distinct().iterator():
+        rows = (
+            VisitorChatMessage.objects.filter(visitor_id=visitor_id)
+            .order_by("-id")
+            .values_list("message_id", "role", "text", "timestamp")[:HISTORY_PREVIEW]
+        )
+        history = [{"id": i, "role": role, "text": text, "timestamp": ts} for i, role, text, ts in list(rows)[::-1]]
+        Visitor.objects.filter(id=visitor_id).update(chat_history=history)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_platform_analytics_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitorChatMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message_id', models.CharField(max_length=128)),
+                ('role', models.CharField(default='user', max_length=32)),
+                ('text', models.TextField(blank=True, default='')),
+                ('timestamp', models.CharField(blank=True, default='', help_text='Client timestamp, as sent', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('visitor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_messages', to='api.visitor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['visitor', '-id'], name='chat_message_page_idx')],
+                'constraints': [models.UniqueConstraint(fields=('visitor', 'message_id'), name='chat_message_unique_id')],
+            },
+        ),
+        migrations.RunPython(explode_chat_history, collapse_chat_history),
+        migrations.RemoveField(
+            model_name='visitor',
+            name='chat_history',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_upload_session_finalizing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visitor',
+            name='progress_seqs',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
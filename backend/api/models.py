@@ -2,6 +2,7 @@ import uuid
 
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class Organization(models.Model):
@@ -36,6 +37,20 @@ class Organization(models.Model):
 
 	created_at = models.DateTimeField(auto_now_add=True)
 
+	class Meta:
+		indexes = [
+			# Keyset pagination (api.pagination) of list endpoints
+			models.Index(fields=["-created_at", "-id"], name="org_page_idx"),
+		]
+
+	def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+		# Instances built from JWT claims (api.tokens) defer everything but id/tier/status:
+		# the first deferred field read loads all of them in one query, not one per field.
+		deferred = self.get_deferred_fields()
+		if fields is not None and deferred and set(fields) <= deferred:
+			fields = deferred
+		super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
 	def __str__(self) -> str:  # pragma: no cover
 		return f"{self.name} ({self.slug})"
 
@@ -63,12 +78,57 @@ class UserProfile(models.Model):
 		return f"Profile({self.user_id})"
 
 
+class UploadAnalysis(models.Model):
+	"""Analysis of one file content, shared by every upload with the same SHA-256.
+
+	Written by the ``ingest_upload`` job; ``metrics`` holds the per-system metric
+	dicts derived by ``api.extract`` that assessments are scored from.
+	"""
+	sha256 = models.CharField(max_length=64)
+	version = models.PositiveSmallIntegerField()
+
+	analysis = models.JSONField(default=dict, blank=True)
+	metrics = models.JSONField(default=dict, blank=True)
+	rows = models.BigIntegerField(default=0)
+	elapsed_ms = models.PositiveIntegerField(default=0)
+
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["sha256", "version"], name="uniq_upload_analysis_sha_version"),
+		]
+
+	def __str__(self) -> str:  # pragma: no cover
+		return f"UploadAnalysis({self.sha256[:12]}, v{self.version})"
+
+
+class UploadBlob(models.Model):
+	"""One stored file content, at a path derived from its SHA-256 (see ``api.blobs``).
+
+	``refcount`` counts the uploads pointing at it; the file and the row are
+	deleted when it drops to zero (``store_blob`` recreates the row for new
+	uploads of the same content).
+	"""
+	sha256 = models.CharField(max_length=64, unique=True)
+	file = models.FileField(max_length=255)
+	size = models.BigIntegerField(default=0)
+	refcount = models.PositiveIntegerField(default=0)
+
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	def __str__(self) -> str:  # pragma: no cover
+		return f"UploadBlob({self.sha256[:12]}, refs={self.refcount})"
+
+
 class Upload(models.Model):
 	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 	organization = models.ForeignKey(Organization, on_delete=models.SET_NULL, null=True, blank=True)
 
 	name = models.CharField(max_length=512)
-	file = models.FileField(upload_to="uploads/", null=True, blank=True)
+	# New uploads point at their content-addressed blob; older ones keep their own file under uploads/
+	file = models.FileField(upload_to="uploads/", max_length=255, null=True, blank=True)
+	blob = models.ForeignKey(UploadBlob, on_delete=models.PROTECT, null=True, blank=True, related_name="uploads")
 
 	timestamp_ms = models.BigIntegerField()
 	analyzed_systems = models.JSONField(default=list)
@@ -76,12 +136,136 @@ class Upload(models.Model):
 	summary = models.TextField(blank=True, default="")
 	analyzed_preview = models.JSONField(default=dict, blank=True)
 
+	# Content hash (computed while the file streams in) and the analysis shared by that content
+	sha256 = models.CharField(max_length=64, blank=True, default="", db_index=True)
+	analysis = models.ForeignKey(UploadAnalysis, on_delete=models.SET_NULL, null=True, blank=True, related_name="uploads")
+
 	created_at = models.DateTimeField(auto_now_add=True)
 
+	class Meta:
+		indexes = [
+			models.Index(fields=["organization", "-timestamp_ms", "-id"], name="upload_page_idx"),
+		]
+
 	def __str__(self) -> str:  # pragma: no cover
 		return f"Upload({self.name})"
 
 
+class UploadSession(models.Model):
+	"""A resumable chunked upload in progress (see ``api.upload_sessions``)."""
+	class Status(models.TextChoices):
+		OPEN = "open", "Open"
+		FINALIZING = "finalizing", "Finalizing"
+		COMPLETED = "completed", "Completed"
+		ABORTED = "aborted", "Aborted"
+		FAILED = "failed", "Failed"
+
+	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+	organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="upload_sessions")
+	created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+
+	name = models.CharField(max_length=512)
+	size = models.BigIntegerField()
+	chunk_size = models.PositiveIntegerField()
+	# Optional whole-file SHA-256 declared by the client, checked on finalize
+	sha256 = models.CharField(max_length=64, blank=True, default="")
+	meta = models.JSONField(default=dict, blank=True)
+
+	status = models.CharField(max_length=16, choices=Status.choices, default=Status.OPEN)
+	upload = models.ForeignKey(Upload, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+	expires_at = models.DateTimeField()
+
+	created_at = models.DateTimeField(auto_now_add=True)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["expires_at"], name="upload_session_open_exp_idx", condition=models.Q(status="open")),
+		]
+
+	@property
+	def chunk_count(self) -> int:
+		return max(1, -(-self.size // self.chunk_size))
+
+	def __str__(self) -> str:  # pragma: no cover
+		return f"UploadSession({self.name}, {self.status})"
+
+
+class UploadChunk(models.Model):
+	"""A chunk of an ``UploadSession`` that has been written and verified."""
+	session = models.ForeignKey(UploadSession, on_delete=models.CASCADE, related_name="chunks")
+	index = models.PositiveIntegerField()
+	size = models.PositiveIntegerField()
+	sha256 = models.CharField(max_length=64)
+
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["session", "index"], name="uniq_upload_chunk_session_index"),
+		]
+
+
+class SearchCorpus(models.Model):
+	"""Per-org totals of the upload search index (``api.search``), for BM25's N and average length."""
+	organization = models.OneToOneField(Organization, on_delete=models.CASCADE, primary_key=True, related_name="search_corpus")
+	documents = models.PositiveIntegerField(default=0)
+	total_length = models.BigIntegerField(default=0)
+
+	updated_at = models.DateTimeField(auto_now=True)
+
+	def __str__(self) -> str:  # pragma: no cover
+		return f"SearchCorpus({self.organization_id}, {self.documents} docs)"
+
+
+class SearchTerm(models.Model):
+	"""A term of an org's upload search index with its document frequency."""
+	organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="+")
+	term = models.CharField(max_length=64)
+	doc_freq = models.PositiveIntegerField(default=0)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["organization", "term"], name="uniq_search_term_org_term"),
+		]
+
+	def __str__(self) -> str:  # pragma: no cover
+		return f"SearchTerm({self.term}, df={self.doc_freq})"
+
+
+class SearchDocument(models.Model):
+	"""An indexed upload; its ``id`` is the document number stored in postings."""
+	organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="+")
+	upload = models.OneToOneField(Upload, on_delete=models.CASCADE, related_name="search_document")
+	# Token count, and the ids of its terms (packed int64) so its postings can be found for removal
+	length = models.PositiveIntegerField(default=0)
+	terms = models.BinaryField(default=bytes)
+
+	indexed_at = models.DateTimeField(auto_now=True)
+
+	@property
+	def term_count(self) -> int:
+		return len(self.terms) // 8
+
+	def __str__(self) -> str:  # pragma: no cover
+		return f"SearchDocument({self.upload_id})"
+
+
+class SearchPostingBlock(models.Model):
+	"""A slice of a term's postings list: up to ``api.search.BLOCK_POSTINGS`` packed
+	(document, tf, document length) records in ascending document order."""
+	term = models.ForeignKey(SearchTerm, on_delete=models.CASCADE, db_index=False, related_name="blocks")
+	first_doc = models.BigIntegerField()
+	last_doc = models.BigIntegerField()
+	count = models.PositiveIntegerField()
+	data = models.BinaryField()
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["term", "first_doc"], name="search_block_term_first_idx"),
+		]
+
+
 class AssessmentRun(models.Model):
 	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 	organization = models.ForeignKey(Organization, on_delete=models.SET_NULL, null=True, blank=True)
@@ -99,30 +283,171 @@ class AssessmentRun(models.Model):
 	class Meta:
 		indexes = [
 			models.Index(fields=["system_id", "timestamp_ms"]),
+			models.Index(fields=["organization", "system_id", "-timestamp_ms"], name="run_org_system_ts_idx"),
+			# Also serves keyset pagination, hence the trailing id
+			models.Index(fields=["organization", "-timestamp_ms", "-id"], name="run_page_idx"),
+		]
+
+
+class LatestSystemScore(models.Model):
+	"""Newest AssessmentRun score per (organization, system).
+
+	Denormalised read model kept up to date by ``api.materialized`` whenever runs
+	are written, so dashboards read one row per system instead of scanning runs.
+	"""
+	organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="latest_scores")
+	system_id = models.CharField(max_length=64)
+	run = models.ForeignKey(AssessmentRun, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+
+	score = models.PositiveIntegerField(default=0)
+	coverage = models.FloatField(default=0.0)
+	timestamp_ms = models.BigIntegerField()
+	previous_score = models.PositiveIntegerField(null=True, blank=True)
+	previous_timestamp_ms = models.BigIntegerField(null=True, blank=True)
+
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["organization", "system_id"], name="uniq_latest_score_org_system"),
+		]
+
+	@property
+	def delta_mom(self) -> float:
+		if self.previous_score is None:
+			return 0.0
+		return round(float(self.score) - float(self.previous_score), 1)
+
+	def __str__(self) -> str:  # pragma: no cover
+		return f"LatestSystemScore({self.organization_id}, {self.system_id}={self.score})"
+
+
+class DailyScoreRollup(models.Model):
+	"""Per-org, per-UTC-day aggregate of AssessmentRun scores.
+
+	One row per system plus an "all systems" row with ``system_id=""``. Maintained
+	incrementally by ``api.materialized``; rebuild with ``manage.py backfill_rollups``.
+	"""
+	ALL_SYSTEMS = ""
+
+	organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="daily_rollups")
+	system_id = models.CharField(max_length=64, blank=True, default=ALL_SYSTEMS)
+	day = models.DateField()
+
+	run_count = models.PositiveIntegerField(default=0)
+	score_sum = models.BigIntegerField(default=0)
+	score_min = models.PositiveIntegerField(default=0)
+	score_max = models.PositiveIntegerField(default=0)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["organization", "system_id", "day"], name="uniq_rollup_org_system_day"),
 		]
 
+	@property
+	def average(self) -> float:
+		return self.score_sum / self.run_count if self.run_count else 0.0
+
+
+class PlatformAnalyticsSnapshot(models.Model):
+	"""Precomputed payload of the SuperAdmin platform analytics.
+
+	One row per ``key`` (currently only ``"platform"``), written by
+	``api.analytics.refresh_platform_analytics``: the monthly series are
+	recomputed from the month of the previous snapshot on, and everything is
+	recomputed from scratch once ``full_computed_at`` is older than
+	``ANALYTICS_SNAPSHOT_FULL_REFRESH_SECONDS``.
+	"""
+	key = models.CharField(max_length=32, primary_key=True)
+	version = models.PositiveSmallIntegerField(default=0)
+	payload = models.JSONField(default=dict, blank=True)
+	computed_at = models.DateTimeField()
+	full_computed_at = models.DateTimeField()
+	duration_ms = models.PositiveIntegerField(default=0)
+
+	def __str__(self) -> str:  # pragma: no cover
+		return f"PlatformAnalyticsSnapshot({self.key} @ {self.computed_at:%Y-%m-%d %H:%M})"
+
+	def __str__(self) -> str:  # pragma: no cover
+		return f"DailyScoreRollup({self.organization_id}, {self.system_id or '*'}, {self.day})"
+
 
 class Job(models.Model):
 	class Status(models.TextChoices):
 		PENDING = "pending", "Pending"
+		RUNNING = "running", "Running"
 		COMPLETED = "completed", "Completed"
 		FAILED = "failed", "Failed"
 
+	class Priority(models.IntegerChoices):
+		LOW = 0, "Low"
+		NORMAL = 5, "Normal"
+		HIGH = 10, "High"
+
+	class Kind(models.TextChoices):
+		ANALYSIS = "analysis", "Analysis"
+		INGEST_UPLOAD = "ingest_upload", "Ingest upload"
+		INDEX_UPLOAD = "index_upload", "Index upload"
+
 	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 	organization = models.ForeignKey(Organization, on_delete=models.SET_NULL, null=True, blank=True)
+	kind = models.CharField(max_length=32, choices=Kind.choices, default=Kind.ANALYSIS)
+	upload = models.ForeignKey(Upload, on_delete=models.SET_NULL, null=True, blank=True, related_name="jobs")
 
 	name = models.CharField(max_length=512, blank=True, default="")
 	system_id = models.CharField(max_length=64, blank=True, default="")
 	notify_to = models.EmailField(blank=True, default="")
 
 	status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+	# Orders a tenant's own pending jobs; fairness between tenants is decided by claim_jobs
+	priority = models.SmallIntegerField(choices=Priority.choices, default=Priority.NORMAL)
 	payload = models.JSONField(default=dict, blank=True)
 	result = models.JSONField(default=dict, blank=True)
 	error = models.TextField(blank=True, default="")
 
+	# Set when a worker claims the job (see api.jobs.claim_jobs)
+	claimed_by = models.CharField(max_length=128, blank=True, default="")
+	claimed_at = models.DateTimeField(null=True, blank=True)
+
+	# Leasing / retries: a running job whose lease lapses is re-queued by the reaper
+	lease_expires_at = models.DateTimeField(null=True, blank=True)
+	heartbeat_at = models.DateTimeField(null=True, blank=True)
+	attempts = models.PositiveIntegerField(default=0)
+	max_attempts = models.PositiveIntegerField(default=5)
+	next_attempt_at = models.DateTimeField(default=timezone.now)
+
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
+	class Meta:
+		indexes = [
+			# Only pending / running rows are indexed, so polling stays cheap however many finished jobs pile up.
+			models.Index(
+				fields=["next_attempt_at", "created_at"],
+				name="job_pending_due_idx",
+				condition=models.Q(status="pending"),
+			),
+			models.Index(
+				fields=["lease_expires_at"],
+				name="job_running_lease_idx",
+				condition=models.Q(status="running"),
+			),
+			# Per-tenant claims and fair-share accounting
+			models.Index(
+				fields=["organization", "-priority", "next_attempt_at", "created_at"],
+				name="job_pending_org_idx",
+				condition=models.Q(status="pending"),
+			),
+			models.Index(
+				fields=["organization"],
+				name="job_running_org_idx",
+				condition=models.Q(status="running"),
+			),
+			models.Index(fields=["claimed_at"], name="job_claimed_at_idx"),
+			models.Index(fields=["organization", "-created_at", "-id"], name="job_page_idx"),
+			models.Index(fields=["organization", "-updated_at", "-id"], name="job_updated_page_idx"),
+		]
+
 
 class Notification(models.Model):
 	class Channel(models.TextChoices):
@@ -142,6 +467,11 @@ class Notification(models.Model):
 
 	created_at = models.DateTimeField(auto_now_add=True)
 
+	class Meta:
+		indexes = [
+			models.Index(fields=["organization", "-timestamp_ms", "-id"], name="notification_page_idx"),
+		]
+
 class Visitor(models.Model):
 	"""Captures visitor/lead info from the public assessment page."""
 	class Status(models.TextChoices):
@@ -172,10 +502,11 @@ class Visitor(models.Model):
 	# Persistent data
 	assessment_count = models.PositiveIntegerField(default=0)
 	assessment_data = models.JSONField(default=list, blank=True, help_text="List of past assessment snapshots [{date, scores, analysis_summary}]")
-	chat_history = models.JSONField(default=list, blank=True, help_text="List of chat messages [{id, role, text, timestamp}]")
 	current_answers = models.JSONField(default=dict, blank=True, help_text="In-progress assessment answers {subAssessmentId: {questionId: answerValue}}")
 	current_step = models.PositiveSmallIntegerField(default=0, help_text="Last active step (0=form, 1=system select, 3=assessment)")
 	current_system_id = models.CharField(max_length=64, blank=True, default="", help_text="ID of the system currently being assessed")
+	# Client sequence number of the last save applied per answer path (api.progress)
+	progress_seqs = models.JSONField(default=dict, blank=True)
 	last_assessment_at = models.DateTimeField(null=True, blank=True)
 
 	created_at = models.DateTimeField(auto_now_add=True)
@@ -183,8 +514,37 @@ class Visitor(models.Model):
 
 	class Meta:
 		ordering = ["-created_at"]
+		indexes = [
+			models.Index(fields=["-created_at", "-id"], name="visitor_page_idx"),
+		]
 
 	def __str__(self) -> str:  # pragma: no cover
 		return f"Visitor({self.email} - {self.organization_name})"
 
+
+class VisitorChatMessage(models.Model):
+	"""One message of a visitor's assistant chat, appended by ``api.chat``.
+
+	``message_id`` is the client's id for the message; appends are idempotent
+	on ``(visitor, message_id)``, so re-sent messages are not stored twice.
+	Insertion order (``id``) is conversation order.
+	"""
+	visitor = models.ForeignKey(Visitor, on_delete=models.CASCADE, related_name="chat_messages")
+	message_id = models.CharField(max_length=128)
+	role = models.CharField(max_length=32, default="user")
+	text = models.TextField(blank=True, default="")
+	timestamp = models.CharField(max_length=64, blank=True, default="", help_text="Client timestamp, as sent")
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["visitor", "message_id"], name="chat_message_unique_id"),
+		]
+		indexes = [
+			models.Index(fields=["visitor", "-id"], name="chat_message_page_idx"),
+		]
+
+	def __str__(self) -> str:  # pragma: no cover
+		return f"VisitorChatMessage({self.visitor_id}:{self.message_id})"
+
 # Create your models here.
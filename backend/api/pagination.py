@@ -0,0 +1,129 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+Lists are ordered newest first by ``(key, pk)``, e.g. ``(timestamp_ms, id)``
+or ``(created_at, id)``. A page after a cursor is selected with
+``key <= last_key AND (key < last_key OR pk < last_pk)`` and ``LIMIT``, so the
+database seeks straight into an index ending in ``(key, pk)`` (see the
+``*_page_idx`` indexes) instead of counting past ``OFFSET`` rows: page 1000
+costs the same as page 1, and rows inserted meanwhile do not shift later pages.
+
+Cursors are opaque signed tokens carrying the last row's key and pk. Responses
+keep their JSON shape (a plain list); the next page's cursor is sent in the
+``X-Next-Cursor`` header and as a ``Link: <...>; rel="next"`` URL, and is
+absent on the last page. ``?limit=`` sets the page size, up to
+``PAGINATION_MAX_LIMIT``, and ``?fields=`` picks the fields returned
+(``api.fieldsets``).
+"""
+
+from __future__ import annotations
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+from rest_framework import status
+from rest_framework.response import Response
+
+from .fastserialize import ValuesSerializer, supports_values
+from .fieldsets import FieldsetError, requested_fields, sparse_queryset, sparse_serializer
+
+CURSOR_PARAM = "cursor"
+LIMIT_PARAM = "limit"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+_SALT = "api.pagination"
+
+
+class CursorError(ValueError):
+    """The ``cursor`` parameter is not a cursor issued for this list."""
+
+
+def page_limit(request, default: int) -> int:
+    max_limit = int(getattr(settings, "PAGINATION_MAX_LIMIT", 1000))
+    try:
+        limit = int(request.query_params.get(LIMIT_PARAM) or default)
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(max_limit, limit))
+
+
+def _encode(key: str, value, pk) -> str:
+    value = value.isoformat() if hasattr(value, "isoformat") else value
+    return signing.dumps([key, value, str(pk)], salt=_SALT)
+
+
+def _decode(qs: QuerySet, token: str, key: str) -> Tuple[Any, Any]:
+    try:
+        cursor_key, value, pk = signing.loads(token, salt=_SALT)
+    except (signing.BadSignature, TypeError, ValueError) as exc:
+        raise CursorError("invalid cursor") from exc
+    if cursor_key != key:
+        raise CursorError("cursor belongs to a different list")
+    meta = qs.model._meta
+    try:
+        return meta.get_field(key).to_python(value), meta.pk.to_python(pk)
+    except ValidationError as exc:
+        raise CursorError("invalid cursor") from exc
+
+
+def paginate(
+    request, qs: QuerySet, key: str, default_limit: int, columns: Optional[Sequence[str]] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """One page of ``qs`` ordered by ``(key, pk)`` descending, and the cursor of the next page (or None).
+
+    With ``columns``, rows are ``values_list`` tuples starting with those
+    columns (followed by ``key`` and ``pk`` if not among them) instead of model
+    instances. Raises ``CursorError`` for a malformed or foreign cursor.
+    """
+
+    limit = page_limit(request, default_limit)
+    qs = qs.order_by(f"-{key}", "-pk")
+    token = request.query_params.get(CURSOR_PARAM)
+    if token:
+        value, pk = _decode(qs, token, key)
+        qs = qs.filter(Q(**{f"{key}__lte": value}) & (Q(**{f"{key}__lt": value}) | Q(pk__lt=pk)))
+    if columns is not None:
+        columns = tuple(dict.fromkeys((*columns, key, "pk")))
+        qs = qs.values_list(*columns)
+    rows = list(qs[: limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        if columns is not None:
+            next_cursor = _encode(key, last[columns.index(key)], last[columns.index("pk")])
+        else:
+            next_cursor = _encode(key, getattr(last, key), last.pk)
+    return rows[:limit], next_cursor
+
+
+def page_response(request, data, next_cursor: Optional[str]) -> Response:
+    response = Response(data)
+    if next_cursor:
+        params = request.query_params.copy()
+        params[CURSOR_PARAM] = next_cursor
+        response[NEXT_CURSOR_HEADER] = next_cursor
+        response["Link"] = f'<{request.build_absolute_uri(request.path)}?{params.urlencode()}>; rel="next"'
+    return response
+
+
+def paginated(request, qs: QuerySet, key: str, default_limit: int, serializer_class, **serializer_kwargs) -> Response:
+    """``paginate`` + serialize + ``page_response``; a bad cursor or ``?fields=`` answers 400.
+
+    Serializers with ``values_fields`` are rendered from ``values_list()`` rows
+    (``api.fastserialize``) instead of model instances. ``?fields=``
+    (``api.fieldsets``) limits the fields rendered and the columns selected.
+    """
+
+    context = serializer_kwargs.get("context")
+    try:
+        fields = requested_fields(request, serializer_class, context)
+        fast = ValuesSerializer(serializer_class, context, fields) if supports_values(serializer_class) else None
+        if fast is None:
+            qs = sparse_queryset(qs, serializer_class, fields, keep=[key], context=context)
+        rows, next_cursor = paginate(request, qs, key, default_limit, columns=fast.columns if fast else None)
+    except (CursorError, FieldsetError) as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    data = fast.to_representation(rows) if fast else sparse_serializer(serializer_class, rows, fields, many=True, **serializer_kwargs).data
+    return page_response(request, data, next_cursor)
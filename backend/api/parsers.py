@@ -0,0 +1,31 @@
+"""orjson-backed JSON parser, installed as the default in ``REST_FRAMEWORK``.
+
+UTF-8 bodies are parsed with orjson. Other charsets, and bodies orjson rejects,
+go through DRF's ``JSONParser``: it accepts exactly what it always accepted
+(e.g. integers beyond 64 bits) and reports the same parse errors.
+"""
+
+from __future__ import annotations
+
+import codecs
+import io
+
+from rest_framework.parsers import JSONParser, get_encoding
+
+try:  # optional speed-up; JSONParser is used without it
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class ORJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        if orjson is None or codecs.lookup(get_encoding(parser_context)).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -5,18 +5,46 @@ from typing import Optional
 from rest_framework import permissions
 
 from .models import Organization
+from .tokens import ORG_CLAIM, org_from_claims
 
 
-def get_user_org(request) -> Optional[Organization]:
-    user = getattr(request, "user", None)
-    if not user or not getattr(user, "is_authenticated", False):
-        return None
+_UNSET = object()
+
+
+def _profile_org(user) -> Optional[Organization]:
     try:
         return user.profile.organization
     except Exception:
         return None
 
 
+def get_user_org(request) -> Optional[Organization]:
+    """The user's organization: from the principal cache (``api.principals``)
+    for users it authenticated, else from the access token's tenant claims when
+    present (``api.tokens``), else from the profile.
+
+    Cached on the request, so the permission check and the view share one lookup.
+    """
+
+    user = getattr(request, "user", None)
+    if not user or not getattr(user, "is_authenticated", False):
+        return None
+    org = getattr(request, "_tenant_org", _UNSET)
+    if org is not _UNSET:
+        return org
+
+    payload = getattr(getattr(request, "auth", None), "payload", None)
+    if getattr(user, "_principal", None) is not None:
+        # Profile and organization come attached (no query), and signals keep them fresher than claims.
+        org = _profile_org(user)
+    elif isinstance(payload, dict) and ORG_CLAIM in payload:
+        org = org_from_claims(payload)
+    else:
+        org = _profile_org(user)
+    request._tenant_org = org
+    return org
+
+
 class IsTenantUser(permissions.BasePermission):
     """Requires an authenticated user associated to an Organization."""
 
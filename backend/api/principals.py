@@ -0,0 +1,246 @@
+"""Cross-request principal cache for JWT-authenticated requests.
+
+``JWTAuthentication`` loads the user row on every request, and tenant views
+then read ``user.profile.organization`` on top. A *principal* is what those
+requests actually need — the user's own columns (not the password hash),
+profile id and status, and the organization's id, status and tier — cached
+under the user id in the ``PRINCIPAL_CACHE_ALIAS`` cache for
+``PRINCIPAL_CACHE_TTL_SECONDS``. ``PrincipalJWTAuthentication`` rebuilds
+``request.user`` from it with ``user.profile`` and ``user.profile.organization``
+attached, so a cache hit authenticates and resolves the tenant without a
+query. Any other field (e.g. ``user.password`` for ``check_password``) is
+loaded from the database on first access.
+
+Entries are dropped by ``post_save`` / ``post_delete`` signals on ``User``,
+``UserProfile`` and ``Organization`` (an organization change drops every
+member's entry). Queryset ``update()`` sends no signals: code that bulk-updates
+those tables calls ``invalidate_principals`` itself. Invalidation only reaches
+the configured cache, so multi-process deployments need a shared backend
+(``DJANGO_CACHE_BACKEND``); with the per-process default, other workers see a
+change once the TTL runs out.
+
+Hit, miss and invalidation counts are kept per process (``principal_stats``,
+``/api/admin/principal-cache``).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router, transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import Organization, UserProfile
+from .tokens import lazy_organization
+
+User = get_user_model()
+
+# Bump when ``Principal`` changes shape: older entries are then simply not found.
+_KEY_PREFIX = "principal:v1:"
+
+# Cached user columns, in model order (``from_db`` expects it); the password hash stays deferred.
+USER_FIELDS = tuple(f.attname for f in User._meta.concrete_fields if f.attname != "password")
+PROFILE_FIELDS = ("id", "user_id", "organization_id", "status")
+
+
+@dataclass(frozen=True)
+class Principal:
+    user: Tuple[Any, ...]  # USER_FIELDS values
+    profile_id: Optional[int]
+    profile_status: Optional[str]
+    org_id: Optional[str]
+    org_status: Optional[str]
+    tier: Optional[str]
+
+    @property
+    def user_id(self) -> int:
+        return self.user[USER_FIELDS.index("id")]
+
+    @property
+    def is_active(self) -> bool:
+        return self.user[USER_FIELDS.index("is_active")]
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        """From a user loaded with ``select_related("profile__organization")``."""
+
+        try:
+            profile = user.profile
+        except UserProfile.DoesNotExist:
+            profile = None
+        org = profile.organization if profile is not None else None
+        return cls(
+            user=tuple(getattr(user, name) for name in USER_FIELDS),
+            profile_id=profile.pk if profile is not None else None,
+            profile_status=profile.status if profile is not None else None,
+            org_id=str(org.pk) if org is not None else None,
+            org_status=org.status if org is not None else None,
+            tier=org.subscription_tier if org is not None else None,
+        )
+
+    def to_user(self):
+        """A ``User`` with this principal's columns loaded and ``profile`` (and its organization) attached.
+
+        The columns may be up to the TTL old: write these instances with
+        ``save(update_fields=[...])`` (or reload them first), never a full ``save()``.
+        """
+
+        user = User.from_db(router.db_for_read(User), list(USER_FIELDS), self.user)
+        profile = None
+        if self.profile_id is not None:
+            org_id = uuid.UUID(self.org_id) if self.org_id else None
+            values = (self.profile_id, self.user_id, org_id, self.profile_status)
+            profile = UserProfile.from_db(router.db_for_read(UserProfile), list(PROFILE_FIELDS), values)
+            UserProfile.user.field.set_cached_value(profile, user)
+            UserProfile.organization.field.set_cached_value(
+                profile, lazy_organization(self.org_id, self.tier, self.org_status)
+            )
+        # A cached None makes ``user.profile`` raise DoesNotExist without a query, like a missing row.
+        UserProfile.user.field.remote_field.set_cached_value(user, profile)
+        user._principal = self
+        return user
+
+
+class _Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def add(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses, invalidations = self.hits, self.misses, self.invalidations
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "invalidations": invalidations,
+            "hitRatio": round(hits / lookups, 4) if lookups else None,
+        }
+
+
+_stats = _Stats()
+
+
+def _cache():
+    return caches[getattr(settings, "PRINCIPAL_CACHE_ALIAS", "default")]
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "PRINCIPAL_CACHE_TTL_SECONDS", 60))
+
+
+def principal_key(user_id) -> str:
+    return f"{_KEY_PREFIX}{user_id}"
+
+
+def load_principal(user_id) -> Optional[Principal]:
+    """The principal straight from the database (one joined query), ``None`` for an unknown user."""
+
+    user = User.objects.select_related("profile__organization").filter(pk=user_id).first()
+    return Principal.from_user(user) if user is not None else None
+
+
+def get_principal(user_id) -> Optional[Principal]:
+    """The cached principal of ``user_id``, loaded and cached on a miss."""
+
+    cache = _cache()
+    key = principal_key(user_id)
+    principal = cache.get(key)
+    if principal is not None:
+        _stats.add("hits")
+        return principal
+    _stats.add("misses")
+    principal = load_principal(user_id)
+    if principal is not None:
+        cache.set(key, principal, _ttl())
+    return principal
+
+
+def invalidate_principals(user_ids: Iterable[Any]) -> None:
+    """Drop cached principals; again after commit when called inside a transaction.
+
+    The second pass covers a concurrent request re-caching the old rows
+    between the write and its commit.
+    """
+
+    keys = [principal_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+
+    def drop():
+        _cache().delete_many(keys)
+
+    drop()
+    _stats.add("invalidations", len(keys))
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(drop)
+
+
+def principal_stats() -> Dict[str, Any]:
+    cache_alias = getattr(settings, "PRINCIPAL_CACHE_ALIAS", "default")
+    return {
+        **_stats.snapshot(),
+        "pid": os.getpid(),
+        "cache": cache_alias,
+        "backend": settings.CACHES[cache_alias]["BACKEND"],
+        "ttlSeconds": _ttl(),
+    }
+
+
+class PrincipalJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` serving the user from the principal cache."""
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != "id":
+            # Needs the password hash, or looks users up by another column.
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        principal = get_principal(user_id)
+        if principal is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not principal.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return principal.to_user()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def _user_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return  # every login; nothing authorization depends on
+    invalidate_principals([instance.pk])
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def _profile_changed(sender, instance, **kwargs):
+    invalidate_principals([instance.user_id])
+
+
+@receiver(post_save, sender=Organization)
+@receiver(pre_delete, sender=Organization)
+def _organization_changed(sender, instance, **kwargs):
+    # pre_delete: once deleted, the members' profiles no longer point at it.
+    invalidate_principals(UserProfile.objects.filter(organization_id=instance.pk).values_list("user_id", flat=True))
@@ -0,0 +1,348 @@
+"""Write-behind buffer for visitor assessment progress (``/api/visitors/save-progress``).
+
+The assessment page autosaves on nearly every answer change. Instead of a
+``Visitor`` fetch and a rewrite of the whole ``current_answers`` JSON per
+call, updates are queued in this process and coalesced per visitor:
+a flush thread writes every ``PROGRESS_FLUSH_SECONDS``, in one transaction that
+locks the pending visitors' rows, applies their queued changes on top of what
+is stored and writes them back with one ``bulk_update``. A visitor typing
+continuously costs one write per flush interval, however often the client
+saves.
+
+Answers are changed with JSON-patch style operations (RFC 6902 ``add``,
+``replace`` and ``remove`` with JSON Pointer paths, e.g.
+``{"op": "replace", "path": "/finance/q3", "value": 4}``); a full
+``current_answers`` dict from older clients is a ``replace`` of the root.
+Queued operations on the same path collapse to the last one, and an operation
+on a path supersedes queued operations below it. Operations are applied to the
+stored answers at flush time, so saves from different worker processes to
+disjoint paths don't overwrite each other.
+
+Each worker flushes on its own timer, so saves to the same path (or a root
+``replace``) that land in different workers would be applied in flush order,
+not request order. Clients therefore stamp each save with an increasing
+``seq``. The visitor row keeps the ``seq`` last applied per path
+(``Visitor.progress_seqs``), and a flush drops an operation if that path, a
+parent or a child was already written by a later save. Step and system are
+ordered the same way. Saves without ``seq`` (older clients) are applied in
+flush order.
+
+Reads of a visitor's progress (lookup, capture) flush that visitor's pending
+saves in the current process first (``flush_visitor``). Saves still buffered
+in other workers show up within ``PROGRESS_FLUSH_SECONDS``.
+
+Crash safety: queued changes live only in this process's memory until the
+next flush. A graceful shutdown (SIGTERM, interpreter exit) flushes them; a
+hard crash (SIGKILL, OOM kill, power loss) loses at most the last
+``PROGRESS_FLUSH_SECONDS`` of progress. That is acceptable for autosave: the
+page also keeps answers in ``localStorage`` and re-sends them, and assessment
+results are saved synchronously (``save-assessment``). ``PROGRESS_FLUSH_SECONDS
+= 0`` writes through on every request instead.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Visitor
+
+logger = logging.getLogger(__name__)
+
+PATCH_OPS = ("add", "replace", "remove")
+# Visitor ids known to exist, so repeat saves skip the existence check.
+KNOWN_VISITORS = 10_000
+# progress_seqs keys of the step and system (not JSON pointers, which are "" or start with "/")
+STEP_KEY = "@step"
+SYSTEM_KEY = "@system"
+
+
+class PatchError(ValueError):
+    """A malformed JSON-patch operation."""
+
+
+def _parse_pointer(path: str) -> List[str]:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise PatchError(f"path must be empty or start with '/': {path!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in path[1:].split("/")]
+
+
+def parse_patch(ops: Any) -> List[Dict[str, Any]]:
+    """Validated operations; raises ``PatchError``."""
+
+    if not isinstance(ops, list):
+        raise PatchError("answers_patch must be a list of operations")
+    parsed = []
+    for op in ops:
+        if not isinstance(op, dict) or op.get("op") not in PATCH_OPS or not isinstance(op.get("path"), str):
+            raise PatchError(f"each operation needs op ({', '.join(PATCH_OPS)}) and path")
+        if op["op"] != "remove" and "value" not in op:
+            raise PatchError(f"{op['op']} needs a value")
+        tokens = _parse_pointer(op["path"])
+        if not tokens and (op["op"] == "remove" or not isinstance(op["value"], dict)):
+            raise PatchError("the root can only be replaced by an object")
+        parsed.append({"op": op["op"], "path": op["path"], "value": op.get("value")})
+    return parsed
+
+
+def _related(a: str, b: str) -> bool:
+    """Whether writing one path can change the value at the other (same path, parent or child)."""
+
+    return a == b or a == "" or b == "" or b.startswith(a + "/") or a.startswith(b + "/")
+
+
+def apply_patch(document: Dict[str, Any], ops: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply operations to a nested dict; missing parents are created, removing a missing key is a no-op."""
+
+    document = dict(document) if isinstance(document, dict) else {}
+    for op in ops:
+        tokens = _parse_pointer(op["path"])
+        if not tokens:
+            document = dict(op["value"])
+            continue
+        parent = document
+        for token in tokens[:-1]:
+            child = parent.get(token)
+            if not isinstance(child, dict):
+                if op["op"] == "remove":
+                    break
+                child = parent[token] = {}
+            parent = child
+        else:
+            if op["op"] == "remove":
+                parent.pop(tokens[-1], None)
+            else:
+                parent[tokens[-1]] = op["value"]
+    return document
+
+
+def _newer(seq: Optional[int], than: Optional[int]) -> bool:
+    """Whether a save stamped ``seq`` may overwrite one stamped ``than`` (unstamped saves always may).
+
+    Equal stamps are operations of the same save (or its retry), applied in order.
+    """
+
+    return seq is None or than is None or seq >= than
+
+
+@dataclass
+class PendingProgress:
+    # path -> last queued operation on it, in queue order; ops carry the save's "seq" (or None)
+    ops: "OrderedDict[str, Dict[str, Any]]" = field(default_factory=OrderedDict)
+    step: Optional[int] = None
+    step_seq: Optional[int] = None
+    system_id: Optional[str] = None
+    system_seq: Optional[int] = None
+
+    def add_ops(self, ops: Iterable[Dict[str, Any]]) -> None:
+        for op in ops:
+            path = op["path"]
+            related = [p for p in self.ops if _related(p, path)]
+            if any(not _newer(op.get("seq"), self.ops[p].get("seq")) for p in related):
+                continue  # an already queued save is newer
+            prefix = path + "/"
+            for queued in related:
+                if queued == path or queued.startswith(prefix) or path == "":
+                    del self.ops[queued]
+            self.ops[path] = op
+
+    def set_step(self, step: int, seq: Optional[int]) -> None:
+        if _newer(seq, self.step_seq) or self.step is None:
+            self.step, self.step_seq = step, seq
+
+    def set_system(self, system_id: str, seq: Optional[int]) -> None:
+        if _newer(seq, self.system_seq) or self.system_id is None:
+            self.system_id, self.system_seq = system_id, seq
+
+    def merge(self, newer: "PendingProgress") -> None:
+        """Fold in updates queued after this one was taken for a flush."""
+
+        self.add_ops(newer.ops.values())
+        if newer.step is not None:
+            self.set_step(newer.step, newer.step_seq)
+        if newer.system_id is not None:
+            self.set_system(newer.system_id, newer.system_seq)
+
+
+class ProgressBuffer:
+    """Per-process buffer of pending progress updates, flushed by a background thread."""
+
+    def __init__(self, interval: float):
+        self.interval = float(interval)
+        self._lock = threading.Lock()
+        self._pending: Dict[str, PendingProgress] = {}
+        self._known: "OrderedDict[str, None]" = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stop = threading.Event()
+        self.writes = 0  # rows written, for benchmarks
+
+    def visitor_exists(self, visitor_id: str) -> bool:
+        with self._lock:
+            if visitor_id in self._known:
+                self._known.move_to_end(visitor_id)
+                return True
+        if not Visitor.objects.filter(id=visitor_id).exists():
+            return False
+        with self._lock:
+            self._known[visitor_id] = None
+            while len(self._known) > KNOWN_VISITORS:
+                self._known.popitem(last=False)
+        return True
+
+    def enqueue(
+        self,
+        visitor_id: str,
+        ops: Iterable[Dict[str, Any]] = (),
+        step: Optional[int] = None,
+        system_id: Optional[str] = None,
+        seq: Optional[int] = None,
+    ) -> None:
+        """Queue one save; ``seq`` is the client's increasing save number (None for older clients)."""
+
+        with self._lock:
+            pending = self._pending.setdefault(visitor_id, PendingProgress())
+            pending.add_ops({**op, "seq": seq} for op in ops)
+            if step is not None:
+                pending.set_step(step, seq)
+            if system_id is not None:
+                pending.set_system(system_id, seq)
+        if self.interval <= 0:
+            self.flush()
+        else:
+            self._ensure_thread()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Write every pending visitor now; returns the number of rows written."""
+
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        return self._write(batch)
+
+    def flush_visitor(self, visitor_id: str) -> int:
+        """Write one visitor's pending updates now, before its progress is read; returns rows written."""
+
+        with self._lock:
+            pending = self._pending.pop(visitor_id, None)
+        return self._write({visitor_id: pending} if pending is not None else {})
+
+    def _write(self, batch: Dict[str, PendingProgress]) -> int:
+        if not batch:
+            return 0
+        try:
+            written = _write(batch)
+        except DatabaseError:
+            with self._lock:  # keep them (newer updates win) for the next flush
+                for visitor_id, pending in batch.items():
+                    newer = self._pending.get(visitor_id)
+                    if newer is not None:
+                        pending.merge(newer)
+                    self._pending[visitor_id] = pending
+            raise
+        self.writes += written
+        return written
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._flush_loop, name="progress-flush", daemon=True)
+            self._thread.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except DatabaseError as exc:
+                logger.warning("progress flush failed, retrying next interval: %s", exc)
+            finally:
+                close_old_connections()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write what is pending (called at interpreter exit)."""
+
+        self._stop.set()
+        try:
+            self.flush()
+        except DatabaseError as exc:
+            logger.error("progress flush at shutdown failed; %d visitor(s) lost: %s", self.pending_count(), exc)
+
+
+def _in_order(seqs: Dict[str, int], ops: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The operations not overtaken by a stored later save; records the applied ones in ``seqs``."""
+
+    applied = []
+    for op in ops:
+        path, seq = op["path"], op.get("seq")
+        if seq is not None:
+            related = [p for p in seqs if p[:1] != "@" and _related(p, path)]
+            if any(not _newer(seq, seqs[p]) for p in related):
+                continue
+            for p in related:
+                if p == path or p.startswith(path + "/") or path == "":
+                    del seqs[p]
+            seqs[path] = seq
+        applied.append(op)
+    return applied
+
+
+def _write(batch: Dict[str, PendingProgress]) -> int:
+    now = timezone.now()
+    with transaction.atomic():
+        visitors = list(
+            Visitor.objects.select_for_update()
+            .filter(id__in=list(batch))
+            .only("id", "current_answers", "current_step", "current_system_id", "progress_seqs")
+            .order_by("id")  # same lock order in every process
+        )
+        for visitor in visitors:
+            pending = batch[str(visitor.id)]
+            seqs = dict(visitor.progress_seqs or {})
+            ops = _in_order(seqs, pending.ops.values())
+            if ops:
+                visitor.current_answers = apply_patch(visitor.current_answers, ops)
+            if pending.step is not None and _newer(pending.step_seq, seqs.get(STEP_KEY)):
+                visitor.current_step = pending.step
+                if pending.step_seq is not None:
+                    seqs[STEP_KEY] = pending.step_seq
+            if pending.system_id is not None and _newer(pending.system_seq, seqs.get(SYSTEM_KEY)):
+                visitor.current_system_id = pending.system_id
+                if pending.system_seq is not None:
+                    seqs[SYSTEM_KEY] = pending.system_seq
+            visitor.progress_seqs = seqs
+            visitor.updated_at = now
+        Visitor.objects.bulk_update(visitors, ["current_answers", "current_step", "current_system_id", "progress_seqs", "updated_at"])
+    return len(visitors)
+
+
+_buffer: Optional[ProgressBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def progress_buffer() -> ProgressBuffer:
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ProgressBuffer(float(getattr(settings, "PROGRESS_FLUSH_SECONDS", 3)))
+                atexit.register(_buffer.stop)
+    return _buffer
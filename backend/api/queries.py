@@ -0,0 +1,121 @@
+"""Read-side queries for per-org dashboards.
+
+Everything here filters on ``organization`` first so it can use the
+``(organization, system_id, -timestamp_ms)`` / ``(organization, -timestamp_ms)``
+indexes on AssessmentRun, and pushes "top K per system" (a ``ROW_NUMBER()``
+window) and "per day" work into the database instead of scanning runs in
+Python. Latest scores and daily series are read from the rows
+``api.materialized`` maintains (``LatestSystemScore``, ``DailyScoreRollup``).
+
+Legacy rows may carry non-canonical system ids (e.g. "analysis"); results are
+keyed by canonical system key and merged after the database has already cut
+the data down to a handful of rows per stored id.
+"""
+
+from __future__ import annotations
+
+import datetime
+from typing import Dict, List, Optional
+
+from django.db.models import BigIntegerField, Count, ExpressionWrapper, F, Max, Min, Sum, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .domain import normalize_system_key, system_key_aliases
+from .materialized import DAY_MS, EPOCH
+from .models import AssessmentRun, DailyScoreRollup, LatestSystemScore, Organization
+
+
+def _org_runs(org: Organization, system_key: Optional[str] = None):
+    qs = AssessmentRun.objects.filter(organization=org)
+    if system_key:
+        qs = qs.filter(system_id__in=system_key_aliases(system_key))
+    return qs
+
+
+def last_runs_per_system(org: Organization, k: int, system_key: Optional[str] = None) -> Dict[str, List[AssessmentRun]]:
+    """Up to ``k`` newest runs per canonical system key, newest first."""
+
+    k = max(1, int(k))
+    ranked = (
+        _org_runs(org, system_key)
+        .annotate(
+            rn=Window(
+                expression=RowNumber(),
+                partition_by=[F("system_id")],
+                order_by=[F("timestamp_ms").desc(), F("id").desc()],
+            )
+        )
+        .filter(rn__lte=k)
+    )
+
+    out: Dict[str, List[AssessmentRun]] = {}
+    for run in ranked:
+        out.setdefault(normalize_system_key(run.system_id), []).append(run)
+    for key, runs in out.items():
+        runs.sort(key=lambda r: int(r.timestamp_ms or 0), reverse=True)
+        del runs[k:]
+    return out
+
+
+def _daily_grouped(org: Organization, system_key: Optional[str] = None, by_system: bool = False):
+    day_idx = ExpressionWrapper(F("timestamp_ms") / DAY_MS, output_field=BigIntegerField())
+    group = ["system_id", "day_idx"] if by_system else ["day_idx"]
+    return (
+        _org_runs(org, system_key)
+        .annotate(day_idx=day_idx)
+        .values(*group)
+        .annotate(n=Count("id"), total=Sum("score"), lo=Min("score"), hi=Max("score"))
+    )
+
+
+def _with_day(g: Dict[str, object]) -> Dict[str, object]:
+    g["day"] = EPOCH + datetime.timedelta(days=int(g.pop("day_idx")))
+    return g
+
+
+def daily_score_stats(org: Organization, system_key: Optional[str] = None, by_system: bool = False):
+    """Per-day (count, sum, min, max) of run scores, grouped in the database.
+
+    Yields dicts with ``day`` (date), ``n``, ``total``, ``lo``, ``hi`` and, when
+    ``by_system`` is set, the stored ``system_id`` (not yet normalized).
+    """
+
+    for g in _daily_grouped(org, system_key, by_system).order_by("day_idx").iterator():
+        yield _with_day(g)
+
+
+def latest_system_scores(org: Organization) -> Dict[str, LatestSystemScore]:
+    """Materialized latest score row per canonical system key."""
+
+    return {row.system_id: row for row in LatestSystemScore.objects.filter(organization=org)}
+
+
+def recent_rollups(
+    org: Organization,
+    system_id: str = DailyScoreRollup.ALL_SYSTEMS,
+    count: int = 14,
+) -> List[DailyScoreRollup]:
+    """The ``count`` most recent day buckets that have runs, however far back, oldest first."""
+
+    rows = list(
+        DailyScoreRollup.objects.filter(organization=org, system_id=system_id).order_by("-day")[: max(1, int(count))]
+    )
+    rows.reverse()
+    return rows
+
+
+def daily_rollups(
+    org: Organization,
+    system_id: str = DailyScoreRollup.ALL_SYSTEMS,
+    days: int = 14,
+    today: Optional[datetime.date] = None,
+) -> List[DailyScoreRollup]:
+    """Day buckets of the last ``days`` calendar days (UTC, today included), oldest first.
+
+    Days without runs have no bucket; they are gaps, not zero scores.
+    """
+
+    today = today or timezone.now().astimezone(datetime.timezone.utc).date()
+    since = today - datetime.timedelta(days=max(1, int(days)) - 1)
+    return list(DailyScoreRollup.objects.filter(organization=org, system_id=system_id, day__gte=since).order_by("day"))
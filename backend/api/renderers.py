@@ -0,0 +1,48 @@
+"""orjson-backed JSON renderer, installed as the default in ``REST_FRAMEWORK``.
+
+Produces the same bytes as DRF's ``JSONRenderer`` with the default compact,
+unicode settings: compact separators, UTF-8 output, datetimes as ISO 8601 with
+``Z`` for UTC, U+2028/U+2029 escaped. Types orjson does not know natively go
+through DRF's own ``JSONEncoder.default``. Anything orjson still rejects
+(e.g. integers beyond 64 bits), indented output (``; indent=`` or the browsable
+API) and non-default ``COMPACT_JSON``/``UNICODE_JSON`` settings fall back to
+``JSONRenderer``, as does a missing ``orjson`` install.
+
+Known difference: floats that Python prints in exponent form (``1e-07``,
+``1e+16``) are written the way orjson prints them (``1e-7``, ``1e16``); they
+parse to the same number.
+"""
+
+from __future__ import annotations
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:  # optional speed-up; JSONRenderer is used without it
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+_default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        try:
+            ret = orjson.dumps(data, default=_default, option=_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer: keep the output a strict JavaScript subset.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
@@ -0,0 +1,336 @@
+"""Per-organization full-text search over uploads (inverted index + BM25).
+
+The index lives in the database:
+
+- ``SearchTerm``: one row per (org, term) with its document frequency;
+- ``SearchDocument``: one row per indexed upload, with its length in tokens
+  and the ids of its terms;
+- ``SearchPostingBlock``: a term's postings list, cut into blocks of up to
+  ``BLOCK_POSTINGS`` packed ``POSTING`` records (document, tf, document
+  length; 16 bytes each) in ascending document order;
+- ``SearchCorpus``: the org's document count and total length.
+
+It is maintained incrementally. ``index_upload`` (run by the ``index_upload``
+job) appends one record to the tail block of each of the document's terms, so
+adding a document rewrites at most one block per term whatever the size of the
+corpus. Removing a document (re-indexing, or deleting the upload) rewrites the
+blocks that hold it. Writers of an org are serialized on its ``SearchCorpus``
+row.
+
+``search_uploads`` loads only the query terms' blocks and scores them with
+Okapi BM25 (``k1 = BM25_K1``, ``b = BM25_B``) in NumPy: the document length
+travels with each posting, so no per-document lookups are needed until the top
+k are known. Tokenization matches ``src/lib/rag.js``: lowercase ASCII letters
+and digits.
+"""
+
+from __future__ import annotations
+
+import io
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .documents import DocumentError, iter_docx_paragraphs, iter_xlsx_rows, office_format
+from .ingest import DOCX_PARAGRAPH_CHARS, XLSX_CELL_CHARS, Budget, IngestError
+from .models import Organization, SearchCorpus, SearchDocument, SearchPostingBlock, SearchTerm, Upload
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+BLOCK_POSTINGS = 512
+MAX_TERM_CHARS = 64
+MAX_QUERY_TERMS = 32
+MAX_RESULTS = 100
+BATCH_SIZE = 900  # stays under SQLite's default limit of 999 query parameters
+WRITE_BATCH_SIZE = 100  # blocks per bulk write (each up to BLOCK_POSTINGS * 16 bytes)
+READ_BYTES = 256 * 1024
+
+POSTING = np.dtype([("doc", "<i8"), ("tf", "<u4"), ("length", "<u4")])
+_TF_MAX = np.iinfo(np.uint32).max
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) <= MAX_TERM_CHARS]
+
+
+def _batches(items: Sequence, size: int = BATCH_SIZE) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# ---------------------------------------------------------------------------
+# Text extraction
+# ---------------------------------------------------------------------------
+
+
+def _text_blocks(upload: Upload) -> Iterator[str]:
+    """The upload's name, then its file's text in blocks.
+
+    The type is sniffed from the content (upload names need not carry an
+    extension): XLSX and DOCX by their zip parts, PDF (no text reader; name
+    only) by its magic bytes, anything else is read as UTF-8 text.
+    """
+
+    yield upload.name
+    if not upload.file:
+        return
+    with upload.file.open("rb") as fh:
+        fmt = office_format(fh)
+        if fmt == "xlsx":
+            # Cells cut while parsing: a row's text stays bounded however far the sheet expands.
+            for row in iter_xlsx_rows(fh, Budget(), max_cell_chars=XLSX_CELL_CHARS):
+                yield "\t".join(row)
+        elif fmt == "docx":
+            for _, text in iter_docx_paragraphs(fh, Budget(), max_paragraph_chars=DOCX_PARAGRAPH_CHARS):
+                yield text
+        elif fh.read(5) != b"%PDF-":
+            fh.seek(0)
+            text = io.TextIOWrapper(getattr(fh, "file", fh), encoding="utf-8-sig", errors="replace")
+            try:
+                yield from iter(lambda: text.read(READ_BYTES), "")
+            finally:
+                text.detach()
+
+
+def upload_text(upload: Upload, max_chars: Optional[int] = None) -> str:
+    """Text indexed for ``upload``: its name and the first ``SEARCH_INDEX_MAX_CHARS`` characters of its file."""
+
+    if max_chars is None:
+        max_chars = int(getattr(settings, "SEARCH_INDEX_MAX_CHARS", 1_000_000))
+    parts: List[str] = []
+    remaining = max_chars
+    for block in _text_blocks(upload):
+        parts.append(block[:remaining])
+        remaining -= len(parts[-1]) + 1
+        if remaining <= 0:
+            break
+    return "\n".join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Index maintenance
+# ---------------------------------------------------------------------------
+
+
+def _postings(data) -> np.ndarray:
+    return np.frombuffer(data, dtype=POSTING)
+
+
+def _term_ids(org_id, terms: Sequence[str]) -> Dict[str, int]:
+    ids: Dict[str, int] = {}
+    for batch in _batches(terms):
+        ids.update(SearchTerm.objects.filter(organization_id=org_id, term__in=batch).values_list("term", "id"))
+    return ids
+
+
+def _append_postings(document: SearchDocument, tfs: Dict[int, int]) -> None:
+    """Append ``document`` (newer than every indexed one) to the postings list of each term in ``tfs``."""
+
+    grown: List[SearchPostingBlock] = []
+    created: List[SearchPostingBlock] = []
+    term_ids = sorted(tfs)
+    for batch in _batches(term_ids):
+        tails = dict(
+            SearchPostingBlock.objects.filter(term_id__in=batch)
+            .values("term_id")
+            .annotate(first=Max("first_doc"))
+            .values_list("term_id", "first")
+        )
+        blocks = {
+            block.term_id: block
+            for block in SearchPostingBlock.objects.filter(term_id__in=list(tails), first_doc__in=set(tails.values()))
+            if tails.get(block.term_id) == block.first_doc
+        }
+        for term_id in batch:
+            record = np.array([(document.id, min(tfs[term_id], _TF_MAX), document.length)], dtype=POSTING).tobytes()
+            block = blocks.get(term_id)
+            if block is not None and block.count < BLOCK_POSTINGS:
+                block.data = bytes(block.data) + record
+                block.count += 1
+                block.last_doc = document.id
+                grown.append(block)
+            else:
+                created.append(
+                    SearchPostingBlock(term_id=term_id, first_doc=document.id, last_doc=document.id, count=1, data=record)
+                )
+    SearchPostingBlock.objects.bulk_update(grown, ["data", "count", "last_doc"], batch_size=WRITE_BATCH_SIZE)
+    SearchPostingBlock.objects.bulk_create(created, batch_size=WRITE_BATCH_SIZE)
+
+
+def _unindex(document: SearchDocument) -> None:
+    """Remove ``document`` from the index, adjusting frequencies and totals (in the caller's transaction)."""
+
+    term_ids = sorted(np.frombuffer(document.terms, dtype="<i8").tolist())
+    shrunk: List[SearchPostingBlock] = []
+    emptied: List[int] = []
+    for batch in _batches(term_ids):
+        SearchTerm.objects.filter(id__in=batch).update(doc_freq=F("doc_freq") - 1)
+        holding = SearchPostingBlock.objects.filter(
+            term_id__in=batch, first_doc__lte=document.id, last_doc__gte=document.id
+        )
+        for block in holding:
+            postings = _postings(block.data)
+            kept = postings[postings["doc"] != document.id]
+            if len(kept) == len(postings):
+                continue
+            if not len(kept):
+                emptied.append(block.id)
+                continue
+            block.data = kept.tobytes()
+            block.count = len(kept)
+            block.first_doc = int(kept["doc"][0])
+            block.last_doc = int(kept["doc"][-1])
+            shrunk.append(block)
+    SearchPostingBlock.objects.bulk_update(shrunk, ["data", "count", "first_doc", "last_doc"], batch_size=WRITE_BATCH_SIZE)
+    for batch in _batches(emptied):
+        SearchPostingBlock.objects.filter(id__in=batch).delete()
+    SearchCorpus.objects.filter(organization_id=document.organization_id).update(
+        documents=F("documents") - 1, total_length=F("total_length") - document.length
+    )
+    document.delete()
+
+
+def _lock_corpus(org_id) -> SearchCorpus:
+    # Serializes index writes per org (blocks are read-modify-written).
+    SearchCorpus.objects.get_or_create(organization_id=org_id)
+    return SearchCorpus.objects.select_for_update().get(organization_id=org_id)
+
+
+def index_upload(upload: Upload, text: Optional[str] = None) -> Optional[SearchDocument]:
+    """(Re)index ``upload`` from ``text`` (default: ``upload_text``). Uploads without an org are not indexed."""
+
+    if not upload.organization_id:
+        return None
+    if text is None:
+        try:
+            text = upload_text(upload)
+        except (DocumentError, IngestError):
+            # Unreadable documents are still findable by name.
+            text = upload.name
+    counts = Counter(tokenize(text))
+    terms = sorted(counts)
+    org_id = upload.organization_id
+
+    with transaction.atomic():
+        _lock_corpus(org_id)
+        previous = SearchDocument.objects.filter(upload=upload).first()
+        if previous is not None:
+            _unindex(previous)
+
+        SearchTerm.objects.bulk_create(
+            [SearchTerm(organization_id=org_id, term=term) for term in terms],
+            ignore_conflicts=True,
+            batch_size=BATCH_SIZE,
+        )
+        ids = _term_ids(org_id, terms)
+        for batch in _batches(sorted(ids.values())):
+            SearchTerm.objects.filter(id__in=batch).update(doc_freq=F("doc_freq") + 1)
+
+        length = sum(counts.values())
+        document = SearchDocument.objects.create(
+            organization_id=org_id,
+            upload=upload,
+            length=length,
+            terms=np.array(sorted(ids.values()), dtype="<i8").tobytes(),
+        )
+        _append_postings(document, {ids[term]: counts[term] for term in terms})
+        SearchCorpus.objects.filter(organization_id=org_id).update(
+            documents=F("documents") + 1, total_length=F("total_length") + length
+        )
+    return document
+
+
+def unindex_upload(upload_id) -> None:
+    with transaction.atomic():
+        document = SearchDocument.objects.filter(upload_id=upload_id).first()
+        if document is not None:
+            _lock_corpus(document.organization_id)
+            _unindex(document)
+
+
+@receiver(pre_delete, sender=Upload)
+def _unindex_deleted_upload(sender, instance: Upload, **kwargs) -> None:
+    # pre_delete: the cascade would otherwise drop the document without adjusting frequencies.
+    unindex_upload(instance.pk)
+
+
+# ---------------------------------------------------------------------------
+# Query
+# ---------------------------------------------------------------------------
+
+
+def idf(doc_freq: int, documents: int) -> float:
+    """BM25 inverse document frequency (the non-negative variant)."""
+
+    return math.log(1 + (documents - doc_freq + 0.5) / (doc_freq + 0.5))
+
+
+def bm25_top(
+    postings: Dict[int, np.ndarray],
+    weights: Dict[int, float],
+    avg_length: float,
+    limit: int,
+) -> List[Tuple[int, float]]:
+    """``[(document id, score)]`` of the best ``limit`` documents over the given postings lists, best first."""
+
+    docs: List[np.ndarray] = []
+    scores: List[np.ndarray] = []
+    for term_id, records in postings.items():
+        tf = records["tf"].astype(np.float64)
+        norm = BM25_K1 * ((1 - BM25_B) + BM25_B * records["length"] / avg_length)
+        docs.append(records["doc"])
+        scores.append(weights[term_id] * tf * (BM25_K1 + 1) / (tf + norm))
+    if not docs:
+        return []
+    if len(docs) == 1:
+        doc_ids, totals = docs[0], scores[0]
+    else:
+        # A document appears at most once per list; sum its scores across lists.
+        doc_ids, where = np.unique(np.concatenate(docs), return_inverse=True)
+        totals = np.bincount(where, weights=np.concatenate(scores))
+    k = min(limit, len(totals))
+    if not k:
+        return []
+    top = np.argpartition(-totals, k - 1)[:k]
+    top = top[np.lexsort((doc_ids[top], -totals[top]))]
+    return [(int(doc_ids[i]), float(totals[i])) for i in top]
+
+
+def search_uploads(org: Organization, query: str, limit: int = 10) -> List[Tuple[Upload, float]]:
+    """Top ``limit`` uploads of ``org`` for ``query`` by BM25, best first."""
+
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    corpus = SearchCorpus.objects.filter(organization=org).first()
+    if not terms or corpus is None or corpus.documents <= 0:
+        return []
+    matched = dict(
+        SearchTerm.objects.filter(organization=org, term__in=terms, doc_freq__gt=0).values_list("id", "doc_freq")
+    )
+    if not matched:
+        return []
+
+    blocks: Dict[int, List[bytes]] = {}
+    for term_id, data in SearchPostingBlock.objects.filter(term_id__in=list(matched)).values_list("term_id", "data"):
+        blocks.setdefault(term_id, []).append(bytes(data))
+    postings = {term_id: _postings(b"".join(parts)) for term_id, parts in blocks.items()}
+    weights = {term_id: idf(df, corpus.documents) for term_id, df in matched.items()}
+    avg_length = max(corpus.total_length / corpus.documents, 1.0)
+    ranked = bm25_top(postings, weights, avg_length, max(1, min(int(limit), MAX_RESULTS)))
+
+    upload_ids = dict(SearchDocument.objects.filter(id__in=[doc for doc, _ in ranked]).values_list("id", "upload_id"))
+    uploads = Upload.objects.in_bulk(list(upload_ids.values()))
+    return [
+        (uploads[upload_ids[doc]], score)
+        for doc, score in ranked
+        if doc in upload_ids and upload_ids[doc] in uploads
+    ]
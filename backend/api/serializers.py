@@ -1,10 +1,15 @@
 from django.contrib.auth.models import User
+from django.urls import reverse
 from rest_framework import serializers
 
-from .models import AssessmentRun, Job, Notification, Organization, Upload, UserProfile, Visitor
+from .chat import chat_history
+from .fastserialize import default_if_none, str_or_none, with_context
+from .models import AssessmentRun, Job, Notification, Organization, Upload, UploadSession, UserProfile, Visitor, VisitorChatMessage
 
 
 class OrganizationSerializer(serializers.ModelSerializer):
+    values_fields = {}  # list reads go through api.fastserialize; no method fields to map
+
     class Meta:
         model = Organization
         fields = [
@@ -44,8 +49,32 @@ class RegisterSerializer(serializers.Serializer):
     password = serializers.CharField(min_length=6, write_only=True)
 
 
+@with_context
+def upload_file_url(context):
+    """``(id, file)`` -> the upload's download URL (``UploadFileView``), absolute when there is a request."""
+
+    request = context.get("request")
+    placeholder = "00000000-0000-0000-0000-000000000000"
+    url = reverse("upload_file", args=[placeholder])
+    if request is not None:
+        url = request.build_absolute_uri(url)
+    prefix, suffix = url.split(placeholder)  # reversed once per request, not per row
+
+    def convert(row):
+        upload_id, name = row
+        return f"{prefix}{upload_id}{suffix}" if name else None
+
+    return convert
+
+
 class UploadSerializer(serializers.ModelSerializer):
     org_id = serializers.SerializerMethodField()
+    # Stored files are named by content hash (api.blobs); downloads go through
+    # UploadFileView, which names them after the upload.
+    file = serializers.SerializerMethodField()
+
+    # Read path from values_list() rows (api.fastserialize)
+    values_fields = {"org_id": ("organization_id", str_or_none), "file": (("id", "file"), upload_file_url)}
 
     class Meta:
         model = Upload
@@ -59,18 +88,48 @@ class UploadSerializer(serializers.ModelSerializer):
             "meta",
             "summary",
             "analyzed_preview",
+            "sha256",
             "created_at",
         ]
-        read_only_fields = ["id", "created_at"]
+        read_only_fields = ["id", "sha256", "created_at"]
 
     def get_org_id(self, obj: Upload):
         return str(obj.organization_id) if obj.organization_id else None
 
+    def get_file(self, obj: Upload):
+        return upload_file_url(self.context)((obj.id, obj.file.name))
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    chunk_count = serializers.IntegerField(read_only=True)
+    upload_id = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            "id",
+            "name",
+            "size",
+            "chunk_size",
+            "chunk_count",
+            "sha256",
+            "status",
+            "upload_id",
+            "expires_at",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+    def get_upload_id(self, obj: UploadSession):
+        return str(obj.upload_id) if obj.upload_id else None
+
 
 class AssessmentRunSerializer(serializers.ModelSerializer):
     orgId = serializers.SerializerMethodField()
     systemId = serializers.CharField(source="system_id")
 
+    values_fields = {"orgId": ("organization_id", lambda org_id: str(org_id) if org_id else "anon")}
+
     class Meta:
         model = AssessmentRun
         fields = [
@@ -92,10 +151,13 @@ class JobSerializer(serializers.ModelSerializer):
     jobId = serializers.SerializerMethodField()
     orgId = serializers.SerializerMethodField()
 
+    values_fields = {"jobId": ("id", str), "orgId": ("organization_id", str_or_none)}
+
     class Meta:
         model = Job
         fields = [
             "jobId",
+            "kind",
             "status",
             "orgId",
             "name",
@@ -104,9 +166,14 @@ class JobSerializer(serializers.ModelSerializer):
             "payload",
             "result",
             "error",
+            "priority",
+            "attempts",
+            "max_attempts",
+            "next_attempt_at",
             "created_at",
             "updated_at",
         ]
+        read_only_fields = ["attempts", "max_attempts", "next_attempt_at"]
 
     def get_jobId(self, obj: Job):
         return str(obj.id)
@@ -118,6 +185,8 @@ class JobSerializer(serializers.ModelSerializer):
 class NotificationSerializer(serializers.ModelSerializer):
     orgId = serializers.SerializerMethodField()
 
+    values_fields = {"orgId": ("organization_id", str_or_none)}
+
     class Meta:
         model = Notification
         fields = [
@@ -143,6 +212,15 @@ class AdminUserSerializer(serializers.ModelSerializer):
     profile_status = serializers.SerializerMethodField()
     profile_status_reason = serializers.SerializerMethodField()
 
+    # List pages read profile and org columns through one LEFT JOIN (no profile -> NULLs).
+    values_fields = {
+        "orgId": ("profile__organization_id", str_or_none),
+        "orgName": ("profile__organization__name", None),
+        "phone": ("profile__phone", default_if_none("")),
+        "profile_status": ("profile__status", default_if_none("active")),
+        "profile_status_reason": ("profile__status_reason", default_if_none("")),
+    }
+
     class Meta:
         model = User
         fields = [
@@ -164,6 +242,7 @@ class AdminUserSerializer(serializers.ModelSerializer):
         ]
 
     def _profile(self, obj: User):
+        # Querysets should select_related("profile__organization"); otherwise this costs two queries per user.
         try:
             return obj.profile
         except UserProfile.DoesNotExist:
@@ -191,6 +270,8 @@ class AdminUserSerializer(serializers.ModelSerializer):
 
 
 class VisitorSerializer(serializers.ModelSerializer):
+    values_fields = {}  # list reads go through api.fastserialize
+
     class Meta:
         model = Visitor
         fields = [
@@ -205,7 +286,6 @@ class VisitorSerializer(serializers.ModelSerializer):
             "systems_attempted",
             "assessment_count",
             "assessment_data",
-            "chat_history",
             "current_answers",
             "current_step",
             "current_system_id",
@@ -216,3 +296,25 @@ class VisitorSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "created_at", "updated_at"]
+
+
+class VisitorDetailSerializer(VisitorSerializer):
+    """A single visitor, with the latest chat messages inlined (``api.chat``)."""
+
+    chat_history = serializers.SerializerMethodField()
+
+    class Meta(VisitorSerializer.Meta):
+        fields = [*VisitorSerializer.Meta.fields, "chat_history"]
+
+    def get_chat_history(self, obj: Visitor):
+        return chat_history(obj)
+
+
+class VisitorChatMessageSerializer(serializers.ModelSerializer):
+    values_fields = {}  # list reads go through api.fastserialize
+
+    id = serializers.CharField(source="message_id")
+
+    class Meta:
+        model = VisitorChatMessage
+        fields = ["id", "role", "text", "timestamp"]
@@ -0,0 +1,43 @@
+"""Query-count ceilings for the paginated list endpoints: ``manage.py test api``.
+
+Same ceilings as ``manage.py check_query_counts`` (``QUERY_CEILINGS``), which
+runs them against a live database; here they fail the test suite instead.
+Every request runs with a cold principal cache, the most queries it can take.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.management.commands.check_query_counts import QUERY_CEILINGS, Command
+from api.models import Organization
+from api.tokens import TenantRefreshToken
+
+ROWS = 30
+DOMAIN = "query-test.invalid"
+
+
+class ListQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.org = Organization.objects.create(name="Query test", slug="query-test")
+        cls.tenant, cls.admin = Command._build(cls.org, ROWS, DOMAIN)
+
+    def assertWithinCeiling(self, path: str) -> None:
+        user = self.admin if "/admin/" in path or path == "/api/orgs" else self.tenant
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {TenantRefreshToken.for_user(user).access_token}")
+        caches[getattr(settings, "PRINCIPAL_CACHE_ALIAS", "default")].clear()
+        with self.assertNumQueries(QUERY_CEILINGS[path]):
+            response = client.get(path.format(org=self.org.id), {"limit": ROWS})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), ROWS if path != "/api/orgs" else 1)
+
+    def test_admin_users(self):
+        self.assertWithinCeiling("/api/admin/users")
+
+    def test_list_endpoints(self):
+        for path in QUERY_CEILINGS:
+            with self.subTest(path=path):
+                self.assertWithinCeiling(path)
@@ -0,0 +1,331 @@
+"""Token-bucket throttles backed by a store shared between worker processes.
+
+DRF's throttles keep a request history per client in the Django cache, which
+is per process unless a shared backend is configured: with gunicorn's
+``--workers 3`` every limit is effectively tripled, and restarts reset it. The
+throttles here keep one token bucket per client instead (``rate`` requests per
+period is a bucket of ``rate`` tokens refilling at ``rate / period`` tokens a
+second) in the store named by ``THROTTLE_STORE_URL``:
+
+- ``sqlite:///<path>``: a SQLite file shared by the processes of one host
+  (put it on ``/dev/shm`` to keep it in memory). A request is one ``INSERT ...
+  ON CONFLICT DO UPDATE ... RETURNING`` statement, atomic in SQLite.
+- ``redis://[:password@]host:port/db``: any Redis-protocol server, for
+  several hosts. A request is one ``EVALSHA`` of a Lua script (``EVAL`` once
+  per connection if the server doesn't know the script yet), atomic on the
+  server. ``RespClient`` speaks the protocol directly, so no client library
+  is needed.
+
+Either way a throttled request costs one round trip. If the store is
+unreachable, requests are let through for a few seconds and a warning is
+logged: throttling is load protection, not access control. ``manage.py check_throttle_store``
+checks a store under concurrent processes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.throttling import AnonRateThrottle, ScopedRateThrottle, SimpleRateThrottle, UserRateThrottle
+
+logger = logging.getLogger(__name__)
+
+# (allowed, seconds until the next token when not allowed)
+Decision = Tuple[bool, Optional[float]]
+
+# Buckets idle this long are full again for any rate up to one request per day.
+_IDLE_SECONDS = 86400
+# Fraction of SQLite requests that also delete idle buckets.
+_PRUNE_PROBABILITY = 0.001
+# After a store error, requests skip the store this long instead of each waiting for a timeout.
+_RETRY_AFTER_ERROR_SECONDS = 5.0
+
+
+class StoreError(Exception):
+    """The throttle store could not be reached or answered with an error."""
+
+
+def _wait(tokens: float, rate: float) -> float:
+    return max(0.0, (1 - tokens) / rate)
+
+
+class SQLiteBucketStore:
+    """Token buckets in a SQLite file, one connection per process and thread."""
+
+    _UPSERT = """
+        INSERT INTO throttle_bucket (key, tokens, allowed, updated_at)
+        VALUES (:key, :capacity - 1, 1, :now)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = CASE
+                WHEN min(:capacity, tokens + max(0, :now - updated_at) * :rate) >= 1
+                THEN min(:capacity, tokens + max(0, :now - updated_at) * :rate) - 1
+                ELSE min(:capacity, tokens + max(0, :now - updated_at) * :rate)
+            END,
+            allowed = min(:capacity, tokens + max(0, :now - updated_at) * :rate) >= 1,
+            updated_at = :now
+        RETURNING tokens, allowed
+    """
+
+    def __init__(self, path: str, timeout: float = 1.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():  # never reuse a connection across fork()
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # losing the last buckets on power loss is harmless
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS throttle_bucket ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, allowed INTEGER NOT NULL, updated_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def take(self, key: str, capacity: int, rate: float, now: Optional[float] = None) -> Decision:
+        now = time.time() if now is None else now
+        try:
+            conn = self._connection()
+            tokens, allowed = conn.execute(self._UPSERT, {"key": key, "capacity": capacity, "rate": rate, "now": now}).fetchone()
+            if random.random() < _PRUNE_PROBABILITY:
+                conn.execute("DELETE FROM throttle_bucket WHERE updated_at < ?", (now - _IDLE_SECONDS,))
+        except sqlite3.Error as exc:
+            raise StoreError(str(exc)) from exc
+        return bool(allowed), None if allowed else _wait(tokens, rate)
+
+    def reset(self, key: str) -> None:
+        self._connection().execute("DELETE FROM throttle_bucket WHERE key = ?", (key,))
+
+
+class RespError(StoreError):
+    """An error reply from a Redis-protocol server."""
+
+
+class RespClient:
+    """Just enough of the Redis protocol (RESP2) for one command at a time."""
+
+    def __init__(self, host: str, port: int, db: int = 0, password: Optional[str] = None, timeout: float = 0.25):
+        self.host, self.port, self.db, self.password, self.timeout = host, port, db, password, timeout
+        self._sock: Optional[socket.socket] = None
+        self._buf = b""
+
+    def _connect(self) -> None:
+        self.close()
+        try:
+            self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except OSError as exc:
+            raise StoreError(f"cannot connect to {self.host}:{self.port}: {exc}") from exc
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.password:
+            self._call("AUTH", self.password)
+        if self.db:
+            self._call("SELECT", self.db)
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock, self._buf = None, b""
+
+    def execute(self, *args: Any) -> Any:
+        """Send one command and return its reply; reconnects once if the connection dropped."""
+
+        if self._sock is None:
+            self._connect()
+        try:
+            return self._call(*args)
+        except (OSError, EOFError):
+            self._connect()
+            try:
+                return self._call(*args)
+            except (OSError, EOFError) as exc:
+                self.close()
+                raise StoreError(f"{self.host}:{self.port}: {exc}") from exc
+
+    def _call(self, *args: Any) -> Any:
+        parts = [str(arg).encode() if not isinstance(arg, bytes) else arg for arg in args]
+        out = [b"*%d\r\n" % len(parts)]
+        for part in parts:
+            out.append(b"$%d\r\n%s\r\n" % (len(part), part))
+        self._sock.sendall(b"".join(out))
+        return self._reply()
+
+    def _line(self) -> bytes:
+        while b"\r\n" not in self._buf:
+            chunk = self._sock.recv(65536)
+            if not chunk:
+                raise EOFError("connection closed")
+            self._buf += chunk
+        line, self._buf = self._buf.split(b"\r\n", 1)
+        return line
+
+    def _exact(self, n: int) -> bytes:
+        while len(self._buf) < n + 2:
+            chunk = self._sock.recv(65536)
+            if not chunk:
+                raise EOFError("connection closed")
+            self._buf += chunk
+        data, self._buf = self._buf[:n], self._buf[n + 2:]
+        return data
+
+    def _reply(self) -> Any:
+        line = self._line()
+        kind, rest = line[:1], line[1:]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RespError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            n = int(rest)
+            return None if n < 0 else self._exact(n)
+        if kind == b"*":
+            n = int(rest)
+            return None if n < 0 else [self._reply() for _ in range(n)]
+        raise StoreError(f"unexpected reply {line[:32]!r}")
+
+
+# KEYS[1] bucket; ARGV capacity, refill rate (tokens/s), now (s).
+# Returns {allowed, tokens left}; tokens as a string since Lua numbers are returned as integers.
+BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+BUCKET_SCRIPT_SHA = hashlib.sha1(BUCKET_SCRIPT.encode()).hexdigest()
+
+
+class RedisBucketStore:
+    """Token buckets in a Redis-protocol server, one connection per process and thread."""
+
+    def __init__(self, host: str, port: int, db: int = 0, password: Optional[str] = None, timeout: float = 0.25):
+        self._args = (host, port, db, password, timeout)
+        self._local = threading.local()
+
+    def _client(self) -> RespClient:
+        client = getattr(self._local, "client", None)
+        if client is None or self._local.pid != os.getpid():
+            client = RespClient(*self._args)
+            self._local.client, self._local.pid = client, os.getpid()
+        return client
+
+    def take(self, key: str, capacity: int, rate: float, now: Optional[float] = None) -> Decision:
+        now = time.time() if now is None else now
+        args = (1, key, capacity, repr(float(rate)), repr(float(now)))
+        client = self._client()
+        try:
+            allowed, tokens = client.execute("EVALSHA", BUCKET_SCRIPT_SHA, *args)
+        except RespError as exc:
+            if not str(exc).startswith("NOSCRIPT"):
+                raise
+            allowed, tokens = client.execute("EVAL", BUCKET_SCRIPT, *args)  # also loads the script
+        tokens = float(tokens)
+        return bool(allowed), None if allowed else _wait(tokens, rate)
+
+    def reset(self, key: str) -> None:
+        self._client().execute("DEL", key)
+
+
+def store_from_url(url: str, timeout: Optional[float] = None):
+    parts = urlsplit(url)
+    if timeout is None:
+        timeout = float(getattr(settings, "THROTTLE_STORE_TIMEOUT_SECONDS", 0.25))
+    if parts.scheme == "sqlite":
+        path = unquote(parts.path)
+        if not path or path == "/":
+            raise ImproperlyConfigured(f"THROTTLE_STORE_URL needs a file path: {url}")
+        # sqlite:///relative.db, sqlite:////absolute.db (as DATABASE_URL)
+        return SQLiteBucketStore(path[1:], timeout=max(timeout, 1.0))
+    if parts.scheme == "redis":
+        db = int(parts.path.lstrip("/") or 0)
+        password = unquote(parts.password) if parts.password else None
+        return RedisBucketStore(parts.hostname or "localhost", parts.port or 6379, db, password, timeout)
+    raise ImproperlyConfigured(f"THROTTLE_STORE_URL must be a sqlite:// or redis:// URL, not {url!r}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def bucket_store():
+    """The store named by ``THROTTLE_STORE_URL``, built once per process."""
+
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = store_from_url(settings.THROTTLE_STORE_URL)
+    return _store
+
+
+_store_down_until = 0.0
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """``SimpleRateThrottle`` keeping a token bucket per cache key in ``bucket_store()``."""
+
+    _wait_seconds: Optional[float] = None
+
+    def allow_request(self, request, view):
+        global _store_down_until
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None or time.monotonic() < _store_down_until:
+            return True
+        try:
+            allowed, self._wait_seconds = bucket_store().take(self.key, self.num_requests, self.num_requests / self.duration)
+        except StoreError as exc:
+            _store_down_until = time.monotonic() + _RETRY_AFTER_ERROR_SECONDS
+            logger.warning("throttle store unavailable, not throttling for %ss: %s", _RETRY_AFTER_ERROR_SECONDS, exc)
+            return True
+        return allowed
+
+    def wait(self):
+        return self._wait_seconds
+
+
+class AnonBucketThrottle(AnonRateThrottle, TokenBucketThrottle):
+    pass
+
+
+class UserBucketThrottle(UserRateThrottle, TokenBucketThrottle):
+    pass
+
+
+class ScopedBucketThrottle(ScopedRateThrottle, TokenBucketThrottle):
+    pass
+
@@ -0,0 +1,99 @@
+"""Tenant claims carried in JWTs.
+
+Tokens from ``/api/auth/token/`` (and every refresh) carry the user's
+organization as signed claims: ``org_id`` (``None`` for users without one),
+``tier`` and ``org_status``. ``api.permissions.get_user_org`` builds the
+request's organization from them instead of reading ``user.profile.organization``,
+so resolving the tenant costs no query. (Requests authenticated through
+``api.principals`` take the organization from the principal cache instead,
+which model signals keep fresher than any token.)
+
+Claims are only as fresh as the access token (``ACCESS_TOKEN_LIFETIME``,
+``JWT_ACCESS_TOKEN_MINUTES``, short on purpose) and are re-read from the
+database on each refresh. Suspending or banning a user or org deactivates the
+users, which is checked on every request against the principal cache: the
+change applies immediately in processes its invalidation reaches (all of them
+with a shared ``DJANGO_CACHE_BACKEND``), and within
+``PRINCIPAL_CACHE_TTL_SECONDS`` in the others (the per-process default with
+several workers). Tokens issued before claims existed fall back to the
+profile lookup.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any, Dict, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import router
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Organization, UserProfile
+
+ORG_CLAIM = "org_id"
+TIER_CLAIM = "tier"
+STATUS_CLAIM = "org_status"
+
+# Loaded from claims; any other field is fetched (all at once) on first access.
+CLAIM_FIELDS = ("id", "subscription_tier", "status")
+
+
+def tenant_claims(user) -> Dict[str, Any]:
+    try:
+        org = user.profile.organization
+    except UserProfile.DoesNotExist:
+        org = None
+    if org is None:
+        return {ORG_CLAIM: None, TIER_CLAIM: None, STATUS_CLAIM: None}
+    return {ORG_CLAIM: str(org.id), TIER_CLAIM: org.subscription_tier, STATUS_CLAIM: org.status}
+
+
+def org_from_claims(payload: Dict[str, Any]) -> Optional[Organization]:
+    """The organization named by a token's claims, without a query (``None`` if it has none)."""
+
+    return lazy_organization(payload.get(ORG_CLAIM), payload.get(TIER_CLAIM), payload.get(STATUS_CLAIM))
+
+
+def lazy_organization(org_id, tier: Optional[str], status: Optional[str]) -> Optional[Organization]:
+    """An ``Organization`` with only ``CLAIM_FIELDS`` loaded (``None`` without an id)."""
+
+    if not org_id:
+        return None
+    values = (uuid.UUID(str(org_id)), tier, status)
+    return Organization.from_db(router.db_for_read(Organization), list(CLAIM_FIELDS), values)
+
+
+class TenantRefreshToken(RefreshToken):
+    """Refresh token stamped with tenant claims, which its access tokens inherit.
+
+    A token decoded for a refresh has its claims re-read from the database, so
+    the new access (and rotated refresh) token reflects org moves and tier changes.
+    """
+
+    def __init__(self, token=None, verify: bool = True):
+        super().__init__(token, verify)
+        if token is not None and verify:
+            user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+            user = (
+                get_user_model().objects.select_related("profile__organization")
+                .filter(**{api_settings.USER_ID_FIELD: user_id})
+                .first()
+            )
+            if user is not None:
+                self.payload.update(tenant_claims(user))
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.payload.update(tenant_claims(user))
+        return token
+
+
+class TenantTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = TenantRefreshToken
+
+
+class TenantTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = TenantRefreshToken
@@ -0,0 +1,328 @@
+"""Resumable chunked uploads.
+
+A client opens an ``UploadSession`` declaring the file's size, then PUTs
+numbered chunks of ``chunk_size`` bytes (the last one may be shorter), in any
+order and as many times as it needs to, each with its SHA-256 in the
+``X-Chunk-SHA256`` header. A dropped connection only costs the chunk in
+flight: ``missing_chunks`` tells the client what is left to send.
+
+Each chunk is streamed from the request straight to its offset in a single
+preallocated part file under ``UPLOAD_SESSION_DIR``, hashed on the way, so a
+request never holds more than ``STREAM_BLOCK_BYTES`` in memory and nothing is
+copied afterwards. A chunk only counts (``UploadChunk`` row) once its hash
+matches. Finalizing checks that every chunk is in, hashes the part file once
+and moves it into content-addressed storage (``api.blobs``).
+
+No database lock is held while a chunk streams in. Writers hold a shared
+``flock`` on the part file instead, and take the session's row lock only
+briefly, to check the session is still open before writing and again to
+record the chunk. Finalize first moves the session to ``finalizing`` under the
+row lock, so no new write starts, then takes the file lock exclusively, which
+waits for writes already in progress, before it checks and hashes the file.
+If creating the upload fails, the session is marked ``failed``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+from typing import IO, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Organization, UploadChunk, UploadSession
+
+try:  # POSIX only; without it, a write racing finalize can go unnoticed
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+STREAM_BLOCK_BYTES = 256 * 1024
+MIN_CHUNK_BYTES = 256 * 1024
+CHUNK_SHA256_HEADER = "X-Chunk-SHA256"
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class UploadSessionError(ValueError):
+    """A request the session cannot accept; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class PartFile(File):
+    """A finished part file; storages move it into place instead of copying it."""
+
+    def temporary_file_path(self) -> str:
+        return self.name
+
+
+def session_dir() -> Path:
+    return Path(getattr(settings, "UPLOAD_SESSION_DIR", Path(settings.BASE_DIR) / "upload_sessions"))
+
+
+def part_path(session: UploadSession) -> Path:
+    return session_dir() / f"{session.id}.part"
+
+
+def _is_sha256(value: str) -> bool:
+    return bool(_SHA256_RE.match(value))
+
+
+def create_session(
+    organization: Organization,
+    user,
+    name: str,
+    size: int,
+    chunk_size: Optional[int] = None,
+    sha256: str = "",
+    meta: Optional[dict] = None,
+) -> UploadSession:
+    max_bytes = int(getattr(settings, "MAX_CHUNKED_UPLOAD_BYTES", 20 * 1024 ** 3))
+    if size <= 0:
+        raise UploadSessionError("size must be positive")
+    if size > max_bytes:
+        raise UploadSessionError("file too large", status=413)
+    max_chunk = int(getattr(settings, "UPLOAD_CHUNK_MAX_BYTES", 64 * 1024 * 1024))
+    chunk_size = int(chunk_size or getattr(settings, "UPLOAD_CHUNK_BYTES", 8 * 1024 * 1024))
+    if not MIN_CHUNK_BYTES <= chunk_size <= max_chunk:
+        raise UploadSessionError(f"chunk_size must be between {MIN_CHUNK_BYTES} and {max_chunk} bytes")
+    sha256 = (sha256 or "").lower()
+    if sha256 and not _is_sha256(sha256):
+        raise UploadSessionError("sha256 must be 64 hex characters")
+
+    ttl = int(getattr(settings, "UPLOAD_SESSION_TTL_SECONDS", 24 * 3600))
+    session = UploadSession.objects.create(
+        organization=organization,
+        created_by=user if getattr(user, "is_authenticated", False) else None,
+        name=name,
+        size=size,
+        chunk_size=chunk_size,
+        sha256=sha256,
+        meta=meta or {},
+        expires_at=timezone.now() + timedelta(seconds=ttl),
+    )
+    path = part_path(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Sparse on most filesystems: disk is only used as chunks arrive.
+    with open(path, "wb") as fh:
+        fh.truncate(size)
+    return session
+
+
+def chunk_bounds(session: UploadSession, index: int) -> Tuple[int, int]:
+    """``(offset, length)`` of chunk ``index`` in the file."""
+
+    if not 0 <= index < session.chunk_count:
+        raise UploadSessionError(f"chunk index must be between 0 and {session.chunk_count - 1}")
+    offset = index * session.chunk_size
+    return offset, min(session.chunk_size, session.size - offset)
+
+
+def _require_open(session: UploadSession) -> None:
+    if session.status != UploadSession.Status.OPEN:
+        raise UploadSessionError(f"upload session is {session.status}", status=409)
+    if session.expires_at <= timezone.now():
+        raise UploadSessionError("upload session expired", status=410)
+
+
+def _lock_open(session_id) -> UploadSession:
+    """The session, row-locked, if it still accepts chunks; call inside a transaction."""
+
+    session = UploadSession.objects.select_for_update().get(id=session_id)
+    _require_open(session)
+    return session
+
+
+@contextmanager
+def _part_file(session: UploadSession, mode: str, exclusive: bool) -> Iterator[IO[bytes]]:
+    """The session's part file, ``flock``ed shared (chunk writes) or exclusive (finalize)."""
+
+    try:
+        fh = open(part_path(session), mode)
+    except FileNotFoundError:
+        raise UploadSessionError(f"upload session {session.id} has no part file; start a new session", status=409)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield fh
+    finally:
+        fh.close()  # releases the lock
+
+
+def write_chunk(
+    session: UploadSession,
+    index: int,
+    stream: Optional[IO[bytes]],
+    content_length: int,
+    sha256: str,
+) -> Tuple[UploadChunk, bool]:
+    """Stream one chunk into the part file and record it if its hash matches.
+
+    Returns ``(chunk, written)``; re-sending a chunk that is already stored with
+    the same hash is a no-op. A stored chunk sent again with other bytes loses
+    its row before its range is overwritten, so if finalize wins the race the
+    chunk is reported missing rather than finalized with a stale hash.
+    """
+
+    _require_open(session)
+    offset, length = chunk_bounds(session, index)
+    sha256 = (sha256 or "").lower()
+    if not _is_sha256(sha256):
+        raise UploadSessionError(f"{CHUNK_SHA256_HEADER} header must be the chunk's hex SHA-256")
+    if content_length != length:
+        raise UploadSessionError(f"chunk {index} must be exactly {length} bytes, got {content_length}")
+
+    existing = UploadChunk.objects.filter(session=session, index=index).first()
+    if existing is not None and existing.sha256 == sha256:
+        return existing, False
+    if stream is None:
+        raise UploadSessionError("empty chunk")
+
+    with _part_file(session, "r+b", exclusive=False) as fh:
+        # Checked once the file lock is held: finalize sets ``finalizing`` before it
+        # waits for the writes holding the lock, so none can start after it hashed.
+        with transaction.atomic():
+            _lock_open(session.id)
+            if existing is not None:
+                UploadChunk.objects.filter(session=session, index=index).delete()
+
+        digest = hashlib.sha256()
+        remaining = length
+        # A failed or mismatching write leaves garbage in this chunk's range only; it is
+        # not recorded, so the client simply sends the chunk again.
+        fh.seek(offset)
+        while remaining:
+            block = stream.read(min(STREAM_BLOCK_BYTES, remaining))
+            if not block:
+                raise UploadSessionError(f"chunk {index} ended after {length - remaining} of {length} bytes")
+            digest.update(block)
+            fh.write(block)
+            remaining -= len(block)
+        fh.flush()
+        if digest.hexdigest() != sha256:
+            raise UploadSessionError(f"chunk {index} checksum mismatch", status=422)
+
+        with transaction.atomic():
+            _lock_open(session.id)
+            chunk, _ = UploadChunk.objects.update_or_create(session=session, index=index, defaults={"size": length, "sha256": sha256})
+            UploadSession.objects.filter(id=session.id).update(updated_at=timezone.now())
+    return chunk, True
+
+
+def received_chunks(session: UploadSession) -> List[int]:
+    return list(session.chunks.order_by("index").values_list("index", flat=True))
+
+
+def missing_chunks(session: UploadSession) -> List[int]:
+    received = set(received_chunks(session))
+    return [i for i in range(session.chunk_count) if i not in received]
+
+
+def begin_finalize(session: UploadSession) -> None:
+    """Move an open session to ``finalizing``; call with its row locked. Chunk writes are refused from here on."""
+
+    _require_open(session)
+    session.status = UploadSession.Status.FINALIZING
+    session.save(update_fields=["status", "updated_at"])
+
+
+def _set_status(session: UploadSession, status: str) -> None:
+    UploadSession.objects.filter(id=session.id, status=UploadSession.Status.FINALIZING).update(status=status, updated_at=timezone.now())
+    session.status = status
+
+
+def complete_file(session: UploadSession) -> Tuple[PartFile, str]:
+    """Check a ``finalizing`` session is complete and return its part file with the file's SHA-256.
+
+    Raises ``UploadSessionError`` if chunks are missing or the declared hash
+    does not match; the session is open again so the client can fix it.
+    """
+
+    try:
+        with _part_file(session, "rb", exclusive=True) as fh:
+            # Writes in progress when finalize began have finished (or been refused) by now.
+            missing = missing_chunks(session)
+            if missing:
+                preview = ", ".join(str(i) for i in missing[:20])
+                raise UploadSessionError(f"{len(missing)} chunk(s) missing: {preview}", status=409)
+            digest = hashlib.sha256()
+            for block in iter(lambda: fh.read(1024 * 1024), b""):
+                digest.update(block)
+    except UploadSessionError:
+        _set_status(session, UploadSession.Status.OPEN)
+        raise
+    sha256 = digest.hexdigest()
+    if session.sha256 and sha256 != session.sha256:
+        _set_status(session, UploadSession.Status.OPEN)
+        raise UploadSessionError("file checksum does not match the session's sha256", status=422)
+
+    path = part_path(session)
+    part = PartFile(open(path, "rb"), name=str(path))
+    part.size = session.size
+    return part, sha256
+
+
+def fail_session(session: UploadSession) -> None:
+    """Mark a ``finalizing`` session whose upload could not be created as failed.
+
+    Its part file may already have been moved into storage, so chunks are
+    refused from now on and the client has to start a new session.
+    """
+
+    _set_status(session, UploadSession.Status.FAILED)
+    session.chunks.all().delete()
+    discard_part(session)
+
+
+def discard_part(session: UploadSession) -> None:
+    try:
+        os.unlink(part_path(session))
+    except FileNotFoundError:
+        pass
+
+
+def abort_session(session: UploadSession, status: str = UploadSession.Status.OPEN) -> bool:
+    """Abort ``session`` if it is still in ``status``; False if it moved on (e.g. a finalize began)."""
+
+    with transaction.atomic():
+        aborted = UploadSession.objects.filter(id=session.id, status=status).update(
+            status=UploadSession.Status.ABORTED, updated_at=timezone.now()
+        )
+        if aborted:
+            session.chunks.all().delete()
+    if aborted:
+        discard_part(session)
+    return bool(aborted)
+
+
+def purge_expired_sessions(now=None) -> int:
+    """Abort open sessions past ``expires_at`` and delete their part files.
+
+    Sessions stuck in ``finalizing`` for a whole session TTL (their finalize
+    died with the process) are aborted as well.
+    """
+
+    now = now or timezone.now()
+    ttl = int(getattr(settings, "UPLOAD_SESSION_TTL_SECONDS", 24 * 3600))
+    purged = 0
+    for session in UploadSession.objects.filter(status=UploadSession.Status.OPEN, expires_at__lte=now):
+        purged += abort_session(session)
+    stuck = UploadSession.objects.filter(status=UploadSession.Status.FINALIZING, updated_at__lte=now - timedelta(seconds=ttl))
+    for session in stuck:
+        purged += abort_session(session, status=UploadSession.Status.FINALIZING)
+    if purged:
+        logger.info("Purged %d expired upload session(s)", purged)
+    return purged
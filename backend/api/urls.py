@@ -27,6 +27,8 @@ urlpatterns = [
     path("admin/orgs/<uuid:org_id>/assessments", views.AdminOrgAssessmentsView.as_view(), name="admin_org_assessments"),
     path("admin/orgs/<uuid:org_id>/jobs", views.AdminOrgJobsView.as_view(), name="admin_org_jobs"),
     path("admin/orgs/<uuid:org_id>/notifications", views.AdminOrgNotificationsView.as_view(), name="admin_org_notifications"),
+    path("admin/jobs/queue-stats", views.AdminJobQueueStatsView.as_view(), name="admin_job_queue_stats"),
+    path("admin/principal-cache", views.AdminPrincipalCacheStatsView.as_view(), name="admin_principal_cache"),
     path("admin/users", views.AdminUserListView.as_view(), name="admin_users"),
     path("admin/users/<int:user_id>", views.AdminUserUpdateView.as_view(), name="admin_user_update"),
     path("admin/analytics", views.AdminPlatformAnalyticsView.as_view(), name="admin_analytics"),
@@ -35,8 +37,16 @@ urlpatterns = [
     path("assessments/run", views.RunAssessmentView.as_view(), name="run_assessment"),
     path("dashboard/summary", views.DashboardSummaryView.as_view(), name="dashboard_summary"),
     path("dashboard/simulate-impact", views.SimulateImpactView.as_view(), name="simulate_impact"),
+    path("dashboard/series", views.DashboardSeriesView.as_view(), name="dashboard_series"),
 
     path("uploads", views.UploadListCreateView.as_view(), name="uploads"),
+    path("uploads/<uuid:upload_id>/file", views.UploadFileView.as_view(), name="upload_file"),
+    path("uploads/sessions", views.UploadSessionCreateView.as_view(), name="upload_sessions"),
+    path("uploads/sessions/<uuid:session_id>", views.UploadSessionDetailView.as_view(), name="upload_session_detail"),
+    path("uploads/sessions/<uuid:session_id>/chunks/<int:index>", views.UploadChunkView.as_view(), name="upload_session_chunk"),
+    path("uploads/sessions/<uuid:session_id>/finalize", views.UploadSessionFinalizeView.as_view(), name="upload_session_finalize"),
+
+    path("search", views.SearchView.as_view(), name="search"),
 
     path("jobs", views.JobListView.as_view(), name="jobs"),
     path("jobs/<str:job_id>", views.JobDetailView.as_view(), name="job_detail"),
@@ -50,6 +60,7 @@ urlpatterns = [
     path("visitors/save-assessment/", views.VisitorSaveAssessmentView.as_view(), name="visitor_save_assessment_slash"),
     path("visitors/save-chat", views.VisitorSaveChatView.as_view(), name="visitor_save_chat"),
     path("visitors/save-chat/", views.VisitorSaveChatView.as_view(), name="visitor_save_chat_slash"),
+    path("visitors/<uuid:visitor_id>/chat/messages", views.VisitorChatMessagesView.as_view(), name="visitor_chat_messages"),
     path("visitors/save-progress", views.VisitorSaveProgressView.as_view(), name="visitor_save_progress"),
     path("visitors/save-progress/", views.VisitorSaveProgressView.as_view(), name="visitor_save_progress_slash"),
     path("visitors/lookup", views.VisitorLookupView.as_view(), name="visitor_lookup"),
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import os
 import time
+import uuid
 from datetime import timedelta
 from typing import Any, Dict
 
+from django.http import FileResponse, Http404
 from django.shortcuts import get_object_or_404
 
 from django.contrib.auth.models import User
@@ -13,21 +16,49 @@ from django.utils.text import slugify
 from django.conf import settings
 from rest_framework import permissions, status
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .domain import (
 	CANONICAL_SYSTEMS,
+	SystemKeywordScanner,
 	analyze_filename_or_text,
 	compute_org_health,
 	deterministic_system_metrics,
 	make_series,
 	normalize_system_key,
 	score_system,
+	systems_from_keyword_counts,
 )
-from .models import AssessmentRun, Job, Notification, Organization, Upload, UserProfile, Visitor
+from .analytics import platform_analytics
+from .blobs import install_upload_hashing, store_blob, uploaded_sha256
+from .chat import ChatMessageError, append_chat_messages
+from .extract import METRIC_KEYS, system_metrics
+from .fieldsets import FieldsetError, requested_fields, sparse_queryset, sparse_serializer
+from .ingest import ANALYSIS_VERSION, file_sha256, ingest_format, scan_keywords, summary_text
+from .upload_sessions import (
+	CHUNK_SHA256_HEADER,
+	UploadSessionError,
+	abort_session,
+	begin_finalize,
+	complete_file,
+	create_session,
+	discard_part,
+	fail_session,
+	received_chunks,
+	write_chunk,
+)
+from .jobs import analysis_preview, queue_stats
+from .materialized import day_start_ms, record_assessment_runs
+from .models import AssessmentRun, DailyScoreRollup, Job, LatestSystemScore, Notification, Organization, Upload, UploadAnalysis, UploadSession, UserProfile, Visitor, VisitorChatMessage
+from .pagination import paginated
+from .parsers import ORJSONParser
 from .permissions import IsSuperAdmin, IsSuperuserOrTenantUser, get_user_org
+from .principals import invalidate_principals, principal_stats
+from .progress import PatchError, parse_patch, progress_buffer
+from .queries import daily_rollups, last_runs_per_system, latest_system_scores, recent_rollups
+from .search import MAX_RESULTS as MAX_SEARCH_RESULTS, search_uploads
 from .tenancy import resolve_request_org
 from .serializers import (
 	AssessmentRunSerializer,
@@ -37,7 +68,10 @@ from .serializers import (
 	OrganizationSerializer,
 	RegisterSerializer,
 	UploadSerializer,
+	UploadSessionSerializer,
 	UserSerializer,
+	VisitorChatMessageSerializer,
+	VisitorDetailSerializer,
 	VisitorSerializer,
 )
 
@@ -54,6 +88,33 @@ def _now_iso() -> str:
 	return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
 
+MAX_SERIES_DAYS = 366
+
+
+def _series_days(request, default: int = 14) -> int:
+	try:
+		days = int(request.query_params.get("days") or default)
+	except (TypeError, ValueError):
+		days = default
+	return max(1, min(MAX_SERIES_DAYS, days))
+
+
+def _rollup_series(rows) -> list[dict[str, Any]]:
+	series = []
+	for row in rows:
+		avg = int(round(row.average))
+		series.append({
+			"ts": day_start_ms(row.day),
+			"value": avg,
+			"upper": min(100, avg + 3),
+			"lower": max(0, avg - 3),
+			"count": row.run_count,
+			"min": row.score_min,
+			"max": row.score_max,
+		})
+	return series
+
+
 class DemoBootstrapSuperAdminView(APIView):
 	"""DEV-ONLY: Creates/updates a demo Super Admin user on localhost.
 
@@ -187,7 +248,8 @@ class ChangePasswordView(APIView):
 			return Response({"detail": "New password must be at least 8 characters."}, status=status.HTTP_400_BAD_REQUEST)
 
 		user.set_password(new_password)
-		user.save()
+		# request.user may come from the principal cache: write only the password, not possibly stale columns.
+		user.save(update_fields=["password"])
 		return Response({"detail": "Password changed successfully."})
 
 
@@ -205,7 +267,8 @@ class SelfUpgradeView(APIView):
 		org = None
 
 		if hasattr(user, "profile") and getattr(user.profile, "organization", None):
-			org = user.profile.organization
+			# Reload: the request's organization is built from cached / token columns that may be stale.
+			org = get_object_or_404(Organization, id=user.profile.organization_id)
 		elif getattr(user, "is_superuser", False):
 			org_id = request.data.get("org_id")
 			if org_id:
@@ -225,7 +288,7 @@ class SelfUpgradeView(APIView):
 			org.subscription_expires_at = timezone.now() + timedelta(days=months * 30)
 		else:
 			org.subscription_expires_at = None
-		org.save()
+		org.save(update_fields=["subscription_tier", "subscription_expires_at"])
 
 		return Response(OrganizationSerializer(org).data)
 
@@ -236,8 +299,7 @@ class OrganizationListCreateView(APIView):
 	permission_classes = [IsSuperAdmin]
 
 	def get(self, request):
-		qs = Organization.objects.order_by("-created_at")[:200]
-		return Response(OrganizationSerializer(qs, many=True).data)
+		return paginated(request, Organization.objects.all(), "created_at", 200, OrganizationSerializer)
 
 
 class OrganizationDetailView(APIView):
@@ -275,13 +337,15 @@ class OrganizationDetailView(APIView):
 
 		# When suspending or banning, also deactivate all users in the org
 		if new_status in ("suspended", "banned"):
-			user_ids = UserProfile.objects.filter(organization=org).values_list("user_id", flat=True)
+			user_ids = list(UserProfile.objects.filter(organization=org).values_list("user_id", flat=True))
 			User.objects.filter(id__in=user_ids).update(is_active=False)
+			invalidate_principals(user_ids)  # update() sends no signals
 
 		# When restoring, reactivate users
 		if new_status == "active":
-			user_ids = UserProfile.objects.filter(organization=org).values_list("user_id", flat=True)
+			user_ids = list(UserProfile.objects.filter(organization=org).values_list("user_id", flat=True))
 			User.objects.filter(id__in=user_ids).update(is_active=True)
+			invalidate_principals(user_ids)
 
 		return Response(OrganizationSerializer(org).data)
 
@@ -292,7 +356,9 @@ class OrganizationDetailView(APIView):
 		AssessmentRun.objects.filter(organization=org).delete()
 		Job.objects.filter(organization=org).delete()
 		Notification.objects.filter(organization=org).delete()
+		user_ids = list(UserProfile.objects.filter(organization=org).values_list("user_id", flat=True))
 		UserProfile.objects.filter(organization=org).update(organization=None)
+		invalidate_principals(user_ids)
 		org.delete()
 		return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -327,14 +393,45 @@ class AdminOrgStatsView(APIView):
 		return Response(payload)
 
 
+class AdminJobQueueStatsView(APIView):
+	"""Per-organization queue depth and wait times (p50/p95/max seconds from
+	due to claimed) over the last ``?window=`` seconds (default 3600), to check
+	that the worker shares capacity fairly between tenants.
+	"""
+	permission_classes = [IsSuperAdmin]
+
+	def get(self, request):
+		try:
+			window = int(request.query_params.get("window") or 3600)
+		except (TypeError, ValueError):
+			window = 3600
+		window = max(60, min(7 * 24 * 3600, window))
+
+		return Response({
+			"windowSeconds": window,
+			"tenantMaxRunning": int(getattr(settings, "JOB_TENANT_MAX_RUNNING", 0)),
+			"tenants": queue_stats(timedelta(seconds=window)),
+		})
+
+
+class AdminPrincipalCacheStatsView(APIView):
+	"""Hit / miss / invalidation counts of the principal cache
+	(``api.principals``), for the worker process answering the request.
+	"""
+	permission_classes = [IsSuperAdmin]
+
+	def get(self, request):
+		return Response(principal_stats())
+
+
 class AdminUserListView(APIView):
 	"""Read-only list of all users.  User accounts are created only via
 	the public CEO signup/registration flow — never by a SuperAdmin."""
 	permission_classes = [IsSuperAdmin]
 
 	def get(self, request):
-		qs = User.objects.order_by("-date_joined")[:500]
-		return Response(AdminUserSerializer(qs, many=True).data)
+		users = User.objects.select_related("profile__organization")
+		return paginated(request, users, "date_joined", 500, AdminUserSerializer)
 
 
 class AdminUserUpdateView(APIView):
@@ -390,8 +487,7 @@ class AdminOrgUploadsView(APIView):
 
 	def get(self, request, org_id):
 		org = get_object_or_404(Organization, id=org_id)
-		qs = Upload.objects.filter(organization=org).order_by("-timestamp_ms")[:500]
-		return Response(UploadSerializer(qs, many=True).data)
+		return paginated(request, Upload.objects.filter(organization=org), "timestamp_ms", 500, UploadSerializer)
 
 
 class AdminOrgAssessmentsView(APIView):
@@ -399,8 +495,7 @@ class AdminOrgAssessmentsView(APIView):
 
 	def get(self, request, org_id):
 		org = get_object_or_404(Organization, id=org_id)
-		qs = AssessmentRun.objects.filter(organization=org).order_by("-timestamp_ms")[:500]
-		return Response(AssessmentRunSerializer(qs, many=True).data)
+		return paginated(request, AssessmentRun.objects.filter(organization=org), "timestamp_ms", 500, AssessmentRunSerializer)
 
 
 class AdminOrgJobsView(APIView):
@@ -408,8 +503,8 @@ class AdminOrgJobsView(APIView):
 
 	def get(self, request, org_id):
 		org = get_object_or_404(Organization, id=org_id)
-		qs = Job.objects.filter(organization=org).order_by("-updated_at")[:500]
-		return Response(JobSerializer(qs, many=True).data)
+		# updated_at moves: a job updated between two page fetches can show up on both.
+		return paginated(request, Job.objects.filter(organization=org), "updated_at", 500, JobSerializer)
 
 
 class AdminOrgNotificationsView(APIView):
@@ -417,8 +512,7 @@ class AdminOrgNotificationsView(APIView):
 
 	def get(self, request, org_id):
 		org = get_object_or_404(Organization, id=org_id)
-		qs = Notification.objects.filter(organization=org).order_by("-timestamp_ms")[:500]
-		return Response(NotificationSerializer(qs, many=True).data)
+		return paginated(request, Notification.objects.filter(organization=org), "timestamp_ms", 500, NotificationSerializer)
 
 
 class OverviewView(APIView):
@@ -428,34 +522,26 @@ class OverviewView(APIView):
 		org = resolve_request_org(request)
 		org_id = str(org.id)
 
-		# scores from latest assessment per system
+		# scores from latest assessment per system (materialized on write)
 		scores: Dict[str, int] = {}
-		latest_by_sys: Dict[str, int] = {}
-
-		# Get all runs for this org (for both latest scores AND historical series)
-		runs = list(AssessmentRun.objects.filter(organization=org).order_by("-timestamp_ms")[:2000])
-
-		for r in runs:
-			k = normalize_system_key(r.system_id)
-			if k not in latest_by_sys:
-				latest_by_sys[k] = int(r.score)
+		latest_by_sys = latest_system_scores(org)
 
 		for k in CANONICAL_SYSTEMS:
 			if k in latest_by_sys:
-				scores[k] = int(latest_by_sys[k])
+				scores[k] = int(latest_by_sys[k].score)
 			else:
 				scores[k] = 0  # No data — frontend shows "No assessments yet"
 
-		# Build REAL time series from historical AssessmentRun data
+		# Build REAL time series from the last 14 runs per system (ranked in the database)
+		recent_runs = last_runs_per_system(org, 14)
 		per_system_series = {}
 		for k in CANONICAL_SYSTEMS:
-			sys_runs = [r for r in runs if normalize_system_key(r.system_id) == k]
-			sys_runs.sort(key=lambda r: int(r.timestamp_ms or 0))
+			sys_runs = list(reversed(recent_runs.get(k, [])))
 			if len(sys_runs) >= 2:
 				# Use actual historical data points
 				per_system_series[k] = [
 					{"ts": int(r.timestamp_ms), "value": int(r.score or 0), "upper": min(100, int(r.score or 0) + 3), "lower": max(0, int(r.score or 0) - 3)}
-					for r in sys_runs[-14:]  # Last 14 data points
+					for r in sys_runs
 				]
 			elif len(sys_runs) == 1:
 				# Single data point — show as flat line with that score
@@ -470,19 +556,17 @@ class OverviewView(APIView):
 		active_scores = [v for v in scores.values() if v > 0]
 		overall = int(round(sum(active_scores) / max(1, len(active_scores)))) if active_scores else 0
 
-		# Build overall series from actual data
-		all_runs_sorted = sorted(runs, key=lambda r: int(r.timestamp_ms or 0))
-		if len(all_runs_sorted) >= 2:
-			overall_series = []
-			day_scores = {}
-			for r in all_runs_sorted:
-				day_key = int(r.timestamp_ms) // (24 * 3600 * 1000)
-				if day_key not in day_scores:
-					day_scores[day_key] = []
-				day_scores[day_key].append(int(r.score or 0))
-			for day_key in sorted(day_scores.keys())[-14:]:
-				avg = int(round(sum(day_scores[day_key]) / len(day_scores[day_key])))
-				overall_series.append({"ts": day_key * 24 * 3600 * 1000, "value": avg, "upper": min(100, avg + 3), "lower": max(0, avg - 3)})
+		# Overall series from the daily rollups: ?days=N is the last N calendar days;
+		# without it, the 14 most recent days that have runs
+		if request.query_params.get("days"):
+			day_rows = daily_rollups(org, days=_series_days(request))
+		else:
+			day_rows = recent_rollups(org)
+		if len(day_rows) >= 2 or (day_rows and day_rows[0].run_count >= 2):
+			overall_series = [
+				{k: p[k] for k in ("ts", "value", "upper", "lower")}
+				for p in _rollup_series(day_rows)
+			]
 		elif overall > 0:
 			overall_series = [{"ts": int(time.time() * 1000), "value": overall, "upper": min(100, overall + 3), "lower": max(0, overall - 3)}]
 		else:
@@ -497,11 +581,47 @@ class OverviewView(APIView):
 			"scores": scores,
 			"latest_upload_ts": latest_upload_ts,
 			"org_id": org_id,
-			"has_real_data": len(runs) > 0,
+			"has_real_data": bool(latest_by_sys),
 		}
 		return Response(payload)
 
 
+class DashboardSeriesView(APIView):
+	"""Daily score series from the rollup table.
+
+	Query params:
+	- days:   number of calendar days (UTC) ending today (default 30, max 366); days without runs are left out
+	- system: canonical system key; omit for the all-systems series
+	"""
+	permission_classes = [IsSuperuserOrTenantUser]
+
+	def get(self, request):
+		org = resolve_request_org(request)
+		system_param = request.query_params.get("system")
+		system_key = normalize_system_key(system_param) if system_param else DailyScoreRollup.ALL_SYSTEMS
+		if system_key and system_key not in CANONICAL_SYSTEMS:
+			return Response({"error": "invalid system"}, status=status.HTTP_400_BAD_REQUEST)
+
+		days = _series_days(request, default=30)
+		rows = daily_rollups(org, system_id=system_key, days=days)
+		return Response({
+			"org_id": str(org.id),
+			"system": system_key or None,
+			"days": days,
+			"series": _rollup_series(rows),
+		})
+
+
+def _job_priority(value) -> int:
+	"""Accept "low" / "normal" / "high" or a number, clamped to the LOW..HIGH range."""
+	if isinstance(value, str) and value.strip().upper() in Job.Priority.names:
+		return Job.Priority[value.strip().upper()]
+	try:
+		return max(Job.Priority.LOW, min(Job.Priority.HIGH, int(value)))
+	except (TypeError, ValueError):
+		return Job.Priority.NORMAL
+
+
 class EnqueueJobView(APIView):
 	permission_classes = [IsSuperuserOrTenantUser]
 
@@ -520,6 +640,7 @@ class EnqueueJobView(APIView):
 			notify_to=notify_to,
 			payload=body,
 			status=Job.Status.PENDING,
+			priority=_job_priority(body.get("priority")),
 		)
 
 		# mimic mockApi.js response shape
@@ -537,32 +658,51 @@ class RunAssessmentView(APIView):
 		if system_key not in CANONICAL_SYSTEMS:
 			return Response({"error": "invalid system_key"}, status=status.HTTP_400_BAD_REQUEST)
 
-		metrics = deterministic_system_metrics(org_seed, system_key)
+		# Score from an analyzed upload (the given one, else the org's latest); simulate without one.
+		uploads = Upload.objects.filter(organization=org).select_related("analysis")
+		upload_id = request.data.get("upload_id") or request.data.get("uploadId")
+		if upload_id:
+			try:
+				upload_id = uuid.UUID(str(upload_id))
+			except ValueError:
+				return Response({"error": "invalid upload_id"}, status=status.HTTP_400_BAD_REQUEST)
+			upload = get_object_or_404(uploads, id=upload_id)
+			if upload.analysis is None:
+				return Response({"error": "upload has not been analyzed yet"}, status=status.HTTP_409_CONFLICT)
+		else:
+			upload = uploads.filter(analysis__isnull=False).order_by("-timestamp_ms").first()
+
 		weights = {"throughput": 1, "cycle_time": 1, "quality": 1, "predictability": 1}
-		scored = score_system(metrics, weights)
+		metrics = system_metrics(upload.analysis.metrics.get("signals", {}), system_key) if upload else {}
+		if metrics:
+			# Metrics the upload cannot support lower coverage instead of being made up.
+			scored = score_system(metrics, weights, required_metrics=METRIC_KEYS)
+			source = {"simulated": False, "uploadId": str(upload.id), "sha256": upload.sha256}
+		else:
+			metrics = deterministic_system_metrics(org_seed, system_key)
+			scored = score_system(metrics, weights)
+			source = {"simulated": True}
 
 		title = f"{system_key.title()} Assessment"
-		run = AssessmentRun.objects.create(
-			organization=org,
-			system_id=system_key,
-			title=title,
-			score=int(scored["score"]),
-			coverage=float(scored["coverage"]),
-			timestamp_ms=_now_ms(),
-			meta={"simulated": True, "rationale": scored.get("rationale"), "metrics": metrics, "weights": weights},
-		)
+		with transaction.atomic():
+			run = AssessmentRun.objects.create(
+				organization=org,
+				system_id=system_key,
+				title=title,
+				score=int(scored["score"]),
+				coverage=float(scored["coverage"]),
+				timestamp_ms=_now_ms(),
+				meta={**source, "rationale": scored.get("rationale"), "metrics": metrics, "weights": weights},
+			)
+			record_assessment_runs([run])
 
 		return Response(AssessmentRunSerializer(run).data)
 
 
-def _calculate_delta_mom(runs, system_key: str) -> float:
-	filtered = [r for r in runs if normalize_system_key(r.system_id) == system_key]
-	filtered.sort(key=lambda r: int(r.timestamp_ms or 0), reverse=True)
-	if len(filtered) < 2:
+def _calculate_delta_mom(latest: LatestSystemScore | None) -> float:
+	if latest is None:
 		return 0.0
-	latest = float(filtered[0].score or 0)
-	previous = float(filtered[1].score or 0)
-	return round(latest - previous, 1)
+	return latest.delta_mom
 
 
 def _generate_health_indicators(system_key: str, score: int) -> list[str]:
@@ -614,14 +754,7 @@ class DashboardSummaryView(APIView):
 		org = resolve_request_org(request)
 		org_id = str(org.id)
 
-		runs_qs = AssessmentRun.objects.filter(organization=org).order_by("-timestamp_ms")[:1000]
-		runs = list(runs_qs)
-
-		latest_by_sys: Dict[str, AssessmentRun] = {}
-		for r in runs:
-			k = normalize_system_key(r.system_id)
-			if k not in latest_by_sys:
-				latest_by_sys[k] = r
+		latest_by_sys = latest_system_scores(org)
 
 		# systemScores for org health
 		system_scores = []
@@ -645,7 +778,7 @@ class DashboardSummaryView(APIView):
 					"key": k,
 					"title": k.title(),
 					"score": score,
-					"delta_mom": _calculate_delta_mom(runs, k) if latest else 0,
+					"delta_mom": _calculate_delta_mom(latest) if latest else 0,
 					"top_insight_id": f"ins-{k}-001" if latest else None,
 					"health_indicators": _generate_health_indicators(k, int(score or 0)) if latest else [],
 					"risk_factors": _identify_risk_factors(int(score or 0)) if latest else [],
@@ -769,11 +902,7 @@ class SimulateImpactView(APIView):
 		except (TypeError, ValueError):
 			change_pct = 10.0
 
-		latest_by_sys: Dict[str, int] = {}
-		for r in AssessmentRun.objects.filter(organization=org).order_by("-timestamp_ms")[:500]:
-			k = normalize_system_key(r.system_id)
-			if k not in latest_by_sys:
-				latest_by_sys[k] = int(r.score)
+		latest_by_sys: Dict[str, int] = {k: int(row.score) for k, row in latest_system_scores(org).items()}
 
 		system_scores = []
 		for k in CANONICAL_SYSTEMS:
@@ -794,17 +923,96 @@ class SimulateImpactView(APIView):
 		return Response({"before": before, "after": after})
 
 
+UPLOAD_EXTENSIONS = {".csv", ".xlsx", ".txt", ".pdf", ".docx"}
+# Confidence reported when no system keyword was found and systems were picked from a hash
+GUESSED_SYSTEMS_CONFIDENCE = 25
+
+
+def _upload_extension_allowed(filename: str) -> bool:
+	lower = filename.lower()
+	ext = "." + lower.split(".")[-1] if "." in lower else ""
+	return not ext or ext in UPLOAD_EXTENSIONS
+
+
+def _create_upload(org: Organization, name: str, content, filename: str, sha256: str, meta: dict) -> tuple[Upload, Job | None]:
+	"""Store ``content`` (or no file) as a new Upload of ``org``.
+
+	CSV, XLSX and DOCX files get an ingest job, unless this org already uploaded
+	the same content and its analysis can be reused on the spot.
+	"""
+	# Text files are scanned for system keywords by their first bytes only: chunked
+	# uploads can be many GB. Ingested files are scanned in full by their ingest job,
+	# plain-text ones by their index job. Zipped (XLSX, DOCX) and PDF files are only
+	# matched by name here.
+	fmt = ingest_format(filename) if content else None
+	ingest = fmt is not None
+	scanner = SystemKeywordScanner()
+	scanner.feed(name)
+	lower = filename.lower()
+	full_scan = bool(content) and (lower.endswith(".txt") or "." not in filename)
+	if content and not lower.endswith((".xlsx", ".docx", ".pdf")):
+		try:
+			scan_keywords(content, scanner, limit_bytes=2048)
+		except Exception:
+			pass
+	analyzed, confidence = systems_from_keyword_counts(scanner.counts)
+	if not analyzed:
+		analyzed, confidence = analyze_filename_or_text(name), GUESSED_SYSTEMS_CONFIDENCE
+	preview = {"detected": analyzed, "confidence": confidence, "keywordHits": scanner.counts}
+	summary = f"Mock summary generated for {name}"
+
+	# Only reuse an analysis on the spot for content this org uploaded before, so the response
+	# cannot reveal what other tenants uploaded (their cached analysis is still reused by the job).
+	cached = (
+		UploadAnalysis.objects.filter(sha256=sha256, version=ANALYSIS_VERSION, uploads__organization=org).first()
+		if ingest
+		else None
+	)
+	if cached is not None:
+		preview = analysis_preview(preview, cached, name)
+		analyzed = preview["detected"]
+		summary = summary_text(cached.analysis)
+	elif ingest:
+		preview["status"] = "queued"
+
+	with transaction.atomic():
+		# Identical content is stored once and analyzed once (api.blobs, UploadAnalysis).
+		blob = store_blob(content, sha256)[0] if content else None
+		rec = Upload.objects.create(
+			organization=org,
+			name=name,
+			file=blob.file.name if blob else None,
+			blob=blob,
+			sha256=sha256,
+			analysis=cached,
+			timestamp_ms=_now_ms(),
+			analyzed_systems=analyzed,
+			meta=meta,
+			summary=summary,
+			analyzed_preview=preview,
+		)
+		job = None
+		if ingest and cached is None:
+			job = Job.objects.create(organization=org, kind=Job.Kind.INGEST_UPLOAD, upload=rec, name=name, payload={"format": fmt})
+		# Every upload goes into the org's search index (api.search), off the request thread.
+		Job.objects.create(organization=org, kind=Job.Kind.INDEX_UPLOAD, upload=rec, name=name, payload={"keywords": True} if full_scan else {})
+	return rec, job
+
+
 class UploadListCreateView(APIView):
-	parser_classes = [MultiPartParser, FormParser, JSONParser]
+	parser_classes = [MultiPartParser, FormParser, ORJSONParser]
 	permission_classes = [IsSuperuserOrTenantUser]
 	throttle_scope = "uploads"
 
+	def dispatch(self, request, *args, **kwargs):
+		if request.method == "POST":
+			install_upload_hashing(request)
+		return super().dispatch(request, *args, **kwargs)
+
 	def get(self, request):
 		org = resolve_request_org(request)
-		qs = Upload.objects.all().order_by("-timestamp_ms")
-		qs = qs.filter(organization=org)
-		qs = qs[:200]
-		return Response(UploadSerializer(qs, many=True, context={"request": request}).data)
+		qs = Upload.objects.filter(organization=org)
+		return paginated(request, qs, "timestamp_ms", 200, UploadSerializer, context={"request": request})
 
 	def post(self, request):
 		org = resolve_request_org(request)
@@ -821,35 +1029,202 @@ class UploadListCreateView(APIView):
 		if uploaded_file and getattr(uploaded_file, "size", 0) and uploaded_file.size > max_bytes:
 			return Response({"error": "file too large"}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
 
-		if uploaded_file:
-			allowed_ext = {".csv", ".xlsx", ".txt", ".pdf", ".docx"}
-			lower = uploaded_file.name.lower()
-			ext = "." + lower.split(".")[-1] if "." in lower else ""
-			if ext and ext not in allowed_ext:
-				return Response({"error": "unsupported file type"}, status=status.HTTP_400_BAD_REQUEST)
+		if uploaded_file and not _upload_extension_allowed(uploaded_file.name):
+			return Response({"error": "unsupported file type"}, status=status.HTTP_400_BAD_REQUEST)
+
+		sha256 = (uploaded_sha256(request, "file") or file_sha256(uploaded_file)) if uploaded_file else ""
+		meta = request.data.get("meta") if isinstance(request.data.get("meta"), dict) else {}
+		rec, job = _create_upload(org, name, uploaded_file, uploaded_file.name if uploaded_file else "", sha256, meta)
+
+		data = UploadSerializer(rec, context={"request": request}).data
+		if job is not None:
+			data["jobId"] = str(job.id)
+		return Response(data, status=status.HTTP_201_CREATED)
+
+
+class UploadFileView(APIView):
+	"""Download an upload's file under the upload's name.
+
+	Files are stored by content hash without an extension (``api.blobs``), so
+	the name and content type come from ``Upload.name``.
+	"""
+	permission_classes = [IsSuperuserOrTenantUser]
+
+	def get(self, request, upload_id):
+		if request.user.is_superuser and not request.query_params.get("org_id"):
+			rec = get_object_or_404(Upload, id=upload_id)
+		else:
+			rec = get_object_or_404(Upload, id=upload_id, organization=resolve_request_org(request))
+		if not rec.file:
+			raise Http404("upload has no file")
+		return FileResponse(rec.file.open("rb"), as_attachment=True, filename=rec.name or os.path.basename(rec.file.name))
+
+
+class SearchView(APIView):
+	"""BM25 search over the organization's uploads (api.search).
+
+	Query params:
+	- q:     search text
+	- limit: number of results (default 10, max 100)
+	"""
+	permission_classes = [IsSuperuserOrTenantUser]
+
+	def get(self, request):
+		org = resolve_request_org(request)
+		query = (request.query_params.get("q") or "").strip()
+		if not query:
+			return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+		try:
+			limit = int(request.query_params.get("limit") or 10)
+		except (TypeError, ValueError):
+			limit = 10
+		limit = max(1, min(MAX_SEARCH_RESULTS, limit))
+
+		started = time.perf_counter()
+		hits = search_uploads(org, query, limit=limit)
+		return Response({
+			"query": query,
+			"results": [
+				{
+					"id": str(upload.id),
+					"name": upload.name,
+					"timestamp_ms": upload.timestamp_ms,
+					"analyzed_systems": upload.analyzed_systems,
+					"summary": upload.summary,
+					"score": round(score, 4),
+				}
+				for upload, score in hits
+			],
+			"took_ms": round((time.perf_counter() - started) * 1000, 2),
+		})
+
+
+def _session_response(session: UploadSession, http_status: int = status.HTTP_200_OK, **extra) -> Response:
+	data = UploadSessionSerializer(session).data
+	received = received_chunks(session)
+	data["received"] = received
+	data["missing"] = session.chunk_count - len(received)
+	data.update(extra)
+	return Response(data, status=http_status)
+
+
+def _session_error(exc: UploadSessionError) -> Response:
+	return Response({"error": str(exc)}, status=exc.status)
+
+
+class UploadSessionCreateView(APIView):
+	"""Open a resumable chunked upload (api.upload_sessions)."""
+	permission_classes = [IsSuperuserOrTenantUser]
+	throttle_scope = "uploads"
+
+	def post(self, request):
+		org = resolve_request_org(request)
+		name = str(request.data.get("name") or "").strip()
+		if not name:
+			return Response({"error": "name is required"}, status=status.HTTP_400_BAD_REQUEST)
+		if not _upload_extension_allowed(name):
+			return Response({"error": "unsupported file type"}, status=status.HTTP_400_BAD_REQUEST)
+		try:
+			size = int(request.data.get("size"))
+			chunk_size = request.data.get("chunk_size") or request.data.get("chunkSize")
+			chunk_size = int(chunk_size) if chunk_size else None
+		except (TypeError, ValueError):
+			return Response({"error": "size and chunk_size must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+		meta = request.data.get("meta") if isinstance(request.data.get("meta"), dict) else {}
+		try:
+			session = create_session(org, request.user, name, size, chunk_size, str(request.data.get("sha256") or ""), meta)
+		except UploadSessionError as exc:
+			return _session_error(exc)
+		return _session_response(session, status.HTTP_201_CREATED)
+
+
+class UploadSessionDetailView(APIView):
+	"""Resume (GET lists received chunks) or abort (DELETE) an upload session."""
+	permission_classes = [IsSuperuserOrTenantUser]
+
+	def get(self, request, session_id):
+		org = resolve_request_org(request)
+		session = get_object_or_404(UploadSession, id=session_id, organization=org)
+		return _session_response(session)
+
+	def delete(self, request, session_id):
+		org = resolve_request_org(request)
+		session = get_object_or_404(UploadSession, id=session_id, organization=org)
+		if not abort_session(session):
+			session.refresh_from_db(fields=["status"])
+			return Response({"error": f"upload session is {session.status}"}, status=status.HTTP_409_CONFLICT)
+		return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadChunkView(APIView):
+	"""PUT one chunk as the raw request body, with its SHA-256 in X-Chunk-SHA256.
+
+	The body is streamed to disk; ``request.data`` is never touched so nothing
+	buffers the whole chunk.
+	"""
+	permission_classes = [IsSuperuserOrTenantUser]
+	throttle_scope = "upload_chunks"
+
+	def put(self, request, session_id, index):
+		org = resolve_request_org(request)
+		session = get_object_or_404(UploadSession, id=session_id, organization=org)
+		try:
+			content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+		except ValueError:
+			content_length = 0
+		try:
+			chunk, written = write_chunk(session, index, request.stream, content_length, request.headers.get(CHUNK_SHA256_HEADER, ""))
+		except UploadSessionError as exc:
+			return _session_error(exc)
+		return Response({"index": chunk.index, "size": chunk.size, "sha256": chunk.sha256, "written": written})
 
-		# attempt to extract small text for analysis
-		text_sample = ""
-		if uploaded_file:
+
+class UploadSessionFinalizeView(APIView):
+	"""Assemble a complete session into an Upload (same as POST /uploads from there on)."""
+	permission_classes = [IsSuperuserOrTenantUser]
+	throttle_scope = "uploads"
+
+	def post(self, request, session_id):
+		org = resolve_request_org(request)
+		with transaction.atomic():
+			session = get_object_or_404(UploadSession.objects.select_for_update(), id=session_id, organization=org)
+			replay = session.status == UploadSession.Status.COMPLETED and session.upload_id
+			if replay:
+				# Finalize is idempotent so clients can retry after a dropped response.
+				rec = session.upload
+				job = rec.jobs.filter(kind=Job.Kind.INGEST_UPLOAD).order_by("created_at").first()
+			else:
+				# Committed before hashing: chunk writes are refused from here on, without
+				# holding the row lock through the hash and the move into storage.
+				try:
+					begin_finalize(session)
+				except UploadSessionError as exc:
+					return _session_error(exc)
+		if not replay:
+			try:
+				part, sha256 = complete_file(session)
+			except UploadSessionError as exc:
+				return _session_error(exc)
 			try:
-				raw = uploaded_file.read(2048)
-				uploaded_file.seek(0)
-				text_sample = raw.decode("utf-8", errors="ignore")
+				with transaction.atomic():
+					rec, job = _create_upload(org, session.name, part, session.name, sha256, session.meta)
+					session.status = UploadSession.Status.COMPLETED
+					session.upload = rec
+					session.save(update_fields=["status", "upload", "updated_at"])
+					session.chunks.all().delete()
 			except Exception:
-				text_sample = ""
+				# The part file may already be in storage; don't leave an open session without it.
+				fail_session(session)
+				raise
+			finally:
+				part.close()
+			# Known content is not moved into storage; drop its part file.
+			discard_part(session)
 
-		analyzed = analyze_filename_or_text(f"{name} {text_sample}")
-		rec = Upload.objects.create(
-			organization=org,
-			name=name,
-			file=uploaded_file,
-			timestamp_ms=_now_ms(),
-			analyzed_systems=analyzed,
-			meta=request.data.get("meta") if isinstance(request.data.get("meta"), dict) else {},
-			summary=f"Mock summary generated for {name}",
-			analyzed_preview={"detected": analyzed, "confidence": 75},
-		)
-		return Response(UploadSerializer(rec, context={"request": request}).data, status=status.HTTP_201_CREATED)
+		data = UploadSerializer(rec, context={"request": request}).data
+		if job is not None:
+			data["jobId"] = str(job.id)
+		return Response(data, status=status.HTTP_200_OK if replay else status.HTTP_201_CREATED)
 
 
 class JobListView(APIView):
@@ -857,10 +1232,7 @@ class JobListView(APIView):
 
 	def get(self, request):
 		org = resolve_request_org(request)
-		qs = Job.objects.all().order_by("-created_at")
-		qs = qs.filter(organization=org)
-		qs = qs[:200]
-		return Response(JobSerializer(qs, many=True).data)
+		return paginated(request, Job.objects.filter(organization=org), "created_at", 200, JobSerializer)
 
 
 class JobDetailView(APIView):
@@ -880,10 +1252,7 @@ class NotificationListView(APIView):
 
 	def get(self, request):
 		org = resolve_request_org(request)
-		qs = Notification.objects.all().order_by("-timestamp_ms")
-		qs = qs.filter(organization=org)
-		qs = qs[:200]
-		return Response(NotificationSerializer(qs, many=True).data)
+		return paginated(request, Notification.objects.filter(organization=org), "timestamp_ms", 200, NotificationSerializer)
 
 
 # ═══════════════════════════════════════════════════════════
@@ -901,115 +1270,19 @@ class AdminPlatformAnalyticsView(APIView):
 	- status_breakdown: active / suspended / banned org counts
 	- tier_breakdown: free / premium counts
 	- top_active_companies: top 10 by assessment+upload count
+	- computed_at / age_seconds: freshness of the snapshot served (``api.analytics``)
+
+	``?refresh=1`` recomputes the snapshot before answering.
 	"""
 	permission_classes = [IsSuperAdmin]
 
 	def get(self, request):
-		from django.db.models import Count
-		from django.db.models.functions import TruncMonth
-
-		now = timezone.now()
-		twelve_months_ago = now - timedelta(days=365)
-
-		# Monthly growth — companies
-		company_monthly = list(
-			Organization.objects.filter(created_at__gte=twelve_months_ago)
-			.annotate(month=TruncMonth("created_at"))
-			.values("month")
-			.annotate(count=Count("id"))
-			.order_by("month")
-		)
-
-		# Monthly growth — users
-		user_monthly = list(
-			User.objects.filter(date_joined__gte=twelve_months_ago)
-			.annotate(month=TruncMonth("date_joined"))
-			.values("month")
-			.annotate(count=Count("id"))
-			.order_by("month")
-		)
-
-		# Monthly assessments
-		assessment_monthly = list(
-			AssessmentRun.objects.filter(created_at__gte=twelve_months_ago)
-			.annotate(month=TruncMonth("created_at"))
-			.values("month")
-			.annotate(count=Count("id"))
-			.order_by("month")
-		)
-
-		# Monthly uploads
-		upload_monthly = list(
-			Upload.objects.filter(created_at__gte=twelve_months_ago)
-			.annotate(month=TruncMonth("created_at"))
-			.values("month")
-			.annotate(count=Count("id"))
-			.order_by("month")
-		)
-
-		# Status breakdown
-		status_breakdown = {}
-		for s_val, s_label in Organization.Status.choices:
-			status_breakdown[s_val] = Organization.objects.filter(status=s_val).count()
-
-		# Tier breakdown
-		tier_breakdown = {}
-		for t_val, t_label in Organization.SubscriptionTier.choices:
-			tier_breakdown[t_val] = Organization.objects.filter(subscription_tier=t_val).count()
-
-		# Top 10 most active companies
-		top_companies = []
-		for org in Organization.objects.all()[:50]:
-			assessments_count = AssessmentRun.objects.filter(organization=org).count()
-			uploads_count = Upload.objects.filter(organization=org).count()
-			users_count = UserProfile.objects.filter(organization=org).count()
-			top_companies.append({
-				"id": str(org.id),
-				"name": org.name,
-				"slug": org.slug,
-				"status": org.status,
-				"tier": org.subscription_tier,
-				"assessments": assessments_count,
-				"uploads": uploads_count,
-				"users": users_count,
-				"activity_score": assessments_count + uploads_count,
-			})
-		top_companies.sort(key=lambda x: x["activity_score"], reverse=True)
-		top_companies = top_companies[:10]
-
-		def serialize_monthly(qs):
-			return [{"month": r["month"].strftime("%Y-%m"), "count": r["count"]} for r in qs]
-
-		# Monthly visitor growth
-		visitor_monthly = list(
-			Visitor.objects.filter(created_at__gte=twelve_months_ago)
-			.annotate(month=TruncMonth("created_at"))
-			.values("month")
-			.annotate(count=Count("id"))
-			.order_by("month")
-		)
-
+		refresh = str(request.query_params.get("refresh", "")).lower() in ("1", "true", "yes")
+		snapshot = platform_analytics(refresh=refresh)
 		return Response({
-			"company_growth": serialize_monthly(company_monthly),
-			"user_growth": serialize_monthly(user_monthly),
-			"assessment_activity": serialize_monthly(assessment_monthly),
-			"upload_activity": serialize_monthly(upload_monthly),
-			"visitor_growth": serialize_monthly(visitor_monthly),
-			"status_breakdown": status_breakdown,
-			"tier_breakdown": tier_breakdown,
-			"top_active_companies": top_companies,
-			"totals": {
-				"companies": Organization.objects.count(),
-				"users": User.objects.count(),
-				"assessments": AssessmentRun.objects.count(),
-				"uploads": Upload.objects.count(),
-				"jobs": Job.objects.count(),
-				"notifications": Notification.objects.count(),
-				"visitors": Visitor.objects.count(),
-				"visitor_assessments": sum(
-					(v.assessment_count or 0) for v in Visitor.objects.only("assessment_count")
-				),
-			},
+			**snapshot.payload,
+			"computed_at": snapshot.computed_at.isoformat(),
+			"age_seconds": round((timezone.now() - snapshot.computed_at).total_seconds(), 1),
 		})
 
 
@@ -1106,6 +1379,9 @@ class VisitorCaptureView(APIView):
 
 		# ── Upsert by email ──
 		existing = Visitor.objects.filter(email=email).first()
+		if existing and progress_buffer().flush_visitor(str(existing.id)):
+			# Saves buffered in this process were just written; return them, not the stale row.
+			existing.refresh_from_db()
 		if existing:
 			# Update org/role if changed
 			if org_name and org_name != existing.organization_name:
@@ -1117,13 +1393,14 @@ class VisitorCaptureView(APIView):
 			existing.started_assessment = True
 			existing.ip_address = ip
 			existing.user_agent = ua[:1000]
-			existing.save()
+			# Only these columns: progress is written concurrently by api.progress.
+			existing.save(update_fields=["organization_name", "role", "name", "started_assessment", "ip_address", "user_agent", "updated_at"])
 
 			return Response({
 				"ok": True,
 				"visitor_id": str(existing.id),
 				"returning": True,
-				"visitor": VisitorSerializer(existing).data,
+				"visitor": VisitorDetailSerializer(existing).data,
 			}, status=status.HTTP_200_OK)
 
 		# ── Create new ──
@@ -1141,7 +1418,7 @@ class VisitorCaptureView(APIView):
 			"ok": True,
 			"visitor_id": str(visitor.id),
 			"returning": False,
-			"visitor": VisitorSerializer(visitor).data,
+			"visitor": VisitorDetailSerializer(visitor).data,
 		}, status=status.HTTP_201_CREATED)
 
 	@staticmethod
@@ -1192,7 +1469,12 @@ class VisitorSaveAssessmentView(APIView):
 
 
 class VisitorSaveChatView(APIView):
-	"""Public endpoint — saves chat history for a visitor."""
+	"""Public endpoint — saves chat history for a visitor.
+
+	Older clients send the full transcript; only messages not stored yet are
+	written (``api.chat``). New clients append deltas to
+	``/api/visitors/<id>/chat/messages`` instead.
+	"""
 	permission_classes = [permissions.AllowAny]
 
 	def post(self, request):
@@ -1203,82 +1485,126 @@ class VisitorSaveChatView(APIView):
 		if not visitor_id:
 			return Response({"error": "visitor_id is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-		visitor = Visitor.objects.filter(id=visitor_id).first()
+		visitor = Visitor.objects.filter(id=visitor_id).only("id").first()
 		if not visitor:
 			return Response({"error": "Visitor not found"}, status=status.HTTP_404_NOT_FOUND)
 
-		# Replace chat history (frontend sends the full list), keep last 200 messages
 		if isinstance(messages, list):
-			clean = []
-			for m in messages[-200:]:
-				if isinstance(m, dict):
-					clean.append({
-						"id": str(m.get("id", "")),
-						"role": str(m.get("role", "user")),
-						"text": str(m.get("text", ""))[:5000],
-						"timestamp": str(m.get("timestamp", "")),
-					})
-			visitor.chat_history = clean
-			visitor.save(update_fields=["chat_history", "updated_at"])
+			append_chat_messages(visitor, messages)
+
+		return Response({"ok": True, "message_count": VisitorChatMessage.objects.filter(visitor=visitor).count()})
+
 
-		return Response({"ok": True, "message_count": len(visitor.chat_history)})
+class VisitorChatMessagesView(APIView):
+	"""Public endpoint — a visitor's chat messages.
+
+	GET  — newest first, cursor-paginated (``api.pagination``; default 50 per page)
+	POST — append ``{"messages": [{id, role, text, timestamp}, ...]}``, only the
+	       new ones; messages whose id is already stored are skipped, and
+	       every message needs an ``id`` (400 otherwise)
+	"""
+	permission_classes = [permissions.AllowAny]
+
+	def get(self, request, visitor_id):
+		visitor = get_object_or_404(Visitor.objects.only("id"), id=visitor_id)
+		messages = VisitorChatMessage.objects.filter(visitor=visitor)
+		return paginated(request, messages, "id", 50, VisitorChatMessageSerializer)
+
+	def post(self, request, visitor_id):
+		visitor = get_object_or_404(Visitor.objects.only("id"), id=visitor_id)
+		data = request.data if isinstance(request.data, dict) else {}
+		messages = data.get("messages")
+		if not isinstance(messages, list):
+			return Response({"error": "messages must be a list"}, status=status.HTTP_400_BAD_REQUEST)
+
+		try:
+			appended = append_chat_messages(visitor, messages, require_ids=True)
+		except ChatMessageError as exc:
+			return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+		return Response({
+			"ok": True,
+			"appended": appended,
+			"message_count": VisitorChatMessage.objects.filter(visitor=visitor).count(),
+		})
 
 
 class VisitorLookupView(APIView):
-	"""Public endpoint — lookup visitor by email, returns full history."""
+	"""Public endpoint — lookup visitor by email, returns full history (or the ``?fields=`` asked for)."""
 	permission_classes = [permissions.AllowAny]
 
 	def get(self, request):
 		email = (request.query_params.get("email") or "").strip().lower()
 		if not email:
 			return Response({"error": "email query parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
+		try:
+			fields = requested_fields(request, VisitorDetailSerializer)
+		except FieldsetError as exc:
+			return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-		visitor = Visitor.objects.filter(email=email).first()
+		visitors = sparse_queryset(Visitor.objects.filter(email=email), VisitorDetailSerializer, fields)
+		visitor = visitors.first()
 		if not visitor:
 			return Response({"found": False}, status=status.HTTP_200_OK)
+		if progress_buffer().flush_visitor(str(visitor.id)):
+			# Saves buffered in this process were just written; a reload must not restore older answers.
+			visitor = visitors.first()
 
 		return Response({
 			"found": True,
-			"visitor": VisitorSerializer(visitor).data,
+			"visitor": sparse_serializer(VisitorDetailSerializer, visitor, fields).data,
 		})
 
 
 class VisitorSaveProgressView(APIView):
-	"""Public endpoint — saves in-progress answers, step, and current system for a visitor."""
+	"""Public endpoint — saves in-progress answers, step, and current system for a visitor.
+
+	Answers are sent either as ``answers_patch`` (JSON-patch operations on
+	``current_answers``) or, from older clients, as the full ``current_answers``
+	dict. ``seq``, an integer increasing with every save, keeps a late save from
+	overwriting a newer one. Saves are buffered and written in batches
+	(``api.progress``), so a response means "accepted", not "written".
+	"""
 	permission_classes = [permissions.AllowAny]
 
 	def post(self, request):
 		data = request.data if isinstance(request.data, dict) else {}
 		visitor_id = (data.get("visitor_id") or "").strip()
 		current_answers = data.get("current_answers")
+		answers_patch = data.get("answers_patch")
 		current_step = data.get("current_step")
 		current_system_id = (data.get("current_system_id") or "").strip()
+		seq = data.get("seq")
 
 		if not visitor_id:
 			return Response({"error": "visitor_id is required"}, status=status.HTTP_400_BAD_REQUEST)
-
-		visitor = Visitor.objects.filter(id=visitor_id).first()
-		if not visitor:
+		try:
+			visitor_id = str(uuid.UUID(visitor_id))
+		except ValueError:
 			return Response({"error": "Visitor not found"}, status=status.HTTP_404_NOT_FOUND)
 
-		update_fields = ["updated_at"]
-
-		if isinstance(current_answers, dict):
-			visitor.current_answers = current_answers
-			update_fields.append("current_answers")
+		buffer = progress_buffer()
+		if not buffer.visitor_exists(visitor_id):
+			return Response({"error": "Visitor not found"}, status=status.HTTP_404_NOT_FOUND)
 
+		ops = []
+		try:
+			if answers_patch is not None:
+				ops = parse_patch(answers_patch)
+			elif isinstance(current_answers, dict):
+				ops = [{"op": "replace", "path": "", "value": current_answers}]
+		except PatchError as exc:
+			return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+		step = None
 		if current_step is not None:
 			try:
-				visitor.current_step = int(current_step)
-				update_fields.append("current_step")
+				step = int(current_step)
 			except (ValueError, TypeError):
 				pass
 
-		if current_system_id is not None:
-			visitor.current_system_id = current_system_id[:64]
-			update_fields.append("current_system_id")
-
-		visitor.save(update_fields=update_fields)
+		if not isinstance(seq, int) or isinstance(seq, bool):
+			seq = None  # older clients: applied in arrival order
+		buffer.enqueue(visitor_id, ops, step=step, system_id=current_system_id[:64], seq=seq)
 
 		return Response({"ok": True})
 
@@ -1288,14 +1614,21 @@ class AdminVisitorListView(APIView):
 	permission_classes = [IsSuperAdmin]
 
 	def get(self, request):
-		qs = Visitor.objects.all()[:500]
-		return Response(VisitorSerializer(qs, many=True).data)
+		return paginated(request, Visitor.objects.all(), "created_at", 500, VisitorSerializer)
 
 
 class AdminVisitorUpdateView(APIView):
-	"""SuperAdmin endpoint — update visitor status/notes."""
+	"""SuperAdmin endpoint — read a visitor (``?fields=`` supported), update status/notes."""
 	permission_classes = [IsSuperAdmin]
 
+	def get(self, request, visitor_id):
+		try:
+			fields = requested_fields(request, VisitorDetailSerializer)
+		except FieldsetError as exc:
+			return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+		visitor = get_object_or_404(sparse_queryset(Visitor.objects.all(), VisitorDetailSerializer, fields), id=visitor_id)
+		return Response(sparse_serializer(VisitorDetailSerializer, visitor, fields).data)
+
 	def patch(self, request, visitor_id):
 		visitor = get_object_or_404(Visitor, id=visitor_id)
 		data = request.data if isinstance(request.data, dict) else {}
@@ -1315,4 +1648,4 @@ class AdminVisitorUpdateView(APIView):
 			visitor.notes = notes
 
 		visitor.save()
-		return Response(VisitorSerializer(visitor).data)
+		return Response(VisitorDetailSerializer(visitor).data)
@@ -15,6 +15,7 @@ from datetime import timedelta
 import os
 
 import dj_database_url
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -96,19 +97,41 @@ DATABASES = {
     )
 }
 
+# Cache backend. The principal cache (api.principals) is invalidated through it, so with several
+# worker processes point it at a shared backend (e.g. django.core.cache.backends.redis.RedisCache
+# with DJANGO_CACHE_LOCATION=redis://...); the default is per process.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", ""),
+    }
+}
+
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # JWTAuthentication backed by the principal cache (api.principals)
+        "api.principals.PrincipalJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    # orjson-backed JSON (api.renderers / api.parsers); same bytes as DRF's JSON classes
+    "DEFAULT_RENDERER_CLASSES": (
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "api.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    # Token buckets in a store shared by all worker processes (api.throttling, THROTTLE_STORE_URL)
     "DEFAULT_THROTTLE_CLASSES": (
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
-        "rest_framework.throttling.ScopedRateThrottle",
+        "api.throttling.AnonBucketThrottle",
+        "api.throttling.UserBucketThrottle",
+        "api.throttling.ScopedBucketThrottle",
     ),
     "DEFAULT_THROTTLE_RATES": {
         # Tune per environment
@@ -116,15 +139,19 @@ REST_FRAMEWORK = {
         "user": os.environ.get("DRF_THROTTLE_USER", "600/min"),
         "auth": os.environ.get("DRF_THROTTLE_AUTH", "20/min"),
         "uploads": os.environ.get("DRF_THROTTLE_UPLOADS", "30/min"),
+        "upload_chunks": os.environ.get("DRF_THROTTLE_UPLOAD_CHUNKS", "600/min"),
     },
 }
 
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
+    # Access tokens carry tenant claims (api.tokens); keep them short-lived so claims stay fresh.
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=int(os.environ.get("JWT_ACCESS_TOKEN_MINUTES", "10"))),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": False,
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_OBTAIN_SERIALIZER": "api.tokens.TenantTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "api.tokens.TenantTokenRefreshSerializer",
 }
 
         
@@ -132,6 +159,10 @@ _cors_default = "http://localhost:3000,http://127.0.0.1:3000" if DEBUG else ""
 _cors_origins = os.environ.get("CORS_ALLOWED_ORIGINS", _cors_default).split(",")
 CORS_ALLOWED_ORIGINS = [o.strip() for o in _cors_origins if o.strip()]
 CORS_ALLOW_CREDENTIALS = True
+# Per-chunk checksum of resumable uploads
+CORS_ALLOW_HEADERS = (*default_headers, "x-chunk-sha256")
+# Next-page cursor of paginated lists (api.pagination)
+CORS_EXPOSE_HEADERS = ["x-next-cursor", "link"]
 
 
 # Production-grade defaults (set DJANGO_DEBUG=false behind HTTPS)
@@ -193,4 +224,55 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Upload limits
 MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
 
+# Resumable chunked uploads (api.upload_sessions). Part files stay outside MEDIA_ROOT until
+# finalized; with several web containers this directory must be on a shared volume.
+UPLOAD_SESSION_DIR = Path(os.environ.get("UPLOAD_SESSION_DIR", str(BASE_DIR / "upload_sessions")))
+MAX_CHUNKED_UPLOAD_BYTES = int(os.environ.get("MAX_CHUNKED_UPLOAD_BYTES", str(20 * 1024 ** 3)))
+UPLOAD_CHUNK_BYTES = int(os.environ.get("UPLOAD_CHUNK_BYTES", str(8 * 1024 * 1024)))
+UPLOAD_CHUNK_MAX_BYTES = int(os.environ.get("UPLOAD_CHUNK_MAX_BYTES", str(64 * 1024 * 1024)))
+UPLOAD_SESSION_TTL_SECONDS = int(os.environ.get("UPLOAD_SESSION_TTL_SECONDS", str(24 * 3600)))
+
+# Per-file budget of the ingest job (api.ingest.Budget): CPU seconds and retained memory
+# (e.g. an XLSX shared-string table). A file over budget fails its job; 0 disables a limit.
+INGEST_MAX_CPU_SECONDS = float(os.environ.get("INGEST_MAX_CPU_SECONDS", "300"))
+INGEST_MAX_MEMORY_BYTES = int(os.environ.get("INGEST_MAX_MEMORY_BYTES", str(256 * 1024 * 1024)))
+
+# Upload search (api.search): characters of each file's text that are indexed
+SEARCH_INDEX_MAX_CHARS = int(os.environ.get("SEARCH_INDEX_MAX_CHARS", str(1_000_000)))
+
+# SuperAdmin analytics snapshot (api.analytics): a snapshot older than MAX_AGE is refreshed on
+# read, and every FULL_REFRESH seconds it is recomputed from scratch instead of incrementally.
+ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS = float(os.environ.get("ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS", "900"))
+ANALYTICS_SNAPSHOT_FULL_REFRESH_SECONDS = float(os.environ.get("ANALYTICS_SNAPSHOT_FULL_REFRESH_SECONDS", "86400"))
+
+# Throttle store (api.throttling): sqlite:///<path> shared by the processes of one host, or
+# redis://[:password@]host:port/db shared by several; TIMEOUT bounds each round trip.
+THROTTLE_STORE_URL = os.environ.get("THROTTLE_STORE_URL", f"sqlite:///{BASE_DIR / 'throttle.sqlite3'}")
+THROTTLE_STORE_TIMEOUT_SECONDS = float(os.environ.get("THROTTLE_STORE_TIMEOUT_SECONDS", "0.25"))
+
+# Principal cache (api.principals): cache alias and how long an entry may serve requests. Signals
+# invalidate entries on change; the TTL bounds staleness in processes the invalidation can't reach.
+PRINCIPAL_CACHE_ALIAS = os.environ.get("PRINCIPAL_CACHE_ALIAS", "default")
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.environ.get("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+
+# Visitor progress autosave (api.progress): queued saves are written every PROGRESS_FLUSH_SECONDS;
+# a hard crash loses at most that much progress. 0 writes through on every request.
+PROGRESS_FLUSH_SECONDS = float(os.environ.get("PROGRESS_FLUSH_SECONDS", "3"))
+
+# Largest ?limit= accepted by paginated list endpoints (api.pagination)
+PAGINATION_MAX_LIMIT = int(os.environ.get("PAGINATION_MAX_LIMIT", "1000"))
+
+# Job worker (process_jobs): lease length and retry backoff, in seconds
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "60"))
+JOB_RETRY_BASE_SECONDS = float(os.environ.get("JOB_RETRY_BASE_SECONDS", "5"))
+JOB_RETRY_MAX_SECONDS = float(os.environ.get("JOB_RETRY_MAX_SECONDS", "900"))
+
+# Fair scheduling across organizations: running jobs allowed per org (0 = no cap)
+# and each subscription tier's share of worker slots relative to the others
+JOB_TENANT_MAX_RUNNING = int(os.environ.get("JOB_TENANT_MAX_RUNNING", "8"))
+JOB_TIER_WEIGHTS = {
+    "free": float(os.environ.get("JOB_WEIGHT_FREE", "1")),
+    "premium": float(os.environ.get("JOB_WEIGHT_PREMIUM", "2")),
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
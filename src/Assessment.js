@@ -27,6 +27,27 @@ import UpsellModal from "./components/UpsellModal";
 import { useAuth } from "./contexts/AuthContext";
 import ChatSection from "./AssessmentChatMessages";
 
+// Identity of a chat message for incremental chat saves
+const chatKey = (m) => String(m.id ?? `${m.role}|${m.timestamp}|${m.text}`);
+// Placeholders shown while a reply is pending; never persisted
+const isTransientChat = (m) => String(m.id ?? "").startsWith("typing-");
+
+// JSON-patch operations turning `prev` into `next` (nested answer objects)
+const answersPatch = (prev, next, base = "") => {
+  const ops = [];
+  const token = (k) => String(k).replace(/~/g, "~0").replace(/\//g, "~1");
+  const isObj = (v) => v && typeof v === "object" && !Array.isArray(v);
+  Object.keys(prev).forEach(k => {
+    if (!(k in next)) ops.push({ op: "remove", path: `${base}/${token(k)}` });
+  });
+  Object.keys(next).forEach(k => {
+    const path = `${base}/${token(k)}`;
+    if (isObj(prev[k]) && isObj(next[k])) ops.push(...answersPatch(prev[k], next[k], path));
+    else if (!(k in prev) || JSON.stringify(prev[k]) !== JSON.stringify(next[k])) ops.push({ op: "replace", path, value: next[k] });
+  });
+  return ops;
+};
+
 // export default function AssessmentPlatform() {
 export default function AssessmentPlatform(props) {
   const { 
@@ -83,6 +104,8 @@ export default function AssessmentPlatform(props) {
   const [returningUser, setReturningUser] = useState(false);
   const [previousAssessments, setPreviousAssessments] = useState([]);
   const chatSaveTimerRef = useRef(null);
+  // Keys of chat messages the backend already has; only newer ones are sent.
+  const savedChatKeysRef = useRef(new Set());
 
   // Sync answers when initialAnswers changes
   useEffect(() => {
@@ -393,6 +416,10 @@ export default function AssessmentPlatform(props) {
 
   // ─── Session restore: if visitorId exists in localStorage, reload full session on mount ───
   const progressSaveTimerRef = useRef(null);
+  // Answers the backend is known to hold (null: unknown, send them all)
+  const savedAnswersRef = useRef(null);
+  // Sequence number of the last progress save (api/progress.py orders saves by it)
+  const progressSeqRef = useRef(0);
   useEffect(() => {
     const savedEmail = localStorage.getItem("conseqx_visitor_email");
     const savedOrg = localStorage.getItem("conseqx_visitor_org");
@@ -418,8 +445,10 @@ export default function AssessmentPlatform(props) {
             }
             if (v.chat_history && v.chat_history.length > 0) {
               setChatMessages(v.chat_history);
+              savedChatKeysRef.current = new Set(v.chat_history.map(chatKey));
             }
             // Restore in-progress answers from backend
+            if (v.current_answers && typeof v.current_answers === "object") savedAnswersRef.current = v.current_answers;
             if (v.current_answers && typeof v.current_answers === "object" && Object.keys(v.current_answers).length > 0) {
               setAnswers(prev => {
                 // Only override if local answers are empty
@@ -473,16 +502,22 @@ export default function AssessmentPlatform(props) {
     if (Object.keys(answers).length === 0 && step === 0) return;
     if (progressSaveTimerRef.current) clearTimeout(progressSaveTimerRef.current);
     progressSaveTimerRef.current = setTimeout(() => {
+      // Send only the changed answers once the backend's copy is known
+      const saved = savedAnswersRef.current;
+      const delta = saved ? { answers_patch: answersPatch(saved, answers) } : { current_answers: answers };
+      // Increasing across reloads, so a late save from another worker can't overwrite this one
+      progressSeqRef.current = Math.max(Date.now(), progressSeqRef.current + 1);
       fetch(`${apiBase}/api/visitors/save-progress/`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
           visitor_id: visitorId,
-          current_answers: answers,
+          ...delta,
+          seq: progressSeqRef.current,
           current_step: step,
           current_system_id: currentSystem?.id || "",
         }),
-      }).catch(() => {});
+      }).then(r => { if (r.ok) savedAnswersRef.current = answers; }).catch(() => {});
     }, 5000);
     return () => { if (progressSaveTimerRef.current) clearTimeout(progressSaveTimerRef.current); };
   }, [answers, step, currentSystem, visitorId, apiBase]);
@@ -492,10 +527,15 @@ export default function AssessmentPlatform(props) {
     if (!visitorId || chatMessages.length === 0) return;
     if (chatSaveTimerRef.current) clearTimeout(chatSaveTimerRef.current);
     chatSaveTimerRef.current = setTimeout(() => {
-      fetch(`${apiBase}/api/visitors/save-chat/`, {
+      // Append only the new messages; the backend skips any it already stored.
+      const unsaved = chatMessages.filter(m => !isTransientChat(m) && !savedChatKeysRef.current.has(chatKey(m)));
+      if (unsaved.length === 0) return;
+      fetch(`${apiBase}/api/visitors/${visitorId}/chat/messages`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ visitor_id: visitorId, messages: chatMessages }),
+        body: JSON.stringify({ messages: unsaved }),
+      }).then(r => {
+        if (r.ok) unsaved.forEach(m => savedChatKeysRef.current.add(chatKey(m)));
       }).catch(() => {});
     }, 3000);
     return () => { if (chatSaveTimerRef.current) clearTimeout(chatSaveTimerRef.current); };
@@ -573,9 +613,11 @@ export default function AssessmentPlatform(props) {
         // Restore chat history into chat
         if (v.chat_history && v.chat_history.length > 0) {
           setChatMessages(v.chat_history);
+          savedChatKeysRef.current = new Set(v.chat_history.map(chatKey));
         }
 
         // Restore in-progress answers from backend
+        if (v.current_answers && typeof v.current_answers === "object") savedAnswersRef.current = v.current_answers;
         if (v.current_answers && typeof v.current_answers === "object" && Object.keys(v.current_answers).length > 0) {
           setAnswers(v.current_answers);
           localStorage.setItem("conseqx_session_answers", JSON.stringify(v.current_answers));
@@ -1365,7 +1407,9 @@ export default function AssessmentPlatform(props) {
                   if (auth?.logout) auth.logout();
                   // 2. Cancel any pending progress save (prevent overwriting backend with empty data)
                   if (progressSaveTimerRef.current) clearTimeout(progressSaveTimerRef.current);
+                  savedAnswersRef.current = null;
                   if (chatSaveTimerRef.current) clearTimeout(chatSaveTimerRef.current);
+                  savedChatKeysRef.current = new Set();
                   // 3. Clear persisted visitor session from localStorage FIRST
                   localStorage.removeItem("conseqx_visitor_id");
                   localStorage.removeItem("conseqx_visitor_email");
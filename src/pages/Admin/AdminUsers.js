@@ -22,6 +22,13 @@ import {
 /* ═══════════════════════════════════════
    Constants
    ═══════════════════════════════════════ */
+// Columns the table and detail panel show; assessment snapshots are fetched per visitor
+const VISITOR_LIST_FIELDS = [
+  "id", "organization_name", "name", "role", "email", "status", "notes", "started_assessment",
+  "systems_attempted", "assessment_count", "last_assessment_at", "ip_address", "user_agent",
+  "created_at", "updated_at",
+].join(",");
+
 const SORT_OPTIONS = [
   { value: "newest",     label: "Newest first" },
   { value: "oldest",     label: "Oldest first" },
@@ -101,7 +108,7 @@ export default function AdminUsers() {
   const loadVisitors = useCallback(async () => {
     setBusy(true);
     try {
-      const data = await apiFetch("/admin/visitors");
+      const data = await apiFetch(`/admin/visitors?fields=${VISITOR_LIST_FIELDS}`);
       setVisitors(Array.isArray(data) ? data : []);
     } catch (e) {
       setUi(s => ({ ...s, error: String(e?.message || e) }));
@@ -253,6 +260,26 @@ export default function AdminUsers() {
   /* ─── Expanded user ─── */
   const expandedUser = expandedId ? visitors.find(v => String(v.id) === expandedId) : null;
 
+  /* ─── Chat history (loaded when its tab is opened; the list doesn't carry it) ─── */
+  const [chatById, setChatById] = useState({});
+  useEffect(() => {
+    if (!expandedId || detailTab !== "chat" || chatById[expandedId]) return;
+    apiFetch(`/visitors/${expandedId}/chat/messages?limit=200`)
+      .then(data => setChatById(prev => ({ ...prev, [expandedId]: Array.isArray(data) ? [...data].reverse() : [] })))
+      .catch(e => setUi(s => ({ ...s, error: String(e?.message || e) })));
+  }, [expandedId, detailTab, chatById, apiFetch, setUi]);
+  const expandedChat = (expandedId && chatById[expandedId]) || [];
+
+  /* ─── Assessment snapshots (loaded when their tab is opened; the list leaves them out) ─── */
+  const [assessmentsById, setAssessmentsById] = useState({});
+  useEffect(() => {
+    if (!expandedId || detailTab !== "assessments" || assessmentsById[expandedId]) return;
+    apiFetch(`/admin/visitors/${expandedId}?fields=assessment_data`)
+      .then(data => setAssessmentsById(prev => ({ ...prev, [expandedId]: Array.isArray(data?.assessment_data) ? data.assessment_data : [] })))
+      .catch(e => setUi(s => ({ ...s, error: String(e?.message || e) })));
+  }, [expandedId, detailTab, assessmentsById, apiFetch, setUi]);
+  const expandedAssessments = (expandedId && assessmentsById[expandedId]) || [];
+
   /* ─── Date helpers ─── */
   const accountAge = (dateStr) => {
     if (!dateStr) return "—";
@@ -529,15 +556,15 @@ export default function AdminUsers() {
                               {/* ─── ASSESSMENTS TAB ─── */}
                               {detailTab === "assessments" && (
                                 <div className="space-y-3">
-                                  {(expandedUser.assessment_data || []).length === 0 ? (
+                                  {expandedAssessments.length === 0 ? (
                                     <EmptyState message="No assessments recorded yet" />
                                   ) : (
                                     <div className="space-y-3">
-                                      {[...(expandedUser.assessment_data || [])].reverse().map((a, i) => (
+                                      {[...expandedAssessments].reverse().map((a, i) => (
                                         <div key={i} className="rounded-lg border border-gray-200 dark:border-gray-700 bg-white dark:bg-gray-900 p-4">
                                           <div className="flex justify-between items-start mb-2">
                                             <div>
-                                              <div className="text-sm font-bold text-gray-900 dark:text-gray-100">Assessment #{(expandedUser.assessment_data || []).length - i}</div>
+                                              <div className="text-sm font-bold text-gray-900 dark:text-gray-100">Assessment #{expandedAssessments.length - i}</div>
                                               <div className="text-xs text-gray-500 dark:text-gray-400">{a.date ? formatDateTime(a.date) : "—"}</div>
                                             </div>
                                             <Pill tone="info">
@@ -565,7 +592,7 @@ export default function AdminUsers() {
                                             </div>
                                           )}
                                           {a.analysis_summary && (() => {
-                                            const aIdx = (expandedUser.assessment_data || []).length - i;
+                                            const aIdx = expandedAssessments.length - i;
                                             const isOpen = expandedReport === aIdx;
                                             return (
                                               <div className="mt-3">
@@ -631,11 +658,11 @@ export default function AdminUsers() {
                               {/* ─── CHAT HISTORY TAB ─── */}
                               {detailTab === "chat" && (
                                 <div className="space-y-2">
-                                  {(expandedUser.chat_history || []).length === 0 ? (
+                                  {expandedChat.length === 0 ? (
                                     <EmptyState message="No chat history found" />
                                   ) : (
                                     <div className="max-h-[500px] overflow-y-auto space-y-3 pr-1">
-                                      {(expandedUser.chat_history || []).map((msg, i) => {
+                                      {expandedChat.map((msg, i) => {
                                         const isUser = msg.role === "user";
                                         return (
                                           <div key={i} className={`flex ${isUser ? "justify-end" : "justify-start"}`}>